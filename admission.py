@@ -0,0 +1,150 @@
+"""
+Control de admisión para las traducciones.
+
+Limita cuántas traducciones usan el navegador a la vez y cuántas pueden
+esperar turno; el resto se rechaza de inmediato con un Retry-After estimado
+a partir de los tiempos de servicio recientes, en lugar de acumularse hasta
+agotar la memoria.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+
+class AdmissionRejected(Exception):
+    """
+    La traducción no fue admitida.
+
+    Attributes:
+        status: Código HTTP sugerido (429 cola llena, 503 espera agotada)
+        retry_after: Segundos sugeridos antes de reintentar
+    """
+
+    def __init__(self, message: str, status: int, retry_after: int):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Semáforo con cola acotada y estimación del tiempo de espera.
+
+    Args:
+        max_concurrency: Traducciones ejecutándose a la vez
+        max_queue: Peticiones que pueden esperar turno
+        queue_timeout: Segundos máximos esperando turno
+        ewma_alpha: Peso de la última muestra en la media del tiempo de servicio
+    """
+
+    def __init__(self, max_concurrency=2, max_queue=8, queue_timeout=60.0, ewma_alpha=0.2):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency debe ser al menos 1")
+
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.ewma_alpha = ewma_alpha
+
+        self._lock = threading.Condition()
+        self._active = 0
+        self._queued = 0
+        self._service_time = None  # Media móvil exponencial en segundos
+
+        self._admitted = 0
+        self._rejected_full = 0
+        self._rejected_timeout = 0
+
+    def retry_after(self) -> int:
+        """Segundos estimados hasta que una petición nueva podría ser atendida."""
+        with self._lock:
+            return self._retry_after()
+
+    def _retry_after(self) -> int:
+        """Requiere _lock."""
+        service_time = self._service_time or 30.0
+        rounds = (self._queued + 1) / self.max_concurrency
+        return max(1, math.ceil(rounds * service_time))
+
+    def acquire(self, bounded: bool = True, deadline=None):
+        """
+        Espera un hueco de ejecución.
+
+        Args:
+            bounded: Si es False no se aplica el límite de cola ni el timeout
+                (para llamadores que ya acotan su propia concurrencia)
+            deadline: Deadline opcional de la petición; deja de esperar turno
+                si se cancela o se agota
+
+        Raises:
+            AdmissionRejected: Si la cola está llena o la espera se agota
+            TranslationCancelled: Si el deadline se cancela o vence en la cola
+        """
+        with self._lock:
+            if self._active < self.max_concurrency and not self._queued:
+                self._active += 1
+                self._admitted += 1
+                return
+
+            if bounded and self._queued >= self.max_queue:
+                self._rejected_full += 1
+                raise AdmissionRejected(
+                    'Servidor saturado, demasiadas traducciones en espera',
+                    429, self._retry_after()
+                )
+
+            expires_at = time.monotonic() + self.queue_timeout if bounded else None
+            self._queued += 1
+            try:
+                while self._active >= self.max_concurrency:
+                    remaining = expires_at - time.monotonic() if expires_at else None
+                    if remaining is not None and remaining <= 0:
+                        self._rejected_timeout += 1
+                        raise AdmissionRejected(
+                            'Tiempo de espera agotado esperando turno de traducción',
+                            503, self._retry_after()
+                        )
+                    if deadline is not None:
+                        remaining = deadline.wait_slice(remaining)
+                    self._lock.wait(remaining)
+            finally:
+                self._queued -= 1
+
+            self._active += 1
+            self._admitted += 1
+
+    def release(self, service_time: float = None):
+        """Libera el hueco y actualiza la media del tiempo de servicio."""
+        with self._lock:
+            self._active -= 1
+            if service_time is not None:
+                if self._service_time is None:
+                    self._service_time = service_time
+                else:
+                    self._service_time += self.ewma_alpha * (service_time - self._service_time)
+            self._lock.notify()
+
+    @contextmanager
+    def slot(self, bounded: bool = True, deadline=None):
+        """Context manager que ocupa un hueco durante la traducción."""
+        self.acquire(bounded, deadline)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - start)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'active': self._active,
+                'queued': self._queued,
+                'max_concurrency': self.max_concurrency,
+                'max_queue': self.max_queue,
+                'admitted': self._admitted,
+                'rejected_queue_full': self._rejected_full,
+                'rejected_timeout': self._rejected_timeout,
+                'avg_service_time': round(self._service_time, 3) if self._service_time else None,
+                'retry_after': self._retry_after(),
+            }
@@ -1,11 +1,34 @@
-﻿from flask import Flask, request, jsonify, render_template_string
+﻿from flask import Flask, Response, g, request, jsonify, render_template_string
 from flask_cors import CORS
 from waitress import serve
 
-from zzzcode_translator import translate_code_zzzcode, parse_direction
+from zzzcode_translator import (
+    translate_code_zzzcode, translate_chunked, translate_batch, parse_direction, create_driver,
+    reset_session, warm_session
+)
+from languages import DIRECTIONS, LANGUAGES, MODES, directions_hint
+from driver_pool import DriverPool
+from browser_workers import WorkerPool
+from browser_tabs import TabbedBrowsers
+from backends import backend_chain, backends_stats, close_backends
+from deadline import Deadline, DeadlineExceeded, TranslationCancelled
+from extraction import SELECTOR as extraction_selector
+import resource_filter
+from translation_cache import TranslationCache, make_cache_key
+from job_queue import Job, JobManager, JobQueueFull
+from singleflight import SingleFlight
+from admission import AdmissionController, AdmissionRejected
+from metrics import REGISTRY, WINDOWS
+from http_encoding import compress, etag_matches, negotiate, should_compress, translation_etag
+import atexit
 import logging
+from contextlib import contextmanager
 from datetime import datetime
 import traceback
+import json
+import queue
+import threading
+import time
 import os
 
 # Configurar logging antes de cualquier otra cosa
@@ -36,24 +59,253 @@ app = Flask(__name__)
 CORS(app, resources={
     r"/api/*": {
         "origins": "*",  # En producción, especifica dominios permitidos
-        "methods": ["GET", "POST", "OPTIONS"],
-        "allow_headers": ["Content-Type"]
+        "methods": ["GET", "POST", "DELETE", "OPTIONS"],
+        "allow_headers": ["Content-Type", "X-Request-Timeout", "If-None-Match"],
+        "expose_headers": ["Retry-After", "ETag"]
     }
 })
 
-# Estadísticas simples
+# Pestañas por navegador (BROWSER_TABS > 1): cada sesión del pool es una pestaña
+# y varios Chrome comparten proceso en lugar de lanzar uno por traducción
+BROWSER_TABS = int(os.environ.get('BROWSER_TABS', 1))
+tabbed_browsers = None
+if BROWSER_TABS > 1:
+    tabbed_browsers = TabbedBrowsers(create_driver, tabs_per_browser=BROWSER_TABS,
+                                     setup=resource_filter.install)
+    atexit.register(tabbed_browsers.close)  # Después de cerrar el pool (atexit es LIFO)
+
+# Pool de sesiones de Chrome compartido por todos los hilos de Waitress
+driver_pool = DriverPool(
+    factory=tabbed_browsers.new_tab if tabbed_browsers else create_driver,
+    min_size=int(os.environ.get('DRIVER_POOL_MIN_SIZE', 0)),
+    max_size=int(os.environ.get('DRIVER_POOL_MAX_SIZE', 2)),
+    max_uses=int(os.environ.get('DRIVER_POOL_MAX_USES', 50)),
+    acquire_timeout=float(os.environ.get('DRIVER_POOL_ACQUIRE_TIMEOUT', 120)),
+    # Las pestañas comparten cookies y almacenamiento: no se resetean
+    reset=None if tabbed_browsers else reset_session,
+    prepare=warm_session
+)
+atexit.register(driver_pool.close)
+atexit.register(close_backends)
+
+# Trabajadores en procesos aparte (BROWSER_WORKERS > 0): cada uno con su Chrome,
+# supervisados y reiniciados si se cuelgan o superan su presupuesto de memoria
+worker_pool = None
+if int(os.environ.get('BROWSER_WORKERS', 0)) > 0:
+    worker_pool = WorkerPool(
+        size=int(os.environ['BROWSER_WORKERS']),
+        task_timeout=float(os.environ.get('BROWSER_WORKER_TASK_TIMEOUT', 300)),
+        max_rss_mb=int(os.environ.get('BROWSER_WORKER_MAX_RSS_MB', 1024)),
+        max_tasks=int(os.environ.get('BROWSER_WORKER_MAX_TASKS', 200)),
+        acquire_timeout=float(os.environ.get('DRIVER_POOL_ACQUIRE_TIMEOUT', 120))
+    )
+
+# Navegadores que pueden trabajar a la vez
+BROWSER_CAPACITY = worker_pool.size if worker_pool else driver_pool.max_size
+
+# Sesiones que se abren (con el conversor cargado) al arrancar; la instancia no
+# está lista (/api/health/ready) hasta tenerlas
+WARMUP_SESSIONS = min(int(os.environ.get('WARMUP_SESSIONS', 1)), BROWSER_CAPACITY)
+
+warmup = {
+    'status': 'pending',  # pending -> warming_up -> ready (o failed, con reintentos)
+    'target_sessions': WARMUP_SESSIONS,
+    'attempts': 0,
+    'error': None,
+    'ready_at': None
+}
+
+
+def warm_up_browsers():
+    """Abre las sesiones iniciales en segundo plano, reintentando con backoff."""
+    if WARMUP_SESSIONS <= 0 or 'selenium' not in backend_chain():
+        warmup['status'] = 'ready'
+        warmup['ready_at'] = datetime.now().isoformat()
+        return
+
+    delay = 5
+    while True:
+        warmup['attempts'] += 1
+        warmup['status'] = 'warming_up'
+        try:
+            if worker_pool is not None:
+                # Los trabajadores abren su Chrome al arrancar; esperar a que estén calientes
+                give_up_at = time.monotonic() + worker_pool.acquire_timeout
+                while worker_pool.warm_count() < WARMUP_SESSIONS:
+                    if time.monotonic() >= give_up_at:
+                        raise TimeoutError(
+                            f"{worker_pool.warm_count()}/{WARMUP_SESSIONS} trabajadores con Chrome listo "
+                            f"tras {worker_pool.acquire_timeout:.0f}s"
+                        )
+                    time.sleep(1)
+            else:
+                driver_pool.warm_up(WARMUP_SESSIONS, prepare=driver_pool.prepare)
+        except Exception as e:
+            warmup['status'] = 'failed'
+            warmup['error'] = str(e)
+            logger.warning(f"Calentamiento de navegadores fallido (reintento en {delay}s): {e}")
+            time.sleep(delay)
+            delay = min(delay * 2, 60)
+            continue
+
+        warmup['status'] = 'ready'
+        warmup['error'] = None
+        warmup['ready_at'] = datetime.now().isoformat()
+        logger.info(f"✅ {WARMUP_SESSIONS} sesiones de Chrome listas")
+        return
+
+
+_browsers_started = False
+_browsers_lock = threading.Lock()
+
+
+def start_browsers():
+    """
+    Lanza los trabajadores (si los hay) y el calentamiento en segundo plano.
+
+    Lo llaman los puntos de entrada del servidor y no la importación del
+    módulo: con el recargador de Flask el proceso padre también importa la
+    API y no debe abrir navegadores. Las llamadas repetidas no hacen nada.
+    """
+    global _browsers_started
+    with _browsers_lock:
+        if _browsers_started:
+            return
+        _browsers_started = True
+
+    if worker_pool is not None:
+        worker_pool.start()
+        atexit.register(worker_pool.close)
+    threading.Thread(target=warm_up_browsers, name='browser-warmup', daemon=True).start()
+
+# Caché de traducciones (memoria + SQLite opcional)
+translation_cache = TranslationCache(
+    max_bytes=int(os.environ.get('TRANSLATION_CACHE_MAX_BYTES', 32 * 1024 * 1024)),
+    ttl=int(os.environ.get('TRANSLATION_CACHE_TTL', 7 * 24 * 3600)),
+    db_path=os.environ.get('TRANSLATION_CACHE_DB') or None
+)
+atexit.register(translation_cache.close)
+
+# Control de admisión: traducciones simultáneas y cola de espera acotadas
+admission = AdmissionController(
+    max_concurrency=int(os.environ.get('MAX_CONCURRENT_TRANSLATIONS', BROWSER_CAPACITY)),
+    max_queue=int(os.environ.get('MAX_QUEUED_TRANSLATIONS', 8)),
+    queue_timeout=float(os.environ.get('ADMISSION_QUEUE_TIMEOUT', 60))
+)
+
+# Deduplicación de traducciones idénticas en curso
+single_flight = SingleFlight()
+
+# Código a partir del cual se traduce por fragmentos si la petición no indica "chunked"
+CHUNKED_MIN_CHARS = int(os.environ.get('CHUNKED_MIN_CHARS', 8000))
+
+# Segundos entre comentarios keep-alive en /api/translate/stream
+SSE_KEEPALIVE_SECONDS = 15
+
+# Tiempo máximo por petición (0 = sin límite); el cliente puede pedir menos con
+# "timeout" en el cuerpo o la cabecera X-Request-Timeout
+REQUEST_TIMEOUT = float(os.environ.get('REQUEST_TIMEOUT', 300))
+
+# Cada cuánto se comprueba si el cliente cerró la conexión
+CLIENT_CHECK_INTERVAL = 1.0
+
+# Waitress solo detecta clientes desconectados a mitad de petición si sigue
+# leyendo del socket (channel_request_lookahead > 0)
+WAITRESS_REQUEST_LOOKAHEAD = 5
+
+# Máximo de snippets por petición a /api/translate/batch
+BATCH_MAX_ITEMS = int(os.environ.get('BATCH_MAX_ITEMS', 50))
+
+# Tiempo máximo de long-poll en GET /api/jobs/<id>?wait=N
+JOB_MAX_WAIT = float(os.environ.get('JOB_MAX_WAIT', 60))
+
+# Estadísticas de traducción: contadores del registro de métricas, seguros con
+# varios hilos y con ventanas de 1/5/15 minutos ('failed' incluye 'cancelled';
+# 'not_modified' son los 304 por If-None-Match, que no traducen nada)
+REGISTRY.describe('translation_requests_total', 'Traducciones pedidas a la API')
+REGISTRY.describe('translation_outcomes_total', 'Traducciones terminadas por resultado')
 stats = {
-    'total_requests': 0,
-    'successful': 0,
-    'failed': 0,
-    'start_time': datetime.now()
+    'total_requests': REGISTRY.counter('translation_requests_total'),
+    'successful': REGISTRY.counter('translation_outcomes_total', outcome='successful'),
+    'failed': REGISTRY.counter('translation_outcomes_total', outcome='failed'),
+    'cancelled': REGISTRY.counter('translation_outcomes_total', outcome='cancelled'),
+    'not_modified': REGISTRY.counter('translation_outcomes_total', outcome='not_modified'),
 }
+START_TIME = datetime.now()
+
+
+def stats_snapshot() -> dict:
+    """
+    Totales y ventanas recientes de las traducciones.
+
+    Returns:
+        Dict con los totales ('total_requests', 'successful', 'failed',
+        'cancelled', 'not_modified', 'success_rate') y en 'windows', por
+        ventana, los recuentos, las peticiones por segundo y la proporción
+        de errores. Los 304 no cuentan en success_rate: no son traducciones
+    """
+    totals = {name: counter.value for name, counter in stats.items()}
+    recent = {name: counter.windows() for name, counter in stats.items()}
+    windows = {}
+    for window, seconds in WINDOWS.items():
+        counts = {name: recent[name][window] for name in stats}
+        window_finished = counts['successful'] + counts['failed']
+        windows[window] = {
+            **counts,
+            'requests_per_second': round(counts['total_requests'] / seconds, 4),
+            'error_ratio': round(counts['failed'] / window_finished, 4) if window_finished else 0.0,
+        }
+
+    translated = totals['total_requests'] - totals['not_modified']
+    return {
+        **totals,
+        'success_rate': totals['successful'] / translated * 100 if translated else 0.0,
+        'windows': windows,
+    }
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def record_request_latency(response):
+    """Registra la latencia de cada petición por endpoint y código de estado."""
+    started = g.pop('request_started', None)
+    if started is not None and request.endpoint:
+        REGISTRY.observe('http_request_seconds', time.perf_counter() - started,
+                         endpoint=request.endpoint, status=str(response.status_code))
+    return response
+
+
+@app.after_request
+def compress_response(response):
+    """Comprime la respuesta con brotli o gzip según el Accept-Encoding."""
+    if response.direct_passthrough or response.is_streamed:
+        return response  # SSE y archivos se envían tal cual
+    if response.status_code < 200 or response.status_code in (204, 304):
+        return response
+
+    body = response.get_data()
+    if not should_compress(response.mimetype, len(body), response.headers.get('Content-Encoding')):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate(request.headers.get('Accept-Encoding'))
+    if encoding is None:
+        return response
+
+    response.set_data(compress(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
 
 
 @app.route('/')
 def home():
     """Página de inicio con documentación de la API"""
-    uptime = datetime.now() - stats['start_time']
+    uptime = datetime.now() - START_TIME
+    snapshot = stats_snapshot()
 
     html = """
     <!DOCTYPE html>
@@ -146,15 +398,15 @@ def home():
                 <h3>📊 Estadísticas del Servidor</h3>
                 <div class="stats-grid">
                     <div class="stat-item">
-                        <div class="stat-value">""" + str(stats['total_requests']) + """</div>
+                        <div class="stat-value">""" + str(snapshot['total_requests']) + """</div>
                         <div>Total Requests</div>
                     </div>
                     <div class="stat-item">
-                        <div class="stat-value">""" + str(stats['successful']) + """</div>
+                        <div class="stat-value">""" + str(snapshot['successful']) + """</div>
                         <div>Exitosos</div>
                     </div>
                     <div class="stat-item">
-                        <div class="stat-value">""" + str(stats['failed']) + """</div>
+                        <div class="stat-value">""" + str(snapshot['failed']) + """</div>
                         <div>Fallidos</div>
                     </div>
                     <div class="stat-item">
@@ -169,13 +421,13 @@ def home():
             <div class="endpoint">
                 <span class="method post">POST</span>
                 <strong>/api/translate</strong>
-                <p>Traduce código entre C++ y C#</p>
+                <p>Traduce código entre lenguajes (C++, C#, Java, Python, Go, Rust, TypeScript...)</p>
             </div>
 
             <h3>Parámetros (JSON):</h3>
             <pre>{
     "code": "string (código fuente)",
-    "direction": "cpp_to_cs | cs_to_cpp",
+    "direction": "cpp_to_cs | cs_to_cpp | java_to_py | ... (ver /api/languages)",
     "mode": "game | study (opcional, default: study)"
 }</pre>
 
@@ -209,18 +461,60 @@ def home():
     "timestamp": "2025-10-18T12:34:56"
 }</pre>
 
+            <div class="endpoint">
+                <span class="method post">POST</span>
+                <strong>/api/translate/batch</strong>
+                <p>Traduce una lista de snippets ({"items": [...]}) con una sola sesión de Chrome</p>
+            </div>
+
+            <div class="endpoint">
+                <span class="method post">POST</span>
+                <strong>/api/translate/stream</strong>
+                <p>Igual que /api/translate pero emite el progreso como Server-Sent Events (también GET con query string)</p>
+            </div>
+
+            <div class="endpoint">
+                <span class="method post">POST</span>
+                <strong>/api/jobs</strong>
+                <p>Encola una traducción (mismos parámetros) y devuelve un job_id al instante</p>
+            </div>
+
+            <div class="endpoint">
+                <span class="method get">GET</span>
+                <strong>/api/jobs/&lt;job_id&gt;?wait=30</strong>
+                <p>Estado y resultado del trabajo; wait hace long-poll hasta que termine</p>
+            </div>
+
+            <div class="endpoint">
+                <span class="method get">GET</span>
+                <strong>/api/languages</strong>
+                <p>Lista los lenguajes y direcciones de traducción disponibles</p>
+            </div>
+
             <div class="endpoint">
                 <span class="method get">GET</span>
                 <strong>/api/health</strong>
                 <p>Verifica el estado del servidor</p>
             </div>
 
+            <div class="endpoint">
+                <span class="method get">GET</span>
+                <strong>/api/health/live</strong> · <strong>/api/health/ready</strong>
+                <p>Liveness y readiness (503 hasta que haya sesiones de Chrome calientes)</p>
+            </div>
+
             <div class="endpoint">
                 <span class="method get">GET</span>
                 <strong>/api/stats</strong>
                 <p>Obtiene estadísticas del servidor</p>
             </div>
 
+            <div class="endpoint">
+                <span class="method get">GET</span>
+                <strong>/metrics</strong>
+                <p>Histogramas de latencia en formato Prometheus</p>
+            </div>
+
             <h2>🧪 Probar desde JavaScript (CodePen)</h2>
             <pre>// Función helper para tu juego
 async function translateCode(code, direction = 'cpp_to_cs', mode = 'study') {
@@ -261,65 +555,297 @@ async function translateCode(code, direction = 'cpp_to_cs', mode = 'study') {
     return render_template_string(html)
 
 
+class TranslationFailed(Exception):
+    """La traducción terminó sin un resultado válido."""
+
+    def __init__(self, details):
+        super().__init__('No se pudo traducir el código')
+        self.details = details
+
+
+def validate_translation_request(data) -> str | None:
+    """
+    Valida el cuerpo JSON de una petición de traducción.
+
+    Returns:
+        Mensaje de error, o None si la petición es válida
+    """
+    if not isinstance(data, dict):
+        return 'El cuerpo debe ser un objeto JSON'
+
+    # Validar parámetros requeridos
+    if 'code' not in data:
+        return 'Parámetro "code" es requerido'
+
+    if not isinstance(data['code'], str):
+        return 'Parámetro "code" debe ser un string'
+
+    if 'direction' not in data:
+        return 'Parámetro "direction" es requerido'
+
+    # Validar dirección
+    direction = DIRECTIONS.get(data['direction']) if isinstance(data['direction'], str) else None
+    if direction is None:
+        return f'direction inválida. {directions_hint()}'
+
+    # Validar modo
+    if data.get('mode', direction.default_mode) not in MODES:
+        return 'mode debe ser "game" o "study"'
+
+    chunked = data.get('chunked', False)
+    if not isinstance(chunked, bool):
+        return 'chunked debe ser true o false'
+    if chunked and not direction.chunkable:
+        return f'chunked no está disponible para {direction.source.name} → {direction.target.name}'
+
+    return validate_timeout(data.get('timeout'))
+
+
+def validate_timeout(timeout) -> str | None:
+    """Valida el campo opcional "timeout" (segundos)."""
+    if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float))
+                                or timeout <= 0):
+        return 'timeout debe ser un número de segundos mayor que 0'
+    return None
+
+
+def apply_timeout_header(data, headers=None):
+    """
+    Copia la cabecera X-Request-Timeout al campo "timeout" si el cuerpo no lo trae.
+
+    Args:
+        headers: Cabeceras de la petición (por defecto las de la petición de Flask)
+    """
+    header = (request.headers if headers is None else headers).get('X-Request-Timeout')
+    if isinstance(data, dict) and header and 'timeout' not in data:
+        try:
+            data['timeout'] = float(header)
+        except ValueError:
+            data['timeout'] = header  # La validación lo rechaza
+    return data
+
+
+def request_timeout(data: dict):
+    """Segundos máximos de la petición: lo pedido por el cliente, sin pasar de REQUEST_TIMEOUT."""
+    timeout = data.get('timeout')
+    if REQUEST_TIMEOUT > 0:
+        timeout = min(timeout, REQUEST_TIMEOUT) if timeout else REQUEST_TIMEOUT
+    return timeout
+
+
+@contextmanager
+def cancel_on_disconnect(deadline: Deadline):
+    """
+    Cancela el deadline si el cliente cierra la conexión mientras se traduce.
+
+    Requiere Waitress con channel_request_lookahead > 0 (lo expone como
+    waitress.client_disconnected); con otros servidores no hace nada.
+    """
+    client_disconnected = request.environ.get('waitress.client_disconnected')
+    if client_disconnected is None:
+        yield
+        return
+
+    finished = threading.Event()
+
+    def watch():
+        while not finished.wait(CLIENT_CHECK_INTERVAL):
+            if client_disconnected():
+                logger.info("Cliente desconectado, cancelando la traducción")
+                deadline.cancel('cliente desconectado')
+                return
+
+    threading.Thread(target=watch, name='client-watch', daemon=True).start()
+    try:
+        yield
+    finally:
+        finished.set()
+
+
+def cancelled_response(error: TranslationCancelled):
+    """Respuesta 504 (tiempo agotado) o 499 (cancelada) para una traducción interrumpida."""
+    stats['failed'].inc()
+    stats['cancelled'].inc()
+    logger.warning(f"Traducción interrumpida: {error}")
+    return jsonify({
+        'success': False,
+        'error': str(error),
+        'timestamp': datetime.now().isoformat()
+    }), 504 if isinstance(error, DeadlineExceeded) else 499
+
+
+def use_chunked(data: dict) -> bool:
+    """Traducción por fragmentos si se pide explícitamente o el código es grande (y la dirección lo admite)."""
+    chunked = data.get('chunked')
+    if chunked is None:
+        return DIRECTIONS[data['direction']].chunkable and len(data['code']) >= CHUNKED_MIN_CHARS
+    return chunked
+
+
+def request_mode(data: dict) -> str:
+    """Modo pedido, o el modo por defecto de la dirección."""
+    return data.get('mode', DIRECTIONS[data['direction']].default_mode)
+
+
+def translate_with_browser(code: str, from_lang: str, to_lang: str, progress=None,
+                           chunked: bool = False, deadline=None) -> str:
+    """Traduce con los procesos trabajadores si están activos, o con el pool local."""
+    if worker_pool is not None:
+        if chunked:
+            return translate_chunked(code, from_lang, to_lang, progress=progress,
+                                     max_workers=worker_pool.size, translate_fn=worker_pool.translate,
+                                     deadline=deadline)
+        return worker_pool.translate(code, from_lang, to_lang, progress=progress, deadline=deadline)
+
+    translate_fn = translate_chunked if chunked else translate_code_zzzcode
+    return translate_fn(code, from_lang, to_lang, pool=driver_pool, progress=progress, deadline=deadline)
+
+
+def run_translation(code: str, from_lang: str, to_lang: str, bounded: bool = True,
+                    progress=None, chunked: bool = False, deadline=None) -> tuple[str, bool]:
+    """
+    Traduce consultando primero la caché.
+
+    Args:
+        bounded: Si es False la traducción espera turno sin límite de cola
+            (los trabajos asíncronos ya están acotados por su propio pool)
+        progress: Callback de progreso para translate_code_zzzcode; solo lo
+            recibe la petición que lanza el navegador, no las que se le suman
+        chunked: Dividir el código en fragmentos traducidos en paralelo; ocupa
+            un solo hueco de admisión, el pool limita las sesiones usadas
+        deadline: Deadline de la petición; acota la cola de admisión y todas
+            las esperas de la traducción
+
+    Returns:
+        Tupla (código_traducido, servido_desde_caché)
+
+    Raises:
+        TranslationFailed: Si no se obtuvo un resultado válido
+        AdmissionRejected: Si el servidor está saturado
+        TranslationCancelled: Si el deadline se cancela o se agota
+    """
+    # Consultar la caché antes de lanzar Selenium
+    cache_key = make_cache_key(code, from_lang, to_lang)
+    translated_code = translation_cache.get(cache_key)
+    if translated_code is not None:
+        logger.info("Traducción servida desde caché")
+        return translated_code, True
+
+    def translate_and_cache():
+        # Realizar la traducción
+        with admission.slot(bounded, deadline):
+            logger.info(f"Iniciando traducción de {from_lang} a {to_lang}")
+            result = translate_with_browser(code, from_lang, to_lang, progress=progress, chunked=chunked,
+                                            deadline=deadline)
+
+        # Verificar que se obtuvo un resultado válido
+        if not result or "Error en la traducción" in result:
+            raise TranslationFailed(result)
+
+        translation_cache.set(cache_key, result)
+        return result
+
+    # Peticiones idénticas concurrentes comparten una sola traducción
+    translated_code, shared = single_flight.do(cache_key, translate_and_cache, deadline)
+    if shared:
+        logger.info("Traducción compartida con una petición idéntica en curso")
+    return translated_code, False
+
+
+def admission_rejected_response(error: AdmissionRejected):
+    """Respuesta 429/503 con Retry-After para peticiones no admitidas."""
+    response = jsonify({
+        'success': False,
+        'error': str(error),
+        'retry_after': error.retry_after,
+        'timestamp': datetime.now().isoformat()
+    })
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, error.status
+
+
+def run_translation_job(payload: dict, deadline: Deadline) -> dict:
+    """Ejecuta un trabajo de /api/jobs y actualiza las estadísticas."""
+    from_lang, to_lang = parse_direction(payload['direction'])
+    try:
+        translated_code, cached = run_translation(payload['code'], from_lang, to_lang, bounded=False,
+                                                  chunked=payload['chunked'], deadline=deadline)
+    except TranslationCancelled:
+        stats['failed'].inc()
+        stats['cancelled'].inc()
+        raise
+    except TranslationFailed as e:
+        stats['failed'].inc()
+        raise RuntimeError(f"{e}: {e.details}") from e
+    except Exception:
+        stats['failed'].inc()
+        raise
+
+    stats['successful'].inc()
+    return {
+        'translated_code': translated_code,
+        'from_lang': from_lang,
+        'to_lang': to_lang,
+        'mode': payload['mode'],
+        'cached': cached
+    }
+
+
+# Planificador asyncio del servidor ASGI (lo asigna asgi_server al importarse)
+async_scheduler = None
+
+
+# Trabajos asíncronos: workers acotados independientes de los hilos de Waitress
+job_manager = JobManager(
+    runner=run_translation_job,
+    max_workers=int(os.environ.get('JOB_WORKERS', BROWSER_CAPACITY)),
+    max_pending=int(os.environ.get('JOB_MAX_PENDING', 100)),
+    retention=int(os.environ.get('JOB_RETENTION', 3600))
+)
+atexit.register(job_manager.shutdown)
+
+
 @app.route('/api/translate', methods=['POST', 'OPTIONS'])
 def translate():
-    """Endpoint principal para traducir código"""
+    """
+    Endpoint principal para traducir código.
+
+    La respuesta lleva un ETag débil con el hash de la entrada. Con un
+    If-None-Match que coincide se responde 304 aunque sea un POST (RFC 9110
+    pide 412 para métodos que no son GET/HEAD): la traducción no modifica
+    nada en el servidor, el POST solo lleva el código en el cuerpo, y el
+    cliente quiere saber que su copia sigue valiendo, no una condición fallida.
+    """
     # Manejar preflight CORS
     if request.method == 'OPTIONS':
         return '', 204
 
-    stats['total_requests'] += 1
+    stats['total_requests'].inc()
 
     try:
         # Validar que la petición tenga JSON
         if not request.is_json:
-            stats['failed'] += 1
+            stats['failed'].inc()
             return jsonify({
                 'success': False,
                 'error': 'Content-Type debe ser application/json',
                 'timestamp': datetime.now().isoformat()
             }), 400
 
-        data = request.get_json()
-
-        # Validar parámetros requeridos
-        if 'code' not in data:
-            stats['failed'] += 1
-            return jsonify({
-                'success': False,
-                'error': 'Parámetro "code" es requerido',
-                'timestamp': datetime.now().isoformat()
-            }), 400
+        data = apply_timeout_header(request.get_json())
 
-        if 'direction' not in data:
-            stats['failed'] += 1
+        error = validate_translation_request(data)
+        if error:
+            stats['failed'].inc()
             return jsonify({
                 'success': False,
-                'error': 'Parámetro "direction" es requerido',
+                'error': error,
                 'timestamp': datetime.now().isoformat()
             }), 400
 
         code = data['code']
         direction = data['direction']
-        mode = data.get('mode', 'study')
-
-        # Validar dirección
-        if direction not in ['cpp_to_cs', 'cs_to_cpp']:
-            stats['failed'] += 1
-            return jsonify({
-                'success': False,
-                'error': 'direction debe ser "cpp_to_cs" o "cs_to_cpp"',
-                'timestamp': datetime.now().isoformat()
-            }), 400
-
-        # Validar modo
-        if mode not in ['game', 'study']:
-            stats['failed'] += 1
-            return jsonify({
-                'success': False,
-                'error': 'mode debe ser "game" o "study"',
-                'timestamp': datetime.now().isoformat()
-            }), 400
+        mode = request_mode(data)
 
         # Log de la petición
         logger.info(f"Nueva petición - Direction: {direction}, Mode: {mode}, Code length: {len(code)}")
@@ -327,21 +853,19 @@ def translate():
         # Obtener los lenguajes
         from_lang, to_lang = parse_direction(direction)
 
-        # Realizar la traducción
-        logger.info(f"Iniciando traducción de {from_lang} a {to_lang}")
-        translated_code = translate_code_zzzcode(code, from_lang, to_lang)
+        # El cliente ya tiene esta traducción: 304 sin volver a traducir
+        etag = translation_etag(make_cache_key(code, from_lang, to_lang))
+        if etag_matches(request.headers.get('If-None-Match'), etag):
+            stats['not_modified'].inc()
+            logger.info("Traducción no modificada (If-None-Match), 304")
+            return Response(status=304, headers={'ETag': etag})
 
-        # Verificar que se obtuvo un resultado válido
-        if not translated_code or "Error en la traducción" in translated_code:
-            stats['failed'] += 1
-            return jsonify({
-                'success': False,
-                'error': 'No se pudo traducir el código',
-                'details': translated_code,
-                'timestamp': datetime.now().isoformat()
-            }), 500
+        deadline = Deadline(request_timeout(data))
+        with cancel_on_disconnect(deadline):
+            translated_code, cached = run_translation(code, from_lang, to_lang, chunked=use_chunked(data),
+                                                      deadline=deadline)
 
-        stats['successful'] += 1
+        stats['successful'].inc()
         logger.info(f"Traducción exitosa - Resultado length: {len(translated_code)}")
 
         # Respuesta exitosa
@@ -351,11 +875,29 @@ def translate():
             'from_lang': from_lang,
             'to_lang': to_lang,
             'mode': mode,
+            'cached': cached,
+            'timestamp': datetime.now().isoformat()
+        }), 200, {'ETag': etag}
+
+    except TranslationFailed as e:
+        stats['failed'].inc()
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'details': e.details,
             'timestamp': datetime.now().isoformat()
-        }), 200
+        }), 500
+
+    except AdmissionRejected as e:
+        stats['failed'].inc()
+        logger.warning(f"Petición rechazada ({e.status}): {e}")
+        return admission_rejected_response(e)
+
+    except TranslationCancelled as e:
+        return cancelled_response(e)
 
     except Exception as e:
-        stats['failed'] += 1
+        stats['failed'].inc()
         logger.error(f"Error en traducción: {str(e)}")
         logger.error(traceback.format_exc())
 
@@ -366,32 +908,484 @@ def translate():
         }), 500
 
 
+@app.route('/api/translate/batch', methods=['POST', 'OPTIONS'])
+def translate_batch_endpoint():
+    """
+    Traduce varios snippets en una sola sesión de Chrome.
+
+    Cada item acepta los mismos campos que /api/translate; "direction" y
+    "mode" a nivel raíz sirven como valores por defecto. Los resultados se
+    devuelven uno por item y en el mismo orden, también cuando el lote se
+    rechaza (429/503) o se interrumpe (504/499): solo fallan entonces los
+    items que faltaban por traducir.
+    """
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    if not request.is_json:
+        stats['total_requests'].inc()
+        stats['failed'].inc()
+        return jsonify({
+            'success': False,
+            'error': 'Content-Type debe ser application/json',
+            'timestamp': datetime.now().isoformat()
+        }), 400
+
+    data = apply_timeout_header(request.get_json())
+    items = data.get('items') if isinstance(data, dict) else None
+
+    if not isinstance(items, list) or not items:
+        stats['total_requests'].inc()
+        stats['failed'].inc()
+        return jsonify({
+            'success': False,
+            'error': 'Parámetro "items" debe ser una lista no vacía',
+            'timestamp': datetime.now().isoformat()
+        }), 400
+
+    if len(items) > BATCH_MAX_ITEMS:
+        stats['total_requests'].inc()
+        stats['failed'].inc()
+        return jsonify({
+            'success': False,
+            'error': f'Máximo {BATCH_MAX_ITEMS} items por lote',
+            'timestamp': datetime.now().isoformat()
+        }), 400
+
+    error = validate_timeout(data.get('timeout'))
+    if error:
+        stats['total_requests'].inc()
+        stats['failed'].inc()
+        return jsonify({
+            'success': False,
+            'error': error,
+            'timestamp': datetime.now().isoformat()
+        }), 400
+
+    stats['total_requests'].inc(len(items))
+    logger.info(f"Nueva petición batch - Items: {len(items)}")
+
+    results = [None] * len(items)
+    pending = []  # (índice, código, from_lang, to_lang, modo, cache_key)
+
+    for index, item in enumerate(items):
+        if isinstance(item, dict):
+            # "direction" y "mode" de la raíz son los valores por defecto de cada item
+            item = {**{key: data[key] for key in ('direction', 'mode') if key in data}, **item}
+
+        error = validate_translation_request(item)
+        if error:
+            results[index] = {'index': index, 'success': False, 'error': error}
+            continue
+
+        from_lang, to_lang = parse_direction(item['direction'])
+        item['mode'] = request_mode(item)
+        cache_key = make_cache_key(item['code'], from_lang, to_lang)
+        translated_code = translation_cache.get(cache_key)
+        if translated_code is not None:
+            results[index] = {
+                'index': index,
+                'success': True,
+                'translated_code': translated_code,
+                'from_lang': from_lang,
+                'to_lang': to_lang,
+                'mode': item['mode'],
+                'cached': True
+            }
+        else:
+            pending.append((index, item['code'], from_lang, to_lang, item['mode'], cache_key))
+
+    interrupted = None
+    if pending:
+        # Agrupar por dirección para cambiar los lenguajes del formulario lo menos posible
+        pending.sort(key=lambda entry: (entry[2], entry[3], entry[0]))
+        logger.info(f"Traduciendo {len(pending)} items en una sola sesión")
+        deadline = Deadline(request_timeout(data))
+        try:
+            # Un lote ocupa un único hueco: usa una sola sesión de Chrome
+            with cancel_on_disconnect(deadline), admission.slot(deadline=deadline):
+                batch_items = [(code, from_lang, to_lang) for _, code, from_lang, to_lang, _, _ in pending]
+                if worker_pool is not None:
+                    outputs = worker_pool.translate_batch(batch_items, deadline=deadline)
+                else:
+                    outputs = translate_batch(batch_items, pool=driver_pool, deadline=deadline)
+        except AdmissionRejected as e:
+            logger.warning(f"Lote rechazado ({e.status}): {e}")
+            interrupted, outputs = e, []
+        except TranslationCancelled as e:
+            stats['cancelled'].inc(len(pending))
+            logger.warning(f"Traducción interrumpida: {e}")
+            interrupted, outputs = e, []
+
+        # Sin traducir por el rechazo o la interrupción: solo fallan los pendientes
+        for index, *_ in pending[len(outputs):]:
+            results[index] = {'index': index, 'success': False, 'error': str(interrupted)}
+
+        for (index, _, from_lang, to_lang, mode, cache_key), translated_code in zip(pending, outputs):
+            if not translated_code or "Error en la traducción" in translated_code:
+                results[index] = {
+                    'index': index,
+                    'success': False,
+                    'error': 'No se pudo traducir el código',
+                    'details': translated_code
+                }
+                continue
+
+            translation_cache.set(cache_key, translated_code)
+            results[index] = {
+                'index': index,
+                'success': True,
+                'translated_code': translated_code,
+                'from_lang': from_lang,
+                'to_lang': to_lang,
+                'mode': mode,
+                'cached': False
+            }
+
+    succeeded = sum(1 for result in results if result['success'])
+    stats['successful'].inc(succeeded)
+    stats['failed'].inc(len(results) - succeeded)
+
+    body = {
+        'success': succeeded == len(results),
+        'total': len(results),
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'results': results,
+        'timestamp': datetime.now().isoformat()
+    }
+    if interrupted is None:
+        return jsonify(body), 200
+
+    body['error'] = str(interrupted)
+    if isinstance(interrupted, AdmissionRejected):
+        body['retry_after'] = interrupted.retry_after
+        return jsonify(body), interrupted.status, {'Retry-After': str(interrupted.retry_after)}
+    return jsonify(body), 504 if isinstance(interrupted, DeadlineExceeded) else 499
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Serializa un evento en formato Server-Sent Events."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.route('/api/translate/stream', methods=['GET', 'POST', 'OPTIONS'])
+def translate_stream():
+    """
+    Traduce código emitiendo el progreso como Server-Sent Events.
+
+    Acepta los mismos parámetros que /api/translate, como JSON (POST) o en la
+    query string (GET, para usarlo con EventSource). Eventos: queued,
+    browser_acquired, submitted, partial (delta del texto que la página va
+    escribiendo, o el texto completo con reset=true si cambió por completo),
+    result (código limpio final) y error.
+    """
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    stats['total_requests'].inc()
+
+    if request.method == 'GET':
+        data = request.args.to_dict()
+        if 'chunked' in data:
+            data['chunked'] = data['chunked'].lower() == 'true'
+        if 'timeout' in data:
+            try:
+                data['timeout'] = float(data['timeout'])
+            except ValueError:
+                pass  # La validación lo rechaza
+    elif request.is_json:
+        data = request.get_json()
+    else:
+        stats['failed'].inc()
+        return jsonify({
+            'success': False,
+            'error': 'Content-Type debe ser application/json',
+            'timestamp': datetime.now().isoformat()
+        }), 400
+
+    error = validate_translation_request(apply_timeout_header(data))
+    if error:
+        stats['failed'].inc()
+        return jsonify({
+            'success': False,
+            'error': error,
+            'timestamp': datetime.now().isoformat()
+        }), 400
+
+    code = data['code']
+    mode = request_mode(data)
+    from_lang, to_lang = parse_direction(data['direction'])
+    logger.info(f"Nueva petición stream - Direction: {data['direction']}, Code length: {len(code)}")
+
+    events = queue.Queue()
+    deadline = Deadline(request_timeout(data))
+    client_disconnected = request.environ.get('waitress.client_disconnected')
+
+    def progress(event, payload):
+        events.put((event, payload))
+
+    def worker():
+        try:
+            translated_code, cached = run_translation(code, from_lang, to_lang, progress=progress,
+                                                      chunked=use_chunked(data), deadline=deadline)
+            stats['successful'].inc()
+            events.put(('result', {
+                'success': True,
+                'translated_code': translated_code,
+                'from_lang': from_lang,
+                'to_lang': to_lang,
+                'mode': mode,
+                'cached': cached,
+                'timestamp': datetime.now().isoformat()
+            }))
+        except TranslationFailed as e:
+            stats['failed'].inc()
+            events.put(('error', {'success': False, 'error': str(e), 'details': e.details}))
+        except AdmissionRejected as e:
+            stats['failed'].inc()
+            events.put(('error', {
+                'success': False,
+                'error': str(e),
+                'status': e.status,
+                'retry_after': e.retry_after
+            }))
+        except TranslationCancelled as e:
+            stats['failed'].inc()
+            stats['cancelled'].inc()
+            events.put(('error', {
+                'success': False,
+                'error': str(e),
+                'status': 504 if isinstance(e, DeadlineExceeded) else 499
+            }))
+        except Exception as e:
+            stats['failed'].inc()
+            logger.error(f"Error en traducción stream: {str(e)}")
+            events.put(('error', {'success': False, 'error': str(e)}))
+        finally:
+            events.put(None)
+
+    threading.Thread(target=worker, name='translation-stream', daemon=True).start()
+
+    def generate():
+        finished = False
+        try:
+            yield format_sse('queued', {'from_lang': from_lang, 'to_lang': to_lang, 'mode': mode})
+            last_partial = ''
+            last_sent = time.monotonic()
+            while True:
+                try:
+                    item = events.get(timeout=CLIENT_CHECK_INTERVAL)
+                except queue.Empty:
+                    if client_disconnected is not None and client_disconnected():
+                        break
+                    if time.monotonic() - last_sent >= SSE_KEEPALIVE_SECONDS:
+                        # Comentario SSE para que proxies y clientes no corten la conexión
+                        yield ": keep-alive\n\n"
+                        last_sent = time.monotonic()
+                    continue
+
+                if item is None:
+                    finished = True
+                    break
+
+                event, payload = item
+                if event == 'partial':
+                    text = payload['text']
+                    if text.startswith(last_partial):
+                        payload = {'delta': text[len(last_partial):]}
+                    else:
+                        payload = {'text': text, 'reset': True}
+                    last_partial = text
+                yield format_sse(event, payload)
+                last_sent = time.monotonic()
+        finally:
+            # El cliente se fue antes del resultado: soltar el navegador
+            if not finished:
+                logger.info("Cliente del stream desconectado, cancelando la traducción")
+                deadline.cancel('cliente desconectado')
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+@app.route('/api/jobs', methods=['POST', 'OPTIONS'])
+def create_job():
+    """Encola una traducción y devuelve el id del trabajo sin esperar al resultado"""
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    stats['total_requests'].inc()
+
+    if not request.is_json:
+        stats['failed'].inc()
+        return jsonify({
+            'success': False,
+            'error': 'Content-Type debe ser application/json',
+            'timestamp': datetime.now().isoformat()
+        }), 400
+
+    data = apply_timeout_header(request.get_json())
+    error = validate_translation_request(data)
+    if error:
+        stats['failed'].inc()
+        return jsonify({
+            'success': False,
+            'error': error,
+            'timestamp': datetime.now().isoformat()
+        }), 400
+
+    try:
+        job = job_manager.submit({
+            'code': data['code'],
+            'direction': data['direction'],
+            'mode': request_mode(data),
+            'chunked': use_chunked(data)
+        }, timeout=request_timeout(data))
+    except JobQueueFull as e:
+        stats['failed'].inc()
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'timestamp': datetime.now().isoformat()
+        }), 503
+
+    logger.info(f"Trabajo encolado: {job.id}")
+    response = job.to_dict()
+    response['success'] = True
+    response['status_url'] = f"/api/jobs/{job.id}"
+    return jsonify(response), 202
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Devuelve el estado de un trabajo.
+
+    Con ?wait=N (segundos, máximo JOB_MAX_WAIT) hace long-poll hasta que el
+    trabajo termine o venza el tiempo.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Trabajo no encontrado',
+            'timestamp': datetime.now().isoformat()
+        }), 404
+
+    wait = request.args.get('wait', type=float)
+    if wait and wait > 0:
+        job.wait(min(wait, JOB_MAX_WAIT))
+
+    response = job.to_dict()
+    response['success'] = job.status not in (Job.FAILED, Job.CANCELLED)
+    response['timestamp'] = datetime.now().isoformat()
+    return jsonify(response), 200
+
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancela un trabajo en cola o en ejecución y libera su navegador"""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Trabajo no encontrado',
+            'timestamp': datetime.now().isoformat()
+        }), 404
+
+    logger.info(f"Cancelación solicitada para el trabajo {job.id}")
+    response = job.to_dict()
+    pending = job.status in (Job.QUEUED, Job.RUNNING)
+    response['success'] = True
+    response['cancel_requested'] = pending
+    response['timestamp'] = datetime.now().isoformat()
+    return jsonify(response), 202 if pending else 200
+
+
+@app.route('/api/languages', methods=['GET'])
+def languages():
+    """Lenguajes y direcciones de traducción habilitadas"""
+    return jsonify({
+        'languages': [language.to_dict() for language in LANGUAGES],
+        'directions': [direction.to_dict() for direction in DIRECTIONS.values()],
+        'modes': list(MODES)
+    }), 200
+
+
 @app.route('/api/health', methods=['GET'])
 def health():
     """Endpoint para verificar que el servidor está funcionando"""
     return jsonify({
         'status': 'healthy',
+        'ready': warmup['status'] == 'ready',
         'timestamp': datetime.now().isoformat(),
-        'uptime': str(datetime.now() - stats['start_time']).split('.')[0]
+        'uptime': str(datetime.now() - START_TIME).split('.')[0],
+        'load': stats_snapshot()['windows']
     }), 200
 
 
+@app.route('/api/health/live', methods=['GET'])
+def health_live():
+    """Liveness: el proceso responde (no depende de los navegadores)"""
+    return jsonify({
+        'status': 'alive',
+        'timestamp': datetime.now().isoformat()
+    }), 200
+
+
+@app.route('/api/health/ready', methods=['GET'])
+def health_ready():
+    """Readiness: 200 solo cuando hay sesiones de Chrome calientes para atender"""
+    ready = warmup['status'] == 'ready'
+    return jsonify({
+        'status': 'ready' if ready else warmup['status'],
+        'warmup': warmup,
+        'warm_sessions': worker_pool.warm_count() if worker_pool else driver_pool.stats()['size'],
+        'timestamp': datetime.now().isoformat()
+    }), 200 if ready else 503
+
+
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
     """Endpoint para obtener estadísticas del servidor"""
-    uptime = datetime.now() - stats['start_time']
-    success_rate = (stats['successful'] / stats['total_requests'] * 100) if stats['total_requests'] > 0 else 0
+    uptime = datetime.now() - START_TIME
+    snapshot = stats_snapshot()
 
     return jsonify({
-        'total_requests': stats['total_requests'],
-        'successful': stats['successful'],
-        'failed': stats['failed'],
-        'success_rate': f"{success_rate:.2f}%",
+        'total_requests': snapshot['total_requests'],
+        'successful': snapshot['successful'],
+        'failed': snapshot['failed'],
+        'cancelled': snapshot['cancelled'],
+        'not_modified': snapshot['not_modified'],
+        'success_rate': f"{snapshot['success_rate']:.2f}%",
+        'windows': snapshot['windows'],
         'uptime': str(uptime).split('.')[0],
-        'start_time': stats['start_time'].isoformat()
+        'start_time': START_TIME.isoformat(),
+        'driver_pool': driver_pool.stats(),
+        'browser_tabs': tabbed_browsers.stats() if tabbed_browsers else None,
+        'browser_workers': worker_pool.stats() if worker_pool else None,
+        'backends': backends_stats(),
+        'resources': resource_filter.stats(),
+        'extraction': extraction_selector.stats(),
+        'cache': translation_cache.stats(),
+        'jobs': job_manager.stats(),
+        'coalescing': single_flight.stats(),
+        'admission': admission.stats(),
+        'async_scheduler': async_scheduler.stats() if async_scheduler else None,
+        'warmup': warmup,
+        'latency': REGISTRY.snapshot()
     }), 200
 
 
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Métricas de latencia en formato de texto de Prometheus"""
+    return Response(REGISTRY.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+
 @app.errorhandler(404)
 def not_found(error):
     """Manejador para rutas no encontradas"""
@@ -428,4 +1422,5 @@ if __name__ == '__main__':
     #app.run(host='0.0.0.0', port=5000, debug=True)
 
     # Usar Waitress (servidor WSGI de producción)
-    serve(app, host='0.0.0.0', port=8080, threads=4)
\ No newline at end of file
+    start_browsers()
+    serve(app, host='0.0.0.0', port=8080, threads=4, channel_request_lookahead=WAITRESS_REQUEST_LOOKAHEAD)
\ No newline at end of file
@@ -0,0 +1,504 @@
+"""
+Variante ASGI de la API (python start_server.py --mode async).
+
+Con Waitress cada petición ocupa uno de sus 4 hilos mientras espera turno o
+el resultado, así que la concurrencia la limita el número de hilos aunque
+estén dormidos. Aquí /api/translate, /api/translate/stream y el long-poll
+de /api/jobs/<id> son corrutinas: esperan en el AsyncTranslationScheduler y
+solo las traducciones admitidas ocupan un hilo, de modo que miles de
+conexiones esperando cuestan poco más que su socket.
+
+El resto de endpoints (documentación, health, stats, batch, trabajos...) se
+atienden con la misma aplicación Flask de api_server ejecutada en un pool de
+hilos pequeño, con lo que comparten estado, caché y navegadores.
+
+    uvicorn asgi_server:app --host 0.0.0.0 --port 8080
+"""
+import asyncio
+import io
+import json
+import logging
+import os
+import re
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import parse_qs
+
+import api_server
+from api_server import (
+    CLIENT_CHECK_INTERVAL, JOB_MAX_WAIT, SSE_KEEPALIVE_SECONDS, TranslationFailed, admission,
+    apply_timeout_header, format_sse, job_manager, request_mode, request_timeout, run_translation,
+    start_browsers, stats, translation_cache, use_chunked, validate_translation_request
+)
+from admission import AdmissionRejected
+from async_scheduler import AsyncTranslationScheduler
+from deadline import Deadline, DeadlineExceeded, TranslationCancelled
+from http_encoding import compress, etag_matches, negotiate, should_compress, translation_etag
+from job_queue import Job
+from metrics import REGISTRY
+from translation_cache import make_cache_key
+from zzzcode_translator import parse_direction
+
+logger = logging.getLogger(__name__)
+
+# Hilos para los endpoints que se atienden con la aplicación Flask
+ASGI_WSGI_THREADS = int(os.environ.get('ASGI_WSGI_THREADS', 4))
+
+scheduler = AsyncTranslationScheduler(
+    max_concurrency=admission.max_concurrency,
+    max_queue=admission.max_queue,
+    queue_timeout=admission.queue_timeout,
+    retry_after=admission.retry_after
+)
+_wsgi_executor = ThreadPoolExecutor(ASGI_WSGI_THREADS, thread_name_prefix='asgi-wsgi')
+api_server.async_scheduler = scheduler  # Para /api/stats
+
+_JOB_PATH = re.compile(r'^/api/jobs/([^/]+)$')
+_CORS_HEADERS = [(b'access-control-allow-origin', b'*'), (b'access-control-expose-headers', b'Retry-After, ETag')]
+
+
+class _Request:
+    """Lo que los handlers necesitan de una petición ASGI."""
+
+    def __init__(self, scope, body: bytes):
+        self.scope = scope
+        self.method = scope['method']
+        self.path = scope['path']
+        self.body = body
+        self.headers = {key.decode('latin-1').title(): value.decode('latin-1')
+                        for key, value in scope['headers']}
+        self.args = {key: values[-1] for key, values in
+                     parse_qs(scope['query_string'].decode('latin-1')).items()}
+
+    @property
+    def is_json(self) -> bool:
+        return self.headers.get('Content-Type', '').split(';')[0].strip() == 'application/json'
+
+    def json(self):
+        try:
+            return json.loads(self.body or b'null')
+        except ValueError:
+            return None
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise ConnectionResetError("Cliente desconectado antes de enviar el cuerpo")
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+async def _send_json(send, status: int, payload: dict, headers=()):
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'),
+                    (b'content-length', str(len(body)).encode())] + _CORS_HEADERS + list(headers),
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def _compressing_send(send, accept_encoding: str):
+    """
+    Envuelve send para comprimir las respuestas de un solo mensaje de cuerpo
+    (las de _send_json); las que llegan por partes, como el SSE, pasan tal cual.
+    """
+    encoding = negotiate(accept_encoding)
+    pending = []
+
+    async def wrapper(message):
+        if message['type'] == 'http.response.start':
+            pending.append(message)
+            return
+        if not pending:
+            return await send(message)
+
+        start = pending.pop()
+        body = message.get('body', b'')
+        headers = {key.lower(): value for key, value in start['headers']}
+        if (message.get('more_body') or start['status'] in (204, 304)
+                or not should_compress(headers.get(b'content-type', b'').decode('latin-1'), len(body),
+                                       headers.get(b'content-encoding'))):
+            await send(start)
+            return await send(message)
+
+        extra = [(b'vary', b'Accept-Encoding')]
+        if encoding is not None:
+            body = compress(body, encoding)
+            extra.append((b'content-encoding', encoding.encode()))
+        start = {**start, 'headers': [(key, value) for key, value in start['headers']
+                                      if key.lower() != b'content-length']
+                 + [(b'content-length', str(len(body)).encode())] + extra}
+        await send(start)
+        await send({**message, 'body': body})
+
+    return wrapper
+
+
+def _error(message: str, **extra) -> dict:
+    return {'success': False, 'error': message, **extra, 'timestamp': datetime.now().isoformat()}
+
+
+async def _watch_disconnect(receive, deadline: Deadline, task: asyncio.Task):
+    """Cancela la traducción en cuanto el servidor avisa de que el cliente se fue."""
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            logger.info("Cliente desconectado, cancelando la traducción")
+            deadline.cancel('cliente desconectado')
+            task.cancel()
+            return
+
+
+async def _translate(code: str, from_lang: str, to_lang: str, chunked: bool, deadline: Deadline,
+                     progress=None):
+    """
+    run_translation para corrutinas: la caché se consulta sin salir del event
+    loop y el resto espera turno en el planificador.
+    """
+    cache_key = make_cache_key(code, from_lang, to_lang)
+    translated_code = translation_cache.get(cache_key)
+    if translated_code is not None:
+        logger.info("Traducción servida desde caché")
+        return translated_code, True
+
+    def work():
+        # Ya admitida por el planificador: bounded=False para no rechazarla otra vez
+        return run_translation(code, from_lang, to_lang, bounded=False, progress=progress,
+                               chunked=chunked, deadline=deadline)
+
+    (translated_code, cached), shared = await scheduler.run(cache_key, work, deadline)
+    if shared:
+        logger.info("Traducción compartida con una petición idéntica en curso")
+    return translated_code, cached
+
+
+def _failure(e: Exception):
+    """Código HTTP, cuerpo y cabeceras de una traducción fallida (como en api_server)."""
+    stats['failed'].inc()
+    if isinstance(e, TranslationFailed):
+        return 500, _error(str(e), details=e.details), ()
+    if isinstance(e, AdmissionRejected):
+        logger.warning(f"Petición rechazada ({e.status}): {e}")
+        return (e.status, _error(str(e), retry_after=e.retry_after),
+                [(b'retry-after', str(e.retry_after).encode())])
+    if isinstance(e, TranslationCancelled):
+        stats['cancelled'].inc()
+        logger.warning(f"Traducción interrumpida: {e}")
+        return 504 if isinstance(e, DeadlineExceeded) else 499, _error(str(e)), ()
+    logger.error(f"Error en traducción: {str(e)}")
+    logger.error(traceback.format_exc())
+    return 500, _error(str(e)), ()
+
+
+def _parse_translation(req: _Request):
+    """
+    Cuerpo validado de una petición de traducción.
+
+    Returns:
+        Tupla (datos, error); error es None si la petición es válida
+    """
+    if req.method == 'GET':
+        data = dict(req.args)
+        if 'chunked' in data:
+            data['chunked'] = data['chunked'].lower() == 'true'
+        if 'timeout' in data:
+            try:
+                data['timeout'] = float(data['timeout'])
+            except ValueError:
+                pass  # La validación lo rechaza
+    elif req.is_json:
+        data = req.json()
+    else:
+        return None, 'Content-Type debe ser application/json'
+    return data, validate_translation_request(apply_timeout_header(data, req.headers))
+
+
+async def translate(req: _Request, receive, send):
+    """POST /api/translate"""
+    stats['total_requests'].inc()
+    data, error = _parse_translation(req)
+    if error:
+        stats['failed'].inc()
+        return await _send_json(send, 400, _error(error))
+
+    mode = request_mode(data)
+    from_lang, to_lang = parse_direction(data['direction'])
+    logger.info(f"Nueva petición - Direction: {data['direction']}, Mode: {mode}, Code length: {len(data['code'])}")
+
+    # El cliente ya tiene esta traducción: 304 sin volver a traducir
+    etag = translation_etag(make_cache_key(data['code'], from_lang, to_lang))
+    if etag_matches(req.headers.get('If-None-Match'), etag):
+        stats['not_modified'].inc()
+        logger.info("Traducción no modificada (If-None-Match), 304")
+        await send({'type': 'http.response.start', 'status': 304,
+                    'headers': [(b'etag', etag.encode())] + _CORS_HEADERS})
+        return await send({'type': 'http.response.body', 'body': b''})
+
+    deadline = Deadline(request_timeout(data))
+    task = asyncio.ensure_future(_translate(data['code'], from_lang, to_lang, use_chunked(data), deadline))
+    watcher = asyncio.ensure_future(_watch_disconnect(receive, deadline, task))
+    try:
+        translated_code, cached = await task
+    except asyncio.CancelledError:
+        # El cliente se fue: no hay a quién responder
+        stats['failed'].inc()
+        stats['cancelled'].inc()
+        return
+    except Exception as e:
+        status, payload, headers = _failure(e)
+        return await _send_json(send, status, payload, headers)
+    finally:
+        watcher.cancel()
+
+    stats['successful'].inc()
+    logger.info(f"Traducción exitosa - Resultado length: {len(translated_code)}")
+    await _send_json(send, 200, {
+        'success': True,
+        'translated_code': translated_code,
+        'from_lang': from_lang,
+        'to_lang': to_lang,
+        'mode': mode,
+        'cached': cached,
+        'timestamp': datetime.now().isoformat()
+    }, [(b'etag', etag.encode())])
+
+
+async def translate_stream(req: _Request, receive, send):
+    """GET/POST /api/translate/stream (mismos eventos que en api_server)"""
+    stats['total_requests'].inc()
+    data, error = _parse_translation(req)
+    if error:
+        stats['failed'].inc()
+        return await _send_json(send, 400, _error(error))
+
+    mode = request_mode(data)
+    from_lang, to_lang = parse_direction(data['direction'])
+    logger.info(f"Nueva petición stream - Direction: {data['direction']}, Code length: {len(data['code'])}")
+
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    deadline = Deadline(request_timeout(data))
+
+    def progress(event, payload):
+        # Llamado desde el hilo de la traducción
+        loop.call_soon_threadsafe(events.put_nowait, (event, payload))
+
+    async def worker():
+        try:
+            translated_code, cached = await _translate(data['code'], from_lang, to_lang, use_chunked(data),
+                                                       deadline, progress=progress)
+            stats['successful'].inc()
+            await events.put(('result', {
+                'success': True,
+                'translated_code': translated_code,
+                'from_lang': from_lang,
+                'to_lang': to_lang,
+                'mode': mode,
+                'cached': cached,
+                'timestamp': datetime.now().isoformat()
+            }))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            status, payload, headers = _failure(e)
+            payload.pop('timestamp')
+            if status != 500:
+                payload['status'] = status
+            await events.put(('error', payload))
+        finally:
+            await events.put(None)
+
+    task = asyncio.ensure_future(worker())
+    watcher = asyncio.ensure_future(_watch_disconnect(receive, deadline, task))
+
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [(b'content-type', b'text/event-stream; charset=utf-8'),
+                    (b'cache-control', b'no-cache'),
+                    (b'x-accel-buffering', b'no')] + _CORS_HEADERS,
+    })
+
+    async def emit(text: str):
+        await send({'type': 'http.response.body', 'body': text.encode('utf-8'), 'more_body': True})
+
+    try:
+        await emit(format_sse('queued', {'from_lang': from_lang, 'to_lang': to_lang, 'mode': mode}))
+        last_partial = ''
+        while True:
+            try:
+                item = await asyncio.wait_for(events.get(), SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                if task.done() and task.cancelled():
+                    break
+                # Comentario SSE para que proxies y clientes no corten la conexión
+                await emit(": keep-alive\n\n")
+                continue
+
+            if item is None:
+                break
+
+            event, payload = item
+            if event == 'partial':
+                text = payload['text']
+                if text.startswith(last_partial):
+                    payload = {'delta': text[len(last_partial):]}
+                else:
+                    payload = {'text': text, 'reset': True}
+                last_partial = text
+            await emit(format_sse(event, payload))
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        watcher.cancel()
+        if not task.done():
+            logger.info("Cliente del stream desconectado, cancelando la traducción")
+            deadline.cancel('cliente desconectado')
+            task.cancel()
+        elif task.cancelled():
+            stats['failed'].inc()
+            stats['cancelled'].inc()
+
+
+async def get_job(req: _Request, receive, send, job_id: str):
+    """GET /api/jobs/<id>?wait=N con el long-poll en el event loop"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return await _send_json(send, 404, _error('Trabajo no encontrado'))
+
+    try:
+        wait = float(req.args.get('wait', 0))
+    except ValueError:
+        wait = 0
+    if wait > 0:
+        expires_at = time.monotonic() + min(wait, JOB_MAX_WAIT)
+        while not job.finished and time.monotonic() < expires_at:
+            await asyncio.sleep(min(CLIENT_CHECK_INTERVAL / 4, expires_at - time.monotonic()))
+
+    response = job.to_dict()
+    response['success'] = job.status not in (Job.FAILED, Job.CANCELLED)
+    response['timestamp'] = datetime.now().isoformat()
+    await _send_json(send, 200, response)
+
+
+def _route(method: str, path: str):
+    """Handler nativo para la ruta, o None para delegarla en la aplicación Flask."""
+    if path == '/api/translate' and method == 'POST':
+        return translate, ()
+    if path == '/api/translate/stream' and method in ('GET', 'POST'):
+        return translate_stream, ()
+    match = _JOB_PATH.match(path)
+    if match and method == 'GET':
+        return get_job, (match.group(1),)
+    return None, ()
+
+
+def _wsgi_environ(scope, body: bytes) -> dict:
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'],
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for key, value in scope['headers']:
+        name = key.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            environ[name] = value
+        else:
+            name = f'HTTP_{name}'
+            environ[name] = f"{environ[name]},{value}" if name in environ else value
+    return environ
+
+
+def _call_wsgi(environ: dict):
+    """Ejecuta la aplicación Flask y devuelve (estado, cabeceras, cuerpo)."""
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response['status'] = int(status.split(' ', 1)[0])
+        response['headers'] = [(key.lower().encode('latin-1'), value.encode('latin-1'))
+                               for key, value in headers]
+
+    result = api_server.app(environ, start_response)
+    try:
+        body = b''.join(result)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return response['status'], response['headers'], body
+
+
+async def _delegate(scope, body: bytes, send):
+    loop = asyncio.get_running_loop()
+    status, headers, body = await loop.run_in_executor(_wsgi_executor, _call_wsgi, _wsgi_environ(scope, body))
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            start_browsers()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            scheduler.shutdown()
+            _wsgi_executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """Aplicación ASGI."""
+    if scope['type'] == 'lifespan':
+        return await _lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+
+    try:
+        body = await _read_body(receive)
+    except ConnectionResetError:
+        return
+
+    handler, args = _route(scope['method'], scope['path'])
+    if handler is None:
+        return await _delegate(scope, body, send)
+
+    started = time.perf_counter()
+    response = {'status': 500}
+
+    req = _Request(scope, body)
+    send = _compressing_send(send, req.headers.get('Accept-Encoding'))
+
+    async def tracked_send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+        await send(message)
+
+    try:
+        await handler(req, receive, tracked_send, *args)
+    finally:
+        REGISTRY.observe('http_request_seconds', time.perf_counter() - started,
+                         endpoint=handler.__name__, status=str(response['status']))
@@ -0,0 +1,161 @@
+"""
+Planificador asyncio de traducciones para el servidor ASGI.
+
+Las peticiones esperan turno como corrutinas (un semáforo de asyncio con
+cola acotada) en lugar de ocupar un hilo cada una; solo las traducciones
+admitidas pasan a un pool de hilos del tamaño de la concurrencia máxima,
+donde el trabajo de Selenium sigue siendo bloqueante. Las peticiones
+idénticas en curso se agrupan antes de pedir turno, así que los seguidores
+tampoco ocupan hilo ni hueco.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from admission import AdmissionRejected
+from deadline import TranslationCancelled
+
+
+class AsyncTranslationScheduler:
+    """
+    Cola de admisión y ejecución de traducciones para corrutinas.
+
+    Args:
+        max_concurrency: Traducciones ejecutándose a la vez (hilos del pool)
+        max_queue: Corrutinas que pueden esperar turno; el resto recibe 429
+        queue_timeout: Segundos máximos esperando turno antes de un 503
+        retry_after: Callable sin argumentos que estima el Retry-After
+    """
+
+    def __init__(self, max_concurrency=2, max_queue=8, queue_timeout=60.0, retry_after=None):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency debe ser al menos 1")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after or (lambda: 30)
+
+        self._executor = ThreadPoolExecutor(max_concurrency, thread_name_prefix='async-translate')
+        self._slots = None  # Se crea dentro del event loop
+        self._flights = {}
+        self._lock = threading.Lock()  # Solo protege los contadores que lee stats()
+
+        self._running = 0
+        self._queued = 0
+        self._admitted = 0
+        self._coalesced = 0
+        self._rejected_full = 0
+        self._rejected_timeout = 0
+
+    async def run(self, key: str, fn, deadline=None):
+        """
+        Ejecuta fn() en el pool de hilos cuando haya turno, una sola vez por
+        clave entre las corrutinas concurrentes.
+
+        Args:
+            key: Clave del trabajo (p. ej. la clave de caché)
+            fn: Callable bloqueante sin argumentos
+            deadline: Deadline de la petición; acota la espera de turno
+
+        Returns:
+            Tupla (resultado, compartido) como SingleFlight.do
+
+        Raises:
+            AdmissionRejected: Si la cola está llena o la espera se agota
+            TranslationCancelled: Si el deadline vence esperando turno
+            La misma excepción que lanzó fn()
+        """
+        while True:
+            flight = self._flights.get(key)
+            if flight is None:
+                break
+            with self._lock:
+                self._coalesced += 1
+            try:
+                # shield: si este seguidor se cancela, la traducción compartida sigue
+                return await asyncio.shield(flight), True
+            except TranslationCancelled:
+                # Se canceló la petición líder, no esta: reintentar como líder
+                if deadline is not None:
+                    deadline.check()
+
+        flight = self._flights[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await self._execute(fn, deadline)
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                e = TranslationCancelled("Traducción cancelada: cliente desconectado")
+            flight.set_exception(e)
+            flight.exception()  # Marcada como leída aunque no haya seguidores
+            raise
+        else:
+            flight.set_result(result)
+        finally:
+            del self._flights[key]
+        return result, False
+
+    async def _execute(self, fn, deadline):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+
+        if self._slots.locked():
+            if self._queued >= self.max_queue:
+                with self._lock:
+                    self._rejected_full += 1
+                raise AdmissionRejected(
+                    'Servidor saturado, demasiadas traducciones en espera',
+                    429, self.retry_after()
+                )
+
+            timeout = deadline.remaining(self.queue_timeout) if deadline is not None else self.queue_timeout
+            with self._lock:
+                self._queued += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout)
+            except asyncio.TimeoutError:
+                if deadline is not None:
+                    deadline.check()
+                with self._lock:
+                    self._rejected_timeout += 1
+                raise AdmissionRejected(
+                    'Tiempo de espera agotado esperando turno de traducción',
+                    503, self.retry_after()
+                )
+            finally:
+                with self._lock:
+                    self._queued -= 1
+        else:
+            await self._slots.acquire()
+
+        with self._lock:
+            self._running += 1
+            self._admitted += 1
+        future = asyncio.get_running_loop().run_in_executor(self._executor, fn)
+        # El hueco se libera cuando termina el hilo, no cuando se cancela la
+        # corrutina: si el cliente se va, la traducción aún tarda en notar el deadline
+        future.add_done_callback(self._release)
+        return await asyncio.shield(future)
+
+    def _release(self, future):
+        if not future.cancelled():
+            future.exception()  # Evita el aviso de excepción no leída
+        with self._lock:
+            self._running -= 1
+        self._slots.release()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'running': self._running,
+                'queued': self._queued,
+                'in_flight': len(self._flights),
+                'max_concurrency': self.max_concurrency,
+                'max_queue': self.max_queue,
+                'admitted': self._admitted,
+                'coalesced': self._coalesced,
+                'rejected_queue_full': self._rejected_full,
+                'rejected_timeout': self._rejected_timeout,
+            }
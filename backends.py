@@ -0,0 +1,206 @@
+"""
+Backends de traducción intercambiables.
+
+translate_code_zzzcode delega en una cadena de backends: el configurado en
+TRANSLATION_BACKEND y, si falla, TRANSLATION_BACKEND_FALLBACK. El backend
+'selenium' (en zzzcode_translator) maneja el formulario con Chrome; el
+backend 'http' envía directamente la petición que hace el formulario a
+CONVERTER_API_URL con una requests.Session (conexiones keep-alive
+reutilizadas), sin navegador.
+
+Contrato del endpoint HTTP: POST con JSON
+{"from_language": ..., "to_language": ..., "code": ...}; la respuesta puede
+ser JSON (con el código en "result", "output", "code" o "text"), texto plano
+o un stream text/event-stream cuyas líneas "data:" se concatenan.
+"""
+import logging
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+
+class BackendError(Exception):
+    """El backend no pudo producir una traducción."""
+
+
+class TranslationBackend:
+    """
+    Interfaz de un backend de traducción.
+
+    translate() devuelve una tupla (código traducido sin limpiar, estrategia)
+    o lanza BackendError; con un deadline (ver deadline.py) debe acotar sus
+    esperas a él y lanzar TranslationCancelled si se cancela o se agota.
+    """
+
+    name = None
+
+    def translate(self, code: str, from_lang: str, to_lang: str, pool=None, progress=None,
+                  deadline=None) -> tuple[str, str]:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def stats(self) -> dict:
+        return {}
+
+
+class HttpBackend(TranslationBackend):
+    """
+    Backend que llama directamente al endpoint del conversor.
+
+    Args:
+        url: Endpoint al que el formulario envía el código
+        timeout: Segundos máximos por petición
+        pool_size: Conexiones keep-alive que se mantienen abiertas
+    """
+
+    name = 'http'
+
+    _RESULT_KEYS = ('result', 'output', 'code', 'text')
+
+    def __init__(self, url: str, timeout: float = 60.0, pool_size: int = 8):
+        if not url:
+            raise ValueError("El backend http necesita CONVERTER_API_URL")
+
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'Accept': 'application/json, text/event-stream, text/plain'})
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._failures = 0
+
+    def _parse(self, response, deadline=None) -> str:
+        content_type = response.headers.get('Content-Type', '')
+
+        if 'text/event-stream' in content_type:
+            parts = []
+            for line in response.iter_lines(decode_unicode=True):
+                if deadline is not None:
+                    deadline.check()
+                if line and line.startswith('data:'):
+                    data = line[5:].lstrip()
+                    if data != '[DONE]':
+                        parts.append(data)
+            return ''.join(parts)
+
+        if 'json' in content_type:
+            data = response.json()
+            if isinstance(data, str):
+                return data
+            for key in self._RESULT_KEYS:
+                if isinstance(data.get(key), str):
+                    return data[key]
+            raise BackendError(f"Respuesta JSON sin código traducido: {list(data)}")
+
+        return response.text
+
+    def translate(self, code: str, from_lang: str, to_lang: str, pool=None, progress=None,
+                  deadline=None) -> tuple[str, str]:
+        timeout = self.timeout
+        if deadline is not None:
+            deadline.check()
+            timeout = deadline.remaining(timeout)
+
+        with self._lock:
+            self._requests += 1
+        try:
+            with REGISTRY.timer('translation_phase_seconds', phase='http_request',
+                                direction=f"{from_lang}->{to_lang}"):
+                response = self.session.post(
+                    self.url,
+                    json={'from_language': from_lang, 'to_language': to_lang, 'code': code},
+                    timeout=timeout,
+                    stream=True
+                )
+                with response:
+                    response.raise_for_status()
+                    if progress is not None:
+                        progress('submitted', {})
+                    result = self._parse(response, deadline)
+        except (requests.RequestException, ValueError, BackendError) as e:
+            with self._lock:
+                self._failures += 1
+            if deadline is not None:
+                # Un timeout provocado por el deadline se informa como tal
+                deadline.check()
+            raise BackendError(f"{self.url}: {e}") from e
+
+        if not result.strip():
+            with self._lock:
+                self._failures += 1
+            raise BackendError(f"{self.url}: respuesta vacía")
+        return result, 'http'
+
+    def close(self):
+        self.session.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'url': self.url, 'requests': self._requests, 'failures': self._failures}
+
+
+# Fábricas de backends por nombre; zzzcode_translator registra 'selenium'
+_FACTORIES = {
+    'http': lambda: HttpBackend(
+        os.environ.get('CONVERTER_API_URL', ''),
+        timeout=float(os.environ.get('CONVERTER_API_TIMEOUT', 60))
+    ),
+}
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def register_backend(name: str, factory):
+    """Registra una fábrica sin argumentos para el backend `name`."""
+    _FACTORIES[name] = factory
+
+
+def get_backend(name: str) -> TranslationBackend:
+    """Instancia (una sola vez por proceso) el backend `name`."""
+    with _instances_lock:
+        backend = _instances.get(name)
+        if backend is None:
+            if name not in _FACTORIES:
+                raise ValueError(f"Backend de traducción desconocido: {name}")
+            backend = _instances[name] = _FACTORIES[name]()
+        return backend
+
+
+def backend_chain() -> list:
+    """Nombres de los backends a probar en orden según la configuración."""
+    primary = os.environ.get('TRANSLATION_BACKEND', 'selenium')
+    fallback = os.environ.get('TRANSLATION_BACKEND_FALLBACK', 'selenium')
+    chain = [primary]
+    if fallback and fallback != primary:
+        chain.append(fallback)
+    return chain
+
+
+def backends_stats() -> dict:
+    """Estadísticas de los backends ya instanciados."""
+    with _instances_lock:
+        backends = dict(_instances)
+    return {'chain': backend_chain(), **{name: backend.stats() for name, backend in backends.items()}}
+
+
+def close_backends():
+    with _instances_lock:
+        backends = list(_instances.values())
+        _instances.clear()
+    for backend in backends:
+        try:
+            backend.close()
+        except Exception as e:
+            logger.warning(f"Error cerrando backend {backend.name}: {e}")
@@ -0,0 +1,87 @@
+"""
+Micro-benchmark de clean_translated_code sobre salidas sintéticas grandes.
+
+Genera salidas del conversor de miles de líneas (con comentarios iniciales,
+con todo el código comentado y con líneas que empiezan por `*`) y mide el
+tiempo medio de limpieza y las líneas por segundo.
+
+Ejemplos:
+    python benchmarks/bench_clean.py
+    python benchmarks/bench_clean.py --lines 1000 10000 100000 --repeat 5
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from zzzcode_translator import clean_translated_code
+
+_BODY = [
+    'int compute_{i}(int* values, int count) {{',
+    '    int total = 0; // acumulado',
+    '    *values = 0;',
+    '    const char* text = "/* no es un comentario */";',
+    '    for (int j = 0; j < count; j++) {{ total += values[j]; }}',
+    '    return total;',
+    '}}',
+    '',
+]
+
+
+def make_output(lines: int, kind: str) -> str:
+    """Salida sintética de unas `lines` líneas."""
+    header = [
+        '// Converted from C# to C++',
+        '/*',
+        ' * Generado automáticamente',
+        ' */',
+        '',
+        '#include <iostream>',
+        '',
+    ]
+    body = []
+    i = 0
+    while len(body) < lines:
+        body.extend(line.format(i=i) for line in _BODY)
+        i += 1
+
+    if kind == 'commented':
+        return '\n'.join('// ' + line for line in header[5:] + body)
+    return '\n'.join(header + body)
+
+
+def bench(text: str, repeat: int) -> float:
+    """Tiempo medio (segundos) de una limpieza."""
+    clean_translated_code(text, '', 'C++')  # Calentamiento
+    started = time.perf_counter()
+    for _ in range(repeat):
+        clean_translated_code(text, '', 'C++')
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmark de clean_translated_code')
+    parser.add_argument('--lines', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'caso':<12} {'líneas':>8} {'ms/llamada':>12} {'líneas/s':>12}")
+    for kind in ('normal', 'commented'):
+        for lines in args.lines:
+            text = make_output(lines, kind)
+            line_count = text.count('\n') + 1
+            # Silenciar los avisos que imprime la limpieza
+            stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+            try:
+                elapsed = bench(text, args.repeat)
+            finally:
+                sys.stdout.close()
+                sys.stdout = stdout
+            print(f"{kind:<12} {line_count:>8} {elapsed * 1000:>12.2f} {line_count / elapsed:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
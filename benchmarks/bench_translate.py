@@ -0,0 +1,265 @@
+"""
+Benchmark del pipeline de traducción contra el stand-in local del conversor.
+
+Lanza el servidor de fixtures, apunta CONVERTER_URL a él y ejecuta
+traducciones con la concurrencia indicada, directamente sobre
+translate_code_zzzcode y/o a través de /api/translate. Reporta
+peticiones por segundo, percentiles de latencia y RSS/CPU de los procesos
+de Chrome (requiere psutil).
+
+Ejemplos:
+    python benchmarks/bench_translate.py
+    python benchmarks/bench_translate.py --target api --concurrency 4 --requests 40
+    python benchmarks/bench_translate.py --delay 3000 --corpus "examples/*.cs"
+    python benchmarks/bench_translate.py --backend http --concurrency 8 --requests 200
+"""
+import argparse
+import glob
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.fixture_server import start_fixture_server
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+class ResourceSampler:
+    """Muestrea RSS y CPU de los procesos hijos (chromedriver y Chrome)."""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.peak_rss = 0
+        self.rss_samples = []
+        self._cpu_start = 0.0
+        self._cpu_end = 0.0
+        self._wall_start = 0.0
+        self._wall_end = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _children():
+        try:
+            return psutil.Process().children(recursive=True)
+        except psutil.Error:
+            return []
+
+    def _cpu_seconds(self):
+        total = 0.0
+        for child in self._children():
+            try:
+                times = child.cpu_times()
+                total += times.user + times.system
+            except psutil.Error:
+                continue
+        return total
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            rss = 0
+            for child in self._children():
+                try:
+                    rss += child.memory_info().rss
+                except psutil.Error:
+                    continue
+            self.rss_samples.append(rss)
+            self.peak_rss = max(self.peak_rss, rss)
+            # Los procesos terminados se llevan su CPU: acumular el máximo visto
+            self._cpu_end = max(self._cpu_end, self._cpu_seconds())
+
+    def start(self):
+        if psutil is None:
+            return
+        self._wall_start = time.perf_counter()
+        self._cpu_start = self._cpu_seconds()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if psutil is None or self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._wall_end = time.perf_counter()
+
+    def report(self) -> dict:
+        if psutil is None:
+            return {}
+        wall = (self._wall_end - self._wall_start) or 1.0
+        mean_rss = sum(self.rss_samples) / len(self.rss_samples) if self.rss_samples else 0
+        return {
+            'browser_peak_rss_mb': round(self.peak_rss / 1024 / 1024, 1),
+            'browser_mean_rss_mb': round(mean_rss / 1024 / 1024, 1),
+            'browser_cpu_percent': round(max(0.0, self._cpu_end - self._cpu_start) / wall * 100, 1),
+        }
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def load_corpus(pattern: str) -> list:
+    paths = sorted(glob.glob(os.path.join(ROOT_DIR, pattern)) or glob.glob(pattern))
+    if not paths:
+        raise SystemExit(f"No hay archivos para el corpus: {pattern}")
+    corpus = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            corpus.append(f.read())
+    return corpus
+
+
+def make_inputs(corpus: list, requests: int) -> list:
+    # Un comentario distinto por petición evita la caché y la deduplicación
+    return [f"{corpus[i % len(corpus)]}\n// bench {i}\n" for i in range(requests)]
+
+
+def run_load(fn, inputs: list, concurrency: int) -> dict:
+    """Ejecuta fn(código) -> bool para cada input y mide latencias."""
+    latencies = []
+    failures = 0
+    lock = threading.Lock()
+
+    def one(code):
+        nonlocal failures
+        start = time.perf_counter()
+        ok = fn(code)
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                failures += 1
+
+    sampler = ResourceSampler()
+    sampler.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, inputs))
+    wall = time.perf_counter() - started
+    sampler.stop()
+
+    result = {
+        'requests': len(inputs),
+        'failures': failures,
+        'concurrency': concurrency,
+        'wall_seconds': round(wall, 2),
+        'requests_per_second': round(len(inputs) / wall, 3),
+        'p50': round(percentile(latencies, 0.50), 3),
+        'p95': round(percentile(latencies, 0.95), 3),
+        'p99': round(percentile(latencies, 0.99), 3),
+        'max': round(max(latencies), 3),
+    }
+    result.update(sampler.report())
+    return result
+
+
+def bench_function(inputs: list, direction: str, concurrency: int) -> dict:
+    """Llama a translate_code_zzzcode con un DriverPool del tamaño de la concurrencia."""
+    from driver_pool import DriverPool
+    from zzzcode_translator import create_driver, parse_direction, reset_session, translate_code_zzzcode
+
+    from_lang, to_lang = parse_direction(direction)
+    pool = DriverPool(create_driver, max_size=concurrency, reset=reset_session)
+    try:
+        def translate(code):
+            result = translate_code_zzzcode(code, from_lang, to_lang, pool=pool)
+            return not result.startswith("Error en la traducción")
+
+        return run_load(translate, inputs, concurrency)
+    finally:
+        pool.close()
+
+
+def bench_api(inputs: list, direction: str, concurrency: int) -> dict:
+    """Levanta la API con Waitress en un puerto libre y le envía peticiones HTTP."""
+    import requests
+    from waitress import create_server
+
+    os.environ.setdefault('DRIVER_POOL_MAX_SIZE', str(concurrency))
+    os.environ.setdefault('MAX_CONCURRENT_TRANSLATIONS', str(concurrency))
+    os.environ.setdefault('MAX_QUEUED_TRANSLATIONS', str(len(inputs)))
+    os.environ.setdefault('ADMISSION_QUEUE_TIMEOUT', '600')
+    from api_server import app, driver_pool
+
+    server = create_server(app, host='127.0.0.1', port=0, threads=concurrency)
+    url = f"http://127.0.0.1:{server.effective_port}/api/translate"
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    session = requests.Session()
+    try:
+        def translate(code):
+            response = session.post(url, json={'code': code, 'direction': direction}, timeout=600)
+            return response.status_code == 200 and response.json().get('success')
+
+        return run_load(translate, inputs, concurrency)
+    finally:
+        server.close()
+        driver_pool.close()
+
+
+def print_report(name: str, result: dict):
+    print("\n" + "=" * 60)
+    print(f"📊 {name}")
+    print("=" * 60)
+    for key, value in result.items():
+        print(f"  {key:<22} {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark offline del pipeline de traducción')
+    parser.add_argument('--target', choices=['function', 'api', 'both'], default='both')
+    parser.add_argument('--concurrency', type=int, default=2)
+    parser.add_argument('--requests', type=int, default=10)
+    parser.add_argument('--delay', type=int, default=1500,
+                        help='Milisegundos que tarda el stand-in en escribir el resultado')
+    parser.add_argument('--chunks', type=int, default=4,
+                        help='Partes en las que el stand-in escribe el resultado')
+    parser.add_argument('--corpus', default='examples/*.cs')
+    parser.add_argument('--direction', default='cs_to_cpp')
+    parser.add_argument('--backend', choices=['selenium', 'http'], default='selenium',
+                        help='Backend de traducción; http llama directamente a /api/convert del stand-in')
+    args = parser.parse_args()
+
+    server, base_url = start_fixture_server()
+    os.environ['CONVERTER_URL'] = f"{base_url}?delay={args.delay}&chunks={args.chunks}"
+    os.environ['TRANSLATION_BACKEND'] = args.backend
+    if args.backend == 'http':
+        api_url = base_url.replace('/code-converter', '/api/convert')
+        os.environ['CONVERTER_API_URL'] = f"{api_url}?delay={args.delay}"
+        print(f"Backend HTTP: {os.environ['CONVERTER_API_URL']}")
+    import zzzcode_translator
+    zzzcode_translator.CONVERTER_URL = os.environ['CONVERTER_URL']
+    print(f"Conversor local: {os.environ['CONVERTER_URL']}")
+
+    if psutil is None:
+        print("⚠️ psutil no está instalado: no se medirá RSS/CPU del navegador (pip install psutil)")
+
+    inputs = make_inputs(load_corpus(args.corpus), args.requests)
+
+    try:
+        if args.target in ('function', 'both'):
+            print_report('translate_code_zzzcode',
+                         bench_function(inputs, args.direction, args.concurrency))
+        if args.target in ('api', 'both'):
+            print_report('POST /api/translate',
+                         bench_api(inputs, args.direction, args.concurrency))
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Servidor HTTP local que sirve el stand-in del conversor de zzzcode.ai.
+
+Uso:
+    python benchmarks/fixture_server.py --port 8765
+
+y luego apuntar el traductor a él:
+    CONVERTER_URL="http://127.0.0.1:8765/code-converter?delay=1500" python zzzcode_translator.py ...
+
+o usar el backend HTTP contra su endpoint /api/convert (el mismo al que
+envía el formulario):
+    TRANSLATION_BACKEND=http CONVERTER_API_URL="http://127.0.0.1:8765/api/convert" python zzzcode_translator.py ...
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def convert(code: str, from_lang: str, to_lang: str) -> str:
+    """Traducción de juguete del stand-in: cabecera de comentario y un reemplazo."""
+    return f"// Converted from {from_lang} to {to_lang}\n" + code.replace('Console.WriteLine', 'std::cout <<')
+
+
+class ConverterHandler(SimpleHTTPRequestHandler):
+    """
+    Sirve fixtures/converter.html en /code-converter y el endpoint
+    POST /api/convert que usa su formulario.
+
+    /api/convert acepta ?delay=<ms> y ?fail=<código HTTP> para simular un
+    endpoint lento o caído.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=FIXTURES_DIR, **kwargs)
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] == '/code-converter':
+            self.path = '/converter.html'
+        return super().do_GET()
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != '/api/convert':
+            self.send_error(404)
+            return
+
+        params = parse_qs(url.query)
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            data = json.loads(self.rfile.read(length) or b'{}')
+            code = data['code']
+            from_lang, to_lang = data['from_language'], data['to_language']
+        except (ValueError, KeyError, TypeError):
+            self.send_error(400, 'JSON inválido')
+            return
+
+        if 'fail' in params:
+            self.send_error(int(params['fail'][0]))
+            return
+        if 'delay' in params:
+            time.sleep(int(params['delay'][0]) / 1000)
+
+        body = json.dumps({'result': convert(code, from_lang, to_lang)}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Silencioso: los benchmarks generan cientos de peticiones
+        pass
+
+
+def start_fixture_server(host: str = '127.0.0.1', port: int = 0):
+    """
+    Arranca el servidor en un hilo daemon.
+
+    Returns:
+        Tupla (servidor, URL base del conversor)
+    """
+    server = ThreadingHTTPServer((host, port), ConverterHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}/code-converter"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stand-in local del conversor de zzzcode.ai')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), ConverterHandler)
+    print(f"Conversor local en: http://{args.host}:{args.port}/code-converter")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
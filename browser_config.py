@@ -0,0 +1,158 @@
+"""
+Resolución única y cacheada de las rutas de Chrome/Chromium y ChromeDriver.
+
+Las rutas se buscan una sola vez por proceso (variables de entorno, PATH,
+perfil de Nix de Replit, /nix/store y, para ChromeDriver, webdriver-manager
+como último recurso) y se reutilizan en cada sesión. `prefetch()` hace la
+resolución por adelantado, descarga ChromeDriver si hace falta y guarda el
+resultado en BROWSER_CONFIG_FILE para que los arranques siguientes (por
+ejemplo en la imagen de un contenedor) no tengan que buscar nada.
+"""
+import glob
+import json
+import os
+import shutil
+import sys
+import threading
+
+# Fichero donde prefetch() guarda las rutas resueltas
+BROWSER_CONFIG_FILE = os.environ.get(
+    'BROWSER_CONFIG_FILE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.browser_config.json')
+)
+
+_CHROME_NAMES = ('chromium', 'chromium-browser', 'google-chrome')
+_CHROME_PATTERNS = (
+    '/home/runner/.nix-profile/bin/chromium',
+    '/nix/store/*-chromium-*/bin/chromium',
+    '/usr/bin/chromium',
+    '/usr/bin/chromium-browser',
+    '/usr/bin/google-chrome',
+)
+_CHROMEDRIVER_PATTERNS = (
+    '/home/runner/.nix-profile/bin/chromedriver',
+    '/nix/store/*-chromedriver-*/bin/chromedriver',
+)
+
+
+def _is_executable(path) -> bool:
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+def _find(env_var: str, names: tuple, patterns: tuple):
+    """Primera ruta ejecutable: variable de entorno, PATH y patrones conocidos."""
+    path = os.environ.get(env_var)
+    if _is_executable(path):
+        return path
+
+    for name in names:
+        path = shutil.which(name)
+        if path:
+            return path
+
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            if _is_executable(path):
+                return path
+    return None
+
+
+class BrowserConfig:
+    """
+    Rutas validadas del navegador y de ChromeDriver.
+
+    Attributes:
+        chrome_binary: Ejecutable de Chrome/Chromium (None = el que encuentre Selenium)
+        chromedriver_path: Ejecutable de ChromeDriver
+        source: Cómo se resolvió ChromeDriver ('env', 'system', 'webdriver-manager', 'file')
+    """
+
+    def __init__(self, chrome_binary, chromedriver_path, source):
+        self.chrome_binary = chrome_binary
+        self.chromedriver_path = chromedriver_path
+        self.source = source
+
+    @classmethod
+    def resolve(cls):
+        """
+        Busca las rutas en el sistema.
+
+        Raises:
+            Exception: Si webdriver-manager no puede obtener ChromeDriver
+        """
+        chrome_binary = None
+        if os.environ.get('REPLIT') or sys.platform.startswith('linux'):
+            chrome_binary = _find('CHROME_BIN', _CHROME_NAMES, _CHROME_PATTERNS)
+
+        source = 'env' if _is_executable(os.environ.get('CHROMEDRIVER_PATH')) else 'system'
+        chromedriver_path = _find('CHROMEDRIVER_PATH', ('chromedriver',), _CHROMEDRIVER_PATTERNS)
+        if chromedriver_path is None:
+            from webdriver_manager.chrome import ChromeDriverManager
+            from webdriver_manager.core.os_manager import ChromeType
+
+            print("⚠️ ChromeDriver no encontrado en el sistema, usando webdriver-manager...")
+            if os.environ.get('REPLIT'):
+                manager = ChromeDriverManager(chrome_type=ChromeType.CHROMIUM)
+            else:
+                manager = ChromeDriverManager()
+            chromedriver_path = manager.install()
+            source = 'webdriver-manager'
+
+        return cls(chrome_binary, chromedriver_path, source)
+
+    @classmethod
+    def load(cls, path: str = BROWSER_CONFIG_FILE):
+        """Carga una configuración guardada; None si no existe o ya no es válida."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        config = cls(data.get('chrome_binary'), data.get('chromedriver_path'), 'file')
+        return config if config.is_valid() else None
+
+    def save(self, path: str = BROWSER_CONFIG_FILE):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'chrome_binary': self.chrome_binary,
+                'chromedriver_path': self.chromedriver_path,
+            }, f, indent=2)
+
+    def is_valid(self) -> bool:
+        """Las rutas siguen existiendo y son ejecutables."""
+        if self.chrome_binary and not _is_executable(self.chrome_binary):
+            return False
+        return _is_executable(self.chromedriver_path)
+
+    def to_dict(self) -> dict:
+        return {
+            'chrome_binary': self.chrome_binary,
+            'chromedriver_path': self.chromedriver_path,
+            'source': self.source,
+        }
+
+
+_config = None
+_config_lock = threading.Lock()
+
+
+def get_browser_config(refresh: bool = False) -> BrowserConfig:
+    """
+    Configuración del navegador, resuelta la primera vez que se pide.
+
+    Usa la guardada por prefetch() si sigue siendo válida; si no, busca en el
+    sistema. Los fallos no se cachean, así que el siguiente uso reintenta.
+    """
+    global _config
+    with _config_lock:
+        if _config is None or refresh or not _config.is_valid():
+            _config = (not refresh and BrowserConfig.load()) or BrowserConfig.resolve()
+        return _config
+
+
+def prefetch(path: str = BROWSER_CONFIG_FILE) -> BrowserConfig:
+    """Resuelve (y descarga si hace falta) las rutas y las guarda en `path`."""
+    config = get_browser_config(refresh=True)
+    config.save(path)
+    return config
@@ -0,0 +1,257 @@
+"""
+Varias traducciones a la vez dentro de un mismo Chrome, una por pestaña.
+
+Cada Chromium cuesta cientos de MB; con BROWSER_TABS > 1 cada navegador
+aloja varias pestañas y cada pestaña es una "sesión" independiente del
+DriverPool, que hace de planificador asignando traducciones a pestañas
+libres. Una sesión de WebDriver solo tiene una ventana activa, así que cada
+pestaña es una copia del driver cuyos comandos cambian primero a su ventana
+bajo el cerrojo del navegador: los comandos de pestañas distintas se
+intercalan y las esperas (la mayor parte de una traducción) ocurren en
+paralelo.
+
+Las pestañas de un mismo navegador comparten cookies y almacenamiento, por
+lo que no se resetean entre traducciones (recargar el conversor basta).
+También comparten el log de rendimiento: al leerlo una pestaña, las entradas
+de las demás se guardan para que cada una reciba solo las de su ventana.
+"""
+import json
+import logging
+import threading
+
+from selenium.webdriver.remote.command import Command
+
+logger = logging.getLogger(__name__)
+
+
+class _Browser:
+    """Un Chrome compartido y las ventanas de sus pestañas."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.lock = threading.RLock()
+        self.current = driver.current_window_handle
+        self.spare = [self.current]  # Ventana inicial, aún sin pestaña asignada
+        self.tabs = 0
+        self.dead = False
+        self.logs = {}  # Id de ventana -> entradas del log de rendimiento pendientes
+
+
+def _target_id(handle: str) -> str:
+    """Id de la ventana tal como aparece en el campo webview del log de rendimiento."""
+    return handle[len('CDwindow-'):] if handle.startswith('CDwindow-') else handle
+
+
+_tab_classes = {}
+
+
+def _tab_class(driver_class):
+    """Subclase del driver que enruta cada comando a la ventana de su pestaña."""
+    cls = _tab_classes.get(driver_class)
+    if cls is not None:
+        return cls
+
+    class TabDriver(driver_class):
+        def execute(self, driver_command, params=None):
+            browser = self._tab_browser
+            with browser.lock:
+                if browser.current != self._tab_handle and driver_command != Command.SWITCH_TO_WINDOW:
+                    driver_class.execute(self, Command.SWITCH_TO_WINDOW, {'handle': self._tab_handle})
+                    browser.current = self._tab_handle
+                response = driver_class.execute(self, driver_command, params)
+                if driver_command == Command.SWITCH_TO_WINDOW:
+                    browser.current = params.get('handle')
+                return response
+
+        def get_log(self, log_type):
+            if log_type != 'performance':
+                return driver_class.get_log(self, log_type)
+            browser = self._tab_browser
+            with browser.lock:
+                # El log es de toda la sesión: repartirlo entre las pestañas abiertas
+                for entry in driver_class.get_log(self, log_type):
+                    try:
+                        webview = json.loads(entry['message']).get('webview')
+                    except (KeyError, ValueError, TypeError, AttributeError):
+                        continue
+                    pending = browser.logs.get(webview)
+                    if pending is not None:
+                        pending.append(entry)
+                own = browser.logs.get(_target_id(self._tab_handle))
+                if own is None:
+                    return []
+                entries = list(own)
+                own.clear()
+                return entries
+
+        def quit(self):
+            self._tab_owner._close_tab(self)
+
+    TabDriver.__name__ = f"Tab{driver_class.__name__}"
+    _tab_classes[driver_class] = cls = TabDriver
+    return cls
+
+
+class TabbedBrowsers:
+    """
+    Fábrica de pestañas para un DriverPool.
+
+    Args:
+        factory: Callable sin argumentos que lanza un Chrome (create_driver)
+        tabs_per_browser: Pestañas máximas por navegador; al llenarse uno se
+            lanza otro
+        setup: Callable opcional aplicado a cada pestaña nueva (p. ej. el
+            bloqueo de recursos, que en CDP es por pestaña)
+    """
+
+    def __init__(self, factory, tabs_per_browser: int = 4, setup=None):
+        if tabs_per_browser < 1:
+            raise ValueError("tabs_per_browser debe ser al menos 1")
+        self.factory = factory
+        self.tabs_per_browser = tabs_per_browser
+        self.setup = setup
+        self._lock = threading.Lock()
+        self._launch_lock = threading.Lock()
+        self._browsers = []
+        self._launched = 0
+
+    @staticmethod
+    def _alive(browser) -> bool:
+        try:
+            with browser.lock:
+                browser.driver.window_handles
+            return True
+        except Exception:
+            return False
+
+    def _pick_browser(self):
+        """Navegador con hueco (reservándolo) o None si hay que lanzar otro."""
+        with self._lock:
+            for browser in self._browsers:
+                if not browser.dead and browser.tabs < self.tabs_per_browser:
+                    browser.tabs += 1
+                    return browser
+        return None
+
+    def _launch(self):
+        """Reserva un hueco en un navegador nuevo (o en el que acaba de lanzar otro hilo)."""
+        # Un lanzamiento a la vez: las peticiones que llegan juntas comparten
+        # el navegador nuevo en lugar de lanzar uno cada una
+        with self._launch_lock:
+            browser = self._pick_browser()
+            if browser is not None:
+                return browser
+            browser = _Browser(self.factory())
+            browser.tabs = 1
+            with self._lock:
+                self._browsers.append(browser)
+                self._launched += 1
+            return browser
+
+    def new_tab(self):
+        """Abre una pestaña en un navegador con hueco (lanzando uno si hace falta)."""
+        while True:
+            browser = self._pick_browser()
+            if browser is None:
+                browser = self._launch()
+            elif not self._alive(browser):
+                logger.warning("Navegador con pestañas caído, descartándolo")
+                self._discard(browser)
+                continue
+
+            try:
+                with browser.lock:
+                    if browser.spare:
+                        handle = browser.spare.pop()
+                    else:
+                        # Abrir una ventana exige que la activa siga existiendo
+                        handles = browser.driver.window_handles
+                        if browser.current not in handles:
+                            browser.driver.switch_to.window(handles[0])
+                            browser.current = handles[0]
+                        browser.driver.switch_to.new_window('tab')
+                        handle = browser.current = browser.driver.current_window_handle
+            except Exception:
+                self._release_slot(browser)
+                raise
+
+            tab = self._make_tab(browser, handle)
+            if self.setup is not None:
+                try:
+                    self.setup(tab)
+                except Exception:
+                    tab.quit()
+                    raise
+            return tab
+
+    def _make_tab(self, browser, handle):
+        driver = browser.driver
+        tab = object.__new__(_tab_class(type(driver)))
+        tab.__dict__.update(driver.__dict__)
+        # Los ayudantes que guardan una referencia al driver (switch_to, mobile...)
+        # deben apuntar a la pestaña
+        for key, value in driver.__dict__.items():
+            if hasattr(value, '_driver'):
+                setattr(tab, key, type(value)(tab))
+        tab._tab_browser = browser
+        tab._tab_handle = handle
+        tab._tab_owner = self
+        with browser.lock:
+            browser.logs[_target_id(handle)] = []
+        return tab
+
+    def _close_tab(self, tab):
+        browser = tab._tab_browser
+        with browser.lock:
+            browser.logs.pop(_target_id(tab._tab_handle), None)
+        if self._release_slot(browser):
+            return
+        try:
+            with browser.lock:
+                # Cerrar la última ventana terminaría el navegador: se guarda para reutilizarla
+                if len(browser.driver.window_handles) > 1:
+                    tab.close()
+                else:
+                    browser.spare.append(tab._tab_handle)
+        except Exception as e:
+            logger.warning(f"Error cerrando pestaña: {e}")
+
+    def _release_slot(self, browser) -> bool:
+        """Libera un hueco; si era el último cierra el navegador y devuelve True."""
+        with self._lock:
+            browser.tabs -= 1
+            last = browser.tabs <= 0
+            if last and browser in self._browsers:
+                self._browsers.remove(browser)
+        if last:
+            self._quit(browser)
+        return last
+
+    def _discard(self, browser):
+        """Marca un navegador como caído; se cierra al soltar su última pestaña."""
+        browser.dead = True
+        self._release_slot(browser)
+
+    @staticmethod
+    def _quit(browser):
+        try:
+            browser.driver.quit()
+        except Exception as e:
+            logger.warning(f"Error cerrando navegador con pestañas: {e}")
+
+    def close(self):
+        """Cierra todos los navegadores (las pestañas prestadas dejan de funcionar)."""
+        with self._lock:
+            browsers = list(self._browsers)
+            self._browsers.clear()
+        for browser in browsers:
+            self._quit(browser)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'tabs_per_browser': self.tabs_per_browser,
+                'browsers': len(self._browsers),
+                'tabs': sum(browser.tabs for browser in self._browsers),
+                'launched': self._launched,
+            }
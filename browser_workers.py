@@ -0,0 +1,511 @@
+"""
+Procesos trabajadores que aíslan los navegadores del proceso de la API.
+
+Cada trabajador es un proceso aparte (en su propio grupo de procesos, junto
+con su chromedriver y su Chrome) que mantiene una sesión de Chrome y
+ejecuta las traducciones que le envía la API por un socket local
+autenticado (multiprocessing.connection). Un supervisor reinicia los
+trabajadores que mueren, que superan el presupuesto de memoria o que se
+pasan del tiempo máximo por tarea, sin afectar al resto de la API.
+
+El trabajador se lanza ejecutando este mismo archivo, no con
+multiprocessing: así no se reimporta el módulo principal del servidor.
+"""
+import itertools
+import logging
+import os
+import secrets
+import signal
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+import resource_filter
+from deadline import Deadline, DeadlineExceeded, TranslationCancelled
+from driver_pool import PoolTimeout
+from metrics import REGISTRY
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+
+def _tree_rss(pid: int):
+    """
+    RSS total (bytes) del trabajador y sus hijos (chromedriver, Chrome).
+
+    Usa psutil si está instalado; si no, en Linux suma /proc de los procesos
+    del grupo del trabajador. Devuelve None si no se puede medir.
+    """
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+            total = process.memory_info().rss
+            for child in process.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except psutil.Error:
+                    continue
+            return total
+        except psutil.Error:
+            return None
+
+    if not os.path.isdir('/proc'):
+        return None
+
+    total = 0
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+            # fields[2] es el pgrp y fields[21] el RSS en páginas
+            if int(fields[2]) == pid:
+                total += int(fields[21]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+    return total
+
+
+class _Worker:
+    """Estado de un proceso trabajador visto desde la API."""
+
+    def __init__(self, worker_id: int, process):
+        self.id = worker_id
+        self.process = process
+        self.conn = None
+        self.busy = False
+        self.tasks = 0
+        self.started_at = time.monotonic()
+        self.retire = None  # Motivo para reiniciarlo al terminar la tarea en curso
+        self.warm = False  # Abrió Chrome y cargó el conversor al arrancar
+        self.rss = None
+
+    @property
+    def ready(self) -> bool:
+        return self.conn is not None and not self.busy and self.retire is None
+
+
+class WorkerPool:
+    """
+    Pool de procesos trabajadores, cada uno con su propia sesión de Chrome.
+
+    Args:
+        size: Número de procesos trabajadores
+        task_timeout: Segundos máximos por tarea; al superarlos el trabajador
+            se mata (con su navegador) y se reemplaza
+        max_rss_mb: Presupuesto de memoria por trabajador, navegador incluido
+            (0 = sin límite)
+        max_tasks: Tareas tras las cuales un trabajador se recicla
+        acquire_timeout: Segundos máximos esperando un trabajador libre
+        check_interval: Segundos entre revisiones del supervisor
+    """
+
+    # Segundos que se espera a que un trabajador suelte una tarea cancelada
+    CANCEL_GRACE_SECONDS = 5.0
+
+    def __init__(self, size=2, task_timeout=300.0, max_rss_mb=0, max_tasks=200,
+                 acquire_timeout=120.0, check_interval=5.0):
+        if size < 1:
+            raise ValueError("size debe ser al menos 1")
+
+        self.size = size
+        self.task_timeout = task_timeout
+        self.max_rss_mb = max_rss_mb
+        self.max_tasks = max_tasks
+        self.acquire_timeout = acquire_timeout
+        self.check_interval = check_interval
+
+        self._lock = threading.Condition()
+        self._workers = {}
+        self._ids = itertools.count(1)
+        self._task_ids = itertools.count(1)
+        self._authkey = secrets.token_bytes(16)
+        self._listener = None
+        self._closed = False
+
+        self._tasks = 0
+        self._restarts = {'crashed': 0, 'timeout': 0, 'memory': 0, 'recycled': 0, 'cancelled': 0}
+
+    def start(self):
+        """Abre el socket local, lanza los trabajadores y el supervisor."""
+        self._listener = Listener(('127.0.0.1', 0), authkey=self._authkey)
+        threading.Thread(target=self._accept_loop, name='browser-workers-accept', daemon=True).start()
+        for _ in range(self.size):
+            self._spawn()
+        threading.Thread(target=self._supervise, name='browser-workers-supervisor', daemon=True).start()
+        if self.max_rss_mb and psutil is None and not os.path.isdir('/proc'):
+            logger.warning("Sin psutil ni /proc: no se aplicará el presupuesto de memoria")
+
+    def _spawn(self):
+        worker_id = next(self._ids)
+        host, port = self._listener.address
+        env = dict(os.environ)
+        env.update({
+            'BROWSER_WORKER_ID': str(worker_id),
+            'BROWSER_WORKER_ADDRESS': f"{host}:{port}",
+            'BROWSER_WORKER_AUTHKEY': self._authkey.hex(),
+        })
+        kwargs = {}
+        if os.name == 'posix':
+            # Grupo propio: al matar al trabajador caen también chromedriver y Chrome
+            kwargs['start_new_session'] = True
+        else:
+            kwargs['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+        process = subprocess.Popen([sys.executable, os.path.abspath(__file__)], env=env, **kwargs)
+
+        with self._lock:
+            self._workers[worker_id] = _Worker(worker_id, process)
+        logger.info(f"Trabajador {worker_id} lanzado (pid {process.pid})")
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                return  # Listener cerrado
+            except Exception as e:
+                logger.warning(f"Conexión de trabajador rechazada: {e}")
+                continue
+
+            try:
+                _, worker_id, warm = conn.recv()
+            except (EOFError, OSError, ValueError, TypeError):
+                conn.close()
+                continue
+
+            with self._lock:
+                worker = self._workers.get(worker_id)
+                if worker is None or worker.conn is not None:
+                    conn.close()
+                    continue
+                worker.conn = conn
+                worker.warm = warm
+                self._lock.notify_all()
+            logger.info(f"Trabajador {worker_id} listo")
+
+    @staticmethod
+    def _kill(worker):
+        """Mata el trabajador y todo su grupo de procesos."""
+        try:
+            if os.name == 'posix':
+                os.killpg(worker.process.pid, signal.SIGKILL)
+            else:
+                worker.process.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+        try:
+            worker.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            logger.warning(f"El trabajador {worker.id} no terminó tras SIGKILL")
+        if worker.conn is not None:
+            worker.conn.close()
+
+    def _restart(self, worker, reason: str):
+        """Reemplaza un trabajador; requiere que nadie lo esté usando."""
+        logger.warning(f"Reiniciando trabajador {worker.id} ({reason})")
+        with self._lock:
+            self._workers.pop(worker.id, None)
+            self._restarts[reason] += 1
+            closed = self._closed
+        self._kill(worker)
+        if not closed:
+            self._spawn()
+
+    def _acquire(self, timeout: float, deadline=None):
+        expires_at = time.monotonic() + timeout
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise RuntimeError("El pool de trabajadores está cerrado")
+                for worker in self._workers.values():
+                    if worker.ready:
+                        worker.busy = True
+                        return worker
+                remaining = expires_at - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(f"No hay trabajadores libres tras {timeout:g}s")
+                if deadline is not None:
+                    remaining = deadline.wait_slice(remaining)
+                self._lock.wait(remaining)
+
+    def _release(self, worker, failure: str = None):
+        with self._lock:
+            worker.busy = False
+            worker.tasks += 1
+            self._tasks += 1
+            reason = failure or worker.retire
+            if reason is None and worker.tasks >= self.max_tasks:
+                reason = 'recycled'
+            if reason is None:
+                self._lock.notify_all()
+                return
+        self._restart(worker, reason)
+
+    def _run(self, kind: str, payload, progress=None, deadline=None):
+        """
+        Envía una tarea a un trabajador libre y espera su resultado.
+
+        Con deadline, el trabajador recibe el tiempo restante y, si la
+        petición se cancela, un mensaje 'cancel' para que suelte la tarea; si
+        no lo hace en CANCEL_GRACE_SECONDS se mata y se reemplaza.
+
+        Raises:
+            PoolTimeout: Si no hay trabajador libre a tiempo
+            RuntimeError: Si el trabajador muere o se pasa del tiempo máximo
+            TranslationCancelled: Si el deadline se cancela o se agota
+        """
+        worker = self._acquire(self.acquire_timeout, deadline)
+        task_id = next(self._task_ids)
+        failure = None
+        cancel_sent_at = None
+        try:
+            timeout = deadline.remaining() if deadline is not None else None
+            worker.conn.send((kind, task_id, payload, timeout))
+            expires_at = time.monotonic() + self.task_timeout
+            while True:
+                remaining = expires_at - time.monotonic()
+                if remaining <= 0:
+                    failure = 'timeout'
+                    raise RuntimeError(f"el trabajador superó el tiempo máximo de {self.task_timeout:g}s")
+
+                if deadline is not None and (deadline.cancelled or deadline.expired):
+                    if cancel_sent_at is None:
+                        worker.conn.send(('cancel', task_id, deadline.reason, None))
+                        cancel_sent_at = time.monotonic()
+                    elif time.monotonic() - cancel_sent_at > self.CANCEL_GRACE_SECONDS:
+                        failure = 'cancelled'
+                        deadline.check()
+
+                # Con deadline se revisa más a menudo para reenviar la cancelación pronto
+                poll = 0.25 if deadline is not None else 1.0
+                if not worker.conn.poll(min(remaining, poll)):
+                    if worker.process.poll() is not None:
+                        failure = 'crashed'
+                        raise RuntimeError(f"el trabajador terminó inesperadamente ({worker.process.returncode})")
+                    continue
+
+                message = worker.conn.recv()
+                if message[0] == 'metrics':
+                    # Latencias por fase y estrategia medidas en el trabajador (también
+                    # las de una tarea anterior cancelada que llegan tarde)
+                    REGISTRY.merge_observations(message[2])
+                elif message[0] == 'progress' and message[1] == task_id:
+                    if message[2] == 'resources':
+                        # Los totales de tráfico se llevan en el proceso de la API
+                        resource_filter.record(message[3])
+                    if progress is not None:
+                        try:
+                            progress(message[2], message[3])
+                        except Exception as e:
+                            logger.warning(f"Error en callback de progreso: {e}")
+                elif message[0] == 'done' and message[1] == task_id:
+                    return message[2]
+                elif message[0] == 'cancelled' and message[1] == task_id:
+                    expired, reason = message[2]
+                    if deadline is not None:
+                        deadline.check()
+                    raise (DeadlineExceeded if expired else TranslationCancelled)(reason)
+        except (EOFError, OSError) as e:
+            failure = 'crashed'
+            raise RuntimeError(f"se perdió la conexión con el trabajador: {e}") from e
+        finally:
+            self._release(worker, failure)
+
+    def translate(self, code: str, from_lang: str, to_lang: str, progress=None, deadline=None) -> str:
+        """
+        Traduce en un proceso trabajador; misma interfaz que translate_code_zzzcode.
+
+        Returns:
+            Código traducido o un mensaje "Error en la traducción: ..."
+        """
+        try:
+            return self._run('translate', (code, from_lang, to_lang), progress, deadline)
+        except (PoolTimeout, RuntimeError) as e:
+            return f"Error en la traducción: {str(e)}"
+
+    def translate_batch(self, items: list, deadline=None) -> list:
+        """Traduce un lote en un solo trabajador; misma interfaz que translate_batch."""
+        try:
+            return self._run('batch', list(items), deadline=deadline)
+        except (PoolTimeout, RuntimeError) as e:
+            return [f"Error en la traducción: {str(e)}"] * len(items)
+
+    def warm_count(self) -> int:
+        """Trabajadores conectados que arrancaron con Chrome y el conversor cargados."""
+        with self._lock:
+            return sum(1 for worker in self._workers.values() if worker.conn is not None and worker.warm)
+
+    def _claim(self, worker) -> bool:
+        """Reserva un trabajador libre para reiniciarlo desde el supervisor."""
+        with self._lock:
+            if worker.busy or self._workers.get(worker.id) is not worker:
+                return False
+            worker.busy = True
+            return True
+
+    def _supervise(self):
+        while True:
+            time.sleep(self.check_interval)
+            with self._lock:
+                if self._closed:
+                    return
+                workers = list(self._workers.values())
+
+            # Quien usa un trabajador detecta sus muertes y timeouts; aquí los libres
+            for worker in workers:
+                if not worker.busy and worker.process.poll() is not None:
+                    if self._claim(worker):
+                        self._restart(worker, 'crashed')
+                    continue
+
+                if not self.max_rss_mb:
+                    continue
+                worker.rss = _tree_rss(worker.process.pid)
+                if worker.rss is None or worker.rss <= self.max_rss_mb * 1024 * 1024:
+                    continue
+
+                if worker.busy:
+                    # Se reinicia en cuanto termine la tarea en curso
+                    worker.retire = 'memory'
+                elif self._claim(worker):
+                    self._restart(worker, 'memory')
+
+    def close(self):
+        """Detiene todos los trabajadores."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            workers = list(self._workers.values())
+            self._workers.clear()
+            self._lock.notify_all()
+
+        for worker in workers:
+            if worker.conn is not None and not worker.busy:
+                try:
+                    worker.conn.send(('stop', None, None, None))
+                    worker.process.wait(timeout=10)
+                except (OSError, subprocess.TimeoutExpired):
+                    pass
+            self._kill(worker)
+
+        if self._listener is not None:
+            self._listener.close()
+
+    def stats(self) -> dict:
+        """Estado de los trabajadores y reinicios por motivo."""
+        with self._lock:
+            return {
+                'size': self.size,
+                'ready': sum(1 for worker in self._workers.values() if worker.ready),
+                'warm': sum(1 for worker in self._workers.values() if worker.conn is not None and worker.warm),
+                'busy': sum(1 for worker in self._workers.values() if worker.busy),
+                'tasks': self._tasks,
+                'restarts': dict(self._restarts),
+                'max_rss_mb': self.max_rss_mb,
+                'workers': [
+                    {
+                        'id': worker.id,
+                        'pid': worker.process.pid,
+                        'busy': worker.busy,
+                        'tasks': worker.tasks,
+                        'rss_mb': round(worker.rss / 1024 / 1024, 1) if worker.rss else None,
+                        'uptime': round(time.monotonic() - worker.started_at, 1),
+                    }
+                    for worker in self._workers.values()
+                ],
+            }
+
+
+def _worker_main():
+    """Bucle del proceso trabajador: una sesión de Chrome, una tarea a la vez (cancelable)."""
+    from driver_pool import DriverPool
+    from zzzcode_translator import (
+        create_driver, reset_session, translate_batch, translate_code_zzzcode, warm_session
+    )
+
+    # Los histogramas de este proceso no se exportan: se reenvían a la API
+    REGISTRY.forward_observations()
+
+    worker_id = int(os.environ['BROWSER_WORKER_ID'])
+    host, port = os.environ['BROWSER_WORKER_ADDRESS'].rsplit(':', 1)
+    conn = Client((host, int(port)), authkey=bytes.fromhex(os.environ['BROWSER_WORKER_AUTHKEY']))
+
+    # El pool de una sola sesión se encarga de resetearla y reemplazarla si muere
+    pool = DriverPool(create_driver, min_size=1, max_size=1, reset=reset_session)
+    warm = True
+    try:
+        pool.warm_up(prepare=warm_session)
+    except Exception as e:
+        warm = False
+        logger.warning(f"Trabajador {worker_id}: no se pudo abrir Chrome por adelantado: {e}")
+    conn.send(('hello', worker_id, warm))
+
+    # La tarea corre en otro hilo para que este siga leyendo los 'cancel'
+    send_lock = threading.Lock()
+    running = {}  # task_id -> Deadline
+
+    def send(message):
+        with send_lock:
+            conn.send(message)
+
+    def run_task(kind, task_id, payload, deadline):
+        def progress(event, data):
+            send(('progress', task_id, event, data))
+
+        try:
+            if kind == 'translate':
+                code, from_lang, to_lang = payload
+                result = translate_code_zzzcode(code, from_lang, to_lang, pool=pool, progress=progress,
+                                                deadline=deadline)
+            elif kind == 'batch':
+                result = translate_batch(payload, pool=pool, deadline=deadline)
+            else:
+                result = f"Error en la traducción: tarea desconocida {kind}"
+        except TranslationCancelled as e:
+            outcome = ('cancelled', task_id, (isinstance(e, DeadlineExceeded), str(e)))
+        except Exception as e:
+            outcome = ('done', task_id, f"Error en la traducción: {str(e)}")
+        else:
+            outcome = ('done', task_id, result)
+        finally:
+            running.pop(task_id, None)
+
+        # Las métricas antes del resultado, para que la API las lea dentro de la tarea
+        send(('metrics', task_id, REGISTRY.take_observations()))
+        send(outcome)
+
+    try:
+        while True:
+            try:
+                kind, task_id, payload, timeout = conn.recv()
+            except EOFError:
+                break
+            if kind == 'stop':
+                break
+            if kind == 'cancel':
+                deadline = running.get(task_id)
+                if deadline is not None:
+                    deadline.cancel(payload or 'cancelada')
+                continue
+
+            deadline = running[task_id] = Deadline(timeout)
+            threading.Thread(target=run_task, args=(kind, task_id, payload, deadline),
+                             name=f'worker-task-{task_id}', daemon=True).start()
+    finally:
+        for deadline in list(running.values()):
+            deadline.cancel('trabajador detenido')
+        pool.close()
+        conn.close()
+
+
+if __name__ == '__main__':
+    _worker_main()
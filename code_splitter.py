@@ -0,0 +1,381 @@
+"""
+División de archivos C++/C#/Java en unidades de nivel superior.
+
+Un escáner ligero que respeta llaves, comentarios y literales de cadena
+separa un archivo en cabeceras (#include, using, package, import) y unidades de
+nivel superior (clases, funciones, declaraciones). El contenido de los
+namespaces se divide también, recordando el namespace que envuelve cada
+unidad. Las unidades se agrupan en fragmentos que se traducen por separado
+y los resultados se vuelven a unir con las cabeceras deduplicadas.
+
+El mismo tokenizador clasifica también línea a línea la salida del
+conversor (classify_lines) para limpiarla en una sola pasada.
+"""
+import re
+
+# Líneas de cabecera compartidas por todas las unidades de un archivo
+_HEADER_LINE = re.compile(
+    r'\s*(?:'
+    r'#\s*(?:include|import)\b.*'
+    r'|#\s*pragma\s+once\b.*'
+    r'|(?:global\s+)?using\s+(?:static\s+|namespace\s+)?[\w.:<>]+(?:\s*=\s*[^;{]+)?\s*;.*'
+    r'|package\s+[\w.]+\s*;.*'
+    r'|import\s+(?:static\s+)?[\w.*]+\s*;.*'
+    r'|namespace\s+[\w.]+\s*;.*'
+    r')'
+)
+
+# Apertura de un namespace con llaves, con los comentarios que lo preceden
+_NAMESPACE_OPEN = re.compile(
+    r'(?P<lead>(?:\s|//[^\n]*\n|/\*.*?\*/)*)(?P<open>namespace\s+[\w.:]+\s*\{)',
+    re.DOTALL
+)
+
+
+def _skip_literal(code: str, i: int) -> int:
+    """
+    Si en code[i] empieza un comentario o literal, devuelve el índice
+    posterior a su final; si no, devuelve i.
+    """
+    ch = code[i]
+    nxt = code[i + 1] if i + 1 < len(code) else ''
+    prev = code[i - 1] if i > 0 else ''
+
+    if ch == '/' and nxt == '/':
+        end = code.find('\n', i)
+        return len(code) if end == -1 else end
+    if ch == '/' and nxt == '*':
+        end = code.find('*/', i + 2)
+        return len(code) if end == -1 else end + 2
+
+    # Bloque de texto de Java (o raw string de C# 11): """ ... """
+    if code.startswith('"""', i):
+        j = i + 3
+        while j < len(code):
+            if code[j] == '\\':
+                j += 2
+                continue
+            if code.startswith('"""', j):
+                return j + 3
+            j += 1
+        return len(code)
+
+    # Raw string de C++: R"delim( ... )delim"
+    if ch == 'R' and nxt == '"' and not (prev.isalnum() or prev == '_'):
+        paren = code.find('(', i + 2)
+        if paren != -1:
+            closing = ')' + code[i + 2:paren] + '"'
+            end = code.find(closing, paren)
+            if end != -1:
+                return end + len(closing)
+        return i
+
+    # Cadena verbatim de C#: @"..." o $@"..." con "" como escape
+    if ch == '@' and nxt == '"':
+        j = i + 2
+        while j < len(code):
+            if code[j] == '"':
+                if j + 1 < len(code) and code[j + 1] == '"':
+                    j += 2
+                    continue
+                return j + 1
+            j += 1
+        return len(code)
+
+    if ch == '"' or (ch == "'" and not prev.isdigit()):  # 1'000 es un separador de dígitos
+        j = i + 1
+        while j < len(code):
+            if code[j] == '\\':
+                j += 2
+                continue
+            if code[j] == ch:
+                return j + 1
+            if code[j] == '\n':  # Literal sin cerrar: no arrastrar el resto del archivo
+                return j
+            j += 1
+        return len(code)
+
+    return i
+
+
+def _find_closing(line: str, start: int, closing: str) -> int:
+    """Índice posterior al terminador de un comentario o cadena multilínea, o -1."""
+    if closing != '"':
+        end = line.find(closing, start)
+        return -1 if end == -1 else end + len(closing)
+
+    # Cadena verbatim: "" es una comilla escapada
+    j = start
+    while j < len(line):
+        if line[j] == '"':
+            if j + 1 < len(line) and line[j + 1] == '"':
+                j += 2
+                continue
+            return j + 1
+        j += 1
+    return -1
+
+
+def classify_lines(lines):
+    """
+    Clasifica líneas de C++/C# en una sola pasada, como generador.
+
+    Genera tuplas (línea, tipo) con tipo 'blank', 'comment' (solo contiene
+    comentarios) o 'code'. Los comentarios de bloque y las cadenas verbatim
+    o raw abiertas se arrastran entre líneas, así que `*ptr = 0;` es código
+    y `* texto` dentro de un /* */ es comentario; `//` o `/*` dentro de una
+    cadena no abren comentarios.
+    """
+    pending = None  # Terminador de un comentario o cadena que sigue abierto
+    for line in lines:
+        # Caso rápido: líneas vacías o de comentario de línea
+        if pending is None:
+            stripped = line.lstrip()
+            if not stripped:
+                yield line, 'blank'
+                continue
+            if stripped.startswith('//'):
+                yield line, 'comment'
+                continue
+
+        has_code = False
+        has_comment = False
+        i = 0
+        while i < len(line):
+            if pending is not None:
+                if pending == '*/':
+                    has_comment = True
+                else:
+                    has_code = True
+                end = _find_closing(line, i, pending)
+                if end == -1:
+                    break
+                i = end
+                pending = None
+                continue
+
+            ch = line[i]
+            if ch.isspace():
+                i += 1
+                continue
+
+            pair = line[i:i + 2]
+            if pair == '//':
+                has_comment = True
+                break
+            if pair == '/*':
+                has_comment = True
+                pending = '*/'
+                i += 2
+                continue
+
+            has_code = True
+            if line.startswith('"""', i) and line.find('"""', i + 3) == -1:
+                pending = '"""'
+                i += 3
+                continue
+            if pair == '@"':
+                pending = '"'
+                i += 2
+                continue
+            if pair == 'R"' and not (i and (line[i - 1].isalnum() or line[i - 1] == '_')):
+                paren = line.find('(', i + 2)
+                if paren != -1:
+                    pending = ')' + line[i + 2:paren] + '"'
+                    i = paren + 1
+                    continue
+
+            skipped = _skip_literal(line, i)
+            i = skipped if skipped != i else i + 1
+
+        if has_code:
+            yield line, 'code'
+        elif has_comment:
+            yield line, 'comment'
+        else:
+            yield line, 'blank'
+
+
+def _scan(code: str):
+    """
+    Separa cabeceras y unidades de nivel superior.
+
+    Una unidad termina en el primer salto de línea posterior a una llave
+    de cierre o a un punto y coma de nivel superior, así que incluye los
+    comentarios previos, atributos, el `;` tras una clase de C++, etc.
+
+    Returns:
+        Tupla (cabeceras, unidades) con los textos originales
+    """
+    headers = []
+    units = []
+    depth = 0
+    start = 0
+    unit_ended = False
+    parts = []  # Trozos de la unidad actual, sin las cabeceras recortadas
+    i = 0
+    line_start = True
+
+    while i < len(code):
+        if depth == 0 and line_start:
+            end = code.find('\n', i)
+            end = len(code) if end == -1 else end
+            line = code[i:end]
+            if _HEADER_LINE.fullmatch(line):
+                parts.append(code[start:i])
+                headers.append(line.strip())
+                i = start = min(end + 1, len(code))
+                continue
+
+        skipped = _skip_literal(code, i)
+        if skipped != i:
+            line_start = code[skipped - 1] == '\n'
+            i = skipped
+            continue
+
+        ch = code[i]
+        if ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth = max(0, depth - 1)
+            if depth == 0:
+                unit_ended = True
+        elif ch == ';' and depth == 0:
+            unit_ended = True
+        elif ch == '\n' and depth == 0 and unit_ended:
+            parts.append(code[start:i + 1])
+            units.append(''.join(parts))
+            parts = []
+            start = i + 1
+            unit_ended = False
+
+        line_start = ch == '\n'
+        i += 1
+
+    parts.append(code[start:])
+    rest = ''.join(parts)
+    if rest.strip():
+        units.append(rest)
+    elif units:
+        units[-1] += rest
+
+    return headers, units
+
+
+def split_source(code: str, namespaces: tuple = ()):
+    """
+    Divide un archivo en cabeceras y unidades de nivel superior.
+
+    Args:
+        code: Código fuente C++, C# o Java
+        namespaces: Aperturas de namespace que envuelven a code (uso interno)
+
+    Returns:
+        Tupla (cabeceras, unidades) donde cada unidad es una tupla
+        (aperturas_de_namespace, texto)
+    """
+    headers, raw_units = _scan(code)
+    units = []
+
+    for text in raw_units:
+        match = _NAMESPACE_OPEN.match(text)
+        body_end = text.rfind('}')
+        if match and body_end > match.end():
+            opener = ' '.join(match.group('open').split())
+            inner_headers, inner_units = split_source(
+                text[match.end():body_end], namespaces + (opener,)
+            )
+            headers.extend(inner_headers)
+            if inner_units:
+                # Los comentarios previos al namespace acompañan a su primera unidad
+                lead = match.group('lead').strip('\n')
+                first_namespaces, first_text = inner_units[0]
+                if lead.strip():
+                    first_text = lead + '\n' + first_text.lstrip('\n')
+                inner_units[0] = (first_namespaces, first_text)
+                units.extend(inner_units)
+                continue
+
+        if text.strip():
+            units.append((namespaces, text))
+
+    return headers, units
+
+
+def _wrap(namespaces: tuple, body: str) -> str:
+    for opener in reversed(namespaces):
+        body = body.strip('\n')
+        body = f"{opener}\n{body}\n}}"
+    return body
+
+
+def _dedupe(headers) -> list:
+    """Cabeceras sin repetir; la declaración package de Java va siempre primero."""
+    seen = set()
+    result = []
+    for header in headers:
+        key = ' '.join(header.split())
+        if key not in seen:
+            seen.add(key)
+            result.append(header)
+    return sorted(result, key=lambda header: not header.startswith('package'))
+
+
+def make_chunks(code: str, max_chars: int = 4000) -> list:
+    """
+    Agrupa las unidades de un archivo en fragmentos traducibles por separado.
+
+    Las unidades consecutivas del mismo namespace se juntan mientras no
+    superen max_chars; una unidad mayor que el límite va sola. Cada
+    fragmento lleva todas las cabeceras del archivo para que el traductor
+    tenga el mismo contexto de includes/usings.
+
+    Returns:
+        Lista de fragmentos en orden; [code] si no hay nada que dividir
+    """
+    headers, units = split_source(code)
+    if len(units) <= 1:
+        return [code]
+
+    groups = []
+    for namespaces, text in units:
+        if groups:
+            last_namespaces, last_texts = groups[-1]
+            size = sum(len(t) for t in last_texts) + len(text)
+            if last_namespaces == namespaces and size <= max_chars:
+                last_texts.append(text)
+                continue
+        groups.append((namespaces, [text]))
+
+    if len(groups) == 1:
+        return [code]
+
+    header_text = '\n'.join(_dedupe(headers))
+    chunks = []
+    for namespaces, texts in groups:
+        body = _wrap(namespaces, ''.join(texts).strip('\n'))
+        chunks.append(f"{header_text}\n\n{body}\n" if header_text else f"{body}\n")
+    return chunks
+
+
+def merge_translations(parts: list) -> str:
+    """
+    Une los fragmentos traducidos en un solo archivo.
+
+    Las cabeceras de todos los fragmentos se deduplican y se colocan al
+    principio, en el orden en que aparecen por primera vez.
+    """
+    headers = []
+    bodies = []
+    for part in parts:
+        part_headers, units = _scan(part)
+        headers.extend(part_headers)
+        body = ''.join(units).strip('\n')
+        if body.strip():
+            bodies.append(body)
+
+    header_text = '\n'.join(_dedupe(headers))
+    body_text = '\n\n'.join(bodies)
+    if header_text and body_text:
+        return f"{header_text}\n\n{body_text}"
+    return header_text or body_text
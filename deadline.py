@@ -0,0 +1,91 @@
+"""
+Tiempo máximo por petición y cancelación cooperativa de traducciones.
+
+Un Deadline viaja (como el callback de progreso) desde la petición HTTP
+hasta cada espera de la traducción: cola de admisión, pool de sesiones,
+carga de la página, esperas del resultado y pausas de las estrategias de
+respaldo. Cada espera se acota al tiempo restante y se interrumpe en cuanto
+la petición se cancela (cliente desconectado o cancelación vía API), de
+modo que la sesión de Chrome se libera de inmediato.
+"""
+import threading
+import time
+
+
+class TranslationCancelled(Exception):
+    """La traducción se canceló antes de terminar."""
+
+
+class DeadlineExceeded(TranslationCancelled):
+    """Se agotó el tiempo máximo de la petición."""
+
+
+class Deadline:
+    """
+    Instante límite de una petición, cancelable desde otro hilo.
+
+    Args:
+        timeout: Segundos disponibles desde ahora (None = sin límite, solo
+            cancelable)
+    """
+
+    def __init__(self, timeout: float = None):
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout if timeout is not None else None
+        self.reason = None
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def remaining(self, cap: float = None):
+        """
+        Segundos restantes, limitados a `cap`.
+
+        Returns:
+            Segundos (>= 0), o `cap` si no hay límite (None si tampoco hay cap)
+        """
+        if self.expires_at is None:
+            return cap
+        remaining = max(0.0, self.expires_at - time.monotonic())
+        return remaining if cap is None else min(cap, remaining)
+
+    def cancel(self, reason: str = 'cancelada'):
+        """Cancela la petición; las esperas en curso terminan en cuanto lo notan."""
+        if not self.cancelled:
+            self.reason = reason
+            self._cancelled.set()
+
+    def check(self):
+        """
+        Raises:
+            TranslationCancelled: Si la petición se canceló
+            DeadlineExceeded: Si se agotó el tiempo
+        """
+        if self.cancelled:
+            raise TranslationCancelled(f"Traducción cancelada: {self.reason}")
+        if self.expired:
+            raise DeadlineExceeded(f"Tiempo máximo de {self.timeout:g}s agotado")
+
+    def sleep(self, seconds: float):
+        """time.sleep acotado al tiempo restante e interrumpido por la cancelación."""
+        self.check()
+        self._cancelled.wait(self.remaining(seconds))
+        self.check()
+
+    def wait_slice(self, timeout: float = None, step: float = 1.0) -> float:
+        """
+        Tramo de espera para bucles con Condition.wait: como mucho `step`
+        segundos para volver a comprobar la cancelación.
+
+        Raises:
+            TranslationCancelled, DeadlineExceeded: Como check()
+        """
+        self.check()
+        remaining = self.remaining(timeout)
+        return step if remaining is None else min(step, remaining)
@@ -0,0 +1,275 @@
+"""
+Pool de sesiones de Chrome reutilizables para las traducciones.
+
+Lanzar Chromium cuesta varios segundos por petición; el pool mantiene un
+conjunto acotado de sesiones calientes que los hilos de Waitress toman
+prestadas y devuelven al terminar.
+"""
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    """No se obtuvo una sesión libre dentro del tiempo de espera."""
+
+
+class _PooledDriver:
+    """Metadatos de una sesión gestionada por el pool."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.monotonic()
+
+
+class DriverPool:
+    """
+    Pool thread-safe y acotado de sesiones de WebDriver.
+
+    Args:
+        factory: Callable sin argumentos que crea una nueva sesión
+        min_size: Sesiones que se mantienen abiertas; las recicladas o caídas
+            se reponen en segundo plano hasta volver a min_size
+        max_size: Máximo de sesiones vivas a la vez (en uso + libres)
+        max_uses: Traducciones tras las cuales una sesión se recicla
+        acquire_timeout: Segundos máximos esperando una sesión libre
+        reset: Callable opcional aplicado a cada sesión al devolverla
+        prepare: Callable opcional aplicado a las sesiones que se reponen
+            (como el prepare de warm_up)
+    """
+
+    def __init__(self, factory, min_size=0, max_size=2, max_uses=50,
+                 acquire_timeout=60.0, reset=None, prepare=None):
+        if max_size < 1:
+            raise ValueError("max_size debe ser al menos 1")
+        if min_size > max_size:
+            raise ValueError("min_size no puede ser mayor que max_size")
+
+        self.factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self.acquire_timeout = acquire_timeout
+        self.reset = reset
+        self.prepare = prepare
+
+        self._lock = threading.Condition()
+        self._idle = deque()
+        self._in_use = {}
+        self._size = 0  # Sesiones vivas o en proceso de creación
+        self._closed = False
+        self._refilling = False
+
+        self._created = 0
+        self._recycled = 0
+        self._discarded = 0
+        self._refilled = 0
+
+    def _create(self):
+        """Crea una sesión nueva; el hueco ya debe estar reservado en _size."""
+        try:
+            pooled = _PooledDriver(self.factory())
+        except Exception:
+            with self._lock:
+                self._size -= 1
+                self._lock.notify()
+            raise
+        with self._lock:
+            self._created += 1
+        return pooled
+
+    def _destroy(self, pooled, reason=None):
+        """Cierra una sesión y libera su hueco en el pool."""
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logger.warning(f"Error cerrando sesión de Chrome: {e}")
+        with self._lock:
+            self._size -= 1
+            if reason == 'recycled':
+                self._recycled += 1
+            elif reason == 'discarded':
+                self._discarded += 1
+            self._lock.notify()
+
+    def _refill(self):
+        """Repone en segundo plano las sesiones que faltan hasta min_size."""
+        with self._lock:
+            if self._closed or self._refilling or self._size >= self.min_size:
+                return
+            self._refilling = True
+        threading.Thread(target=self._refill_worker, name='driver-pool-refill', daemon=True).start()
+
+    def _refill_worker(self):
+        try:
+            opened = self.warm_up(self.min_size, prepare=self.prepare)
+            with self._lock:
+                self._refilled += opened
+        except Exception as e:
+            # Sin reintento inmediato: la próxima sesión reciclada o caída lo intenta de nuevo
+            logger.warning(f"No se pudo reponer el pool hasta {self.min_size} sesiones: {e}")
+        finally:
+            with self._lock:
+                self._refilling = False
+
+    @staticmethod
+    def is_healthy(driver) -> bool:
+        """Comprueba que la sesión sigue respondiendo."""
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def warm_up(self, size=None, prepare=None):
+        """
+        Abre sesiones hasta alcanzar `size` (por defecto min_size).
+
+        Args:
+            size: Sesiones vivas deseadas; se limita a max_size
+            prepare: Callable opcional aplicado a cada sesión nueva antes de
+                dejarla libre (p. ej. cargar la página del conversor)
+
+        Returns:
+            Número de sesiones abiertas
+        """
+        size = self.min_size if size is None else min(size, self.max_size)
+        opened = 0
+        while True:
+            with self._lock:
+                if self._closed or self._size >= size:
+                    return opened
+                self._size += 1
+            pooled = self._create()
+            if prepare is not None:
+                try:
+                    prepare(pooled.driver)
+                except Exception:
+                    self._destroy(pooled, reason='discarded')
+                    raise
+            with self._lock:
+                self._idle.append(pooled)
+                self._lock.notify()
+            opened += 1
+
+    def acquire(self, timeout=None, deadline=None):
+        """
+        Toma prestada una sesión, creando una nueva si hay hueco.
+
+        Args:
+            deadline: Deadline opcional de la petición; la espera termina si
+                se cancela o se agota
+
+        Raises:
+            PoolTimeout: Si no hay sesión disponible dentro del timeout
+            TranslationCancelled: Si el deadline se cancela o vence esperando
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        expires_at = time.monotonic() + timeout
+
+        while True:
+            pooled = None
+            with self._lock:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("El pool de sesiones está cerrado")
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = expires_at - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout(
+                            f"No hay sesiones de Chrome libres tras {timeout:g}s"
+                        )
+                    if deadline is not None:
+                        remaining = deadline.wait_slice(remaining)
+                    self._lock.wait(remaining)
+
+            if pooled is None:
+                pooled = self._create()
+            elif not self.is_healthy(pooled.driver):
+                # La sesión murió mientras estaba libre: reemplazarla
+                logger.warning("Sesión de Chrome caída en el pool, descartando")
+                self._destroy(pooled, reason='discarded')
+                self._refill()
+                continue
+
+            pooled.uses += 1
+            with self._lock:
+                self._in_use[id(pooled.driver)] = pooled
+            return pooled.driver
+
+    def release(self, driver, broken=False):
+        """
+        Devuelve una sesión al pool.
+
+        Las sesiones rotas, sin respuesta o que alcanzaron max_uses se cierran
+        en lugar de volver a la cola de libres.
+        """
+        with self._lock:
+            pooled = self._in_use.pop(id(driver), None)
+        if pooled is None:
+            logger.warning("Se intentó devolver una sesión ajena al pool")
+            return
+
+        if broken or not self.is_healthy(driver):
+            self._destroy(pooled, reason='discarded')
+            self._refill()
+            return
+
+        if pooled.uses >= self.max_uses:
+            self._destroy(pooled, reason='recycled')
+            self._refill()
+            return
+
+        if self.reset:
+            try:
+                self.reset(driver)
+            except Exception as e:
+                logger.warning(f"No se pudo resetear la sesión, descartando: {e}")
+                self._destroy(pooled, reason='discarded')
+                self._refill()
+                return
+
+        with self._lock:
+            if self._closed:
+                close_now = True
+            else:
+                close_now = False
+                self._idle.append(pooled)
+                self._lock.notify()
+        if close_now:
+            self._destroy(pooled)
+
+    def close(self):
+        """Cierra todas las sesiones libres; las prestadas se cierran al devolverse."""
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._lock.notify_all()
+        for pooled in idle:
+            self._destroy(pooled)
+
+    def stats(self) -> dict:
+        """Estado actual del pool."""
+        with self._lock:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'max_uses': self.max_uses,
+                'created': self._created,
+                'recycled': self._recycled,
+                'discarded': self._discarded,
+                'refilled': self._refilled,
+            }
@@ -0,0 +1,265 @@
+"""
+Orden adaptativo de las estrategias de extracción del resultado.
+
+Cada estrategia se registra con un coste nominal (lo que tarda en el peor
+caso razonable) y el selector aprende de cada intento su tasa de éxito y su
+duración. Las estrategias se prueban en orden de menor coste esperado por
+éxito (duración media / probabilidad de éxito), de modo que cuando el sitio
+cambia su HTML las que dejan de funcionar bajan al final de la lista y se
+deja de pagar su espera en cada petición. Con una pequeña probabilidad se
+adelanta otra estrategia para seguir midiéndola (exploración).
+
+Las estadísticas decaen exponencialmente (pesan más los intentos recientes)
+y se guardan en EXTRACTION_STATS_FILE para sobrevivir a los reinicios: como
+mucho cada STATS_SAVE_INTERVAL segundos y al salir. Varios procesos (los
+trabajadores de BROWSER_WORKERS) comparten el fichero: al guardar, cada uno
+aplica sus intentos nuevos sobre lo que hay en disco en lugar de pisarlo.
+"""
+import atexit
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin cerrojo entre procesos
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Fichero donde se guardan las estadísticas (vacío = solo en memoria)
+EXTRACTION_STATS_FILE = os.environ.get(
+    'EXTRACTION_STATS_FILE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.extraction_stats.json')
+)
+
+# Probabilidad de adelantar una estrategia al azar para seguir midiéndola
+EXTRACTION_EXPLORE_RATE = float(os.environ.get('EXTRACTION_EXPLORE_RATE', 0.05))
+
+# Peso que conservan los intentos anteriores en cada intento nuevo
+STATS_DECAY = 0.95
+
+# Segundos mínimos entre escrituras del fichero de estadísticas
+STATS_SAVE_INTERVAL = 30.0
+
+
+class ExtractionStrategy:
+    """
+    Una forma de encontrar el resultado de la traducción en la página.
+
+    Attributes:
+        name: Nombre con el que se informa en métricas y estadísticas
+        expected_seconds: Duración estimada antes de tener datos; fija el
+            orden inicial
+    """
+
+    name = None
+    expected_seconds = 10.0
+
+    def extract(self, driver, code: str, stale: str = None, progress=None, deadline=None):
+        """
+        Busca el resultado.
+
+        Returns:
+            El texto traducido, o None si esta estrategia no lo encontró
+
+        Raises:
+            TranslationCancelled: Si el deadline se cancela o vence
+        """
+        raise NotImplementedError
+
+
+class _StrategyStats:
+    """Intentos, éxitos y duración media con decaimiento exponencial."""
+
+    def __init__(self, expected_seconds: float, attempts=0.0, successes=0.0, mean_seconds=None,
+                 total_attempts=0, total_successes=0):
+        self.attempts = attempts
+        self.successes = successes
+        self.mean_seconds = expected_seconds if mean_seconds is None else mean_seconds
+        self.total_attempts = total_attempts
+        self.total_successes = total_successes
+
+    def record(self, success: bool, seconds: float):
+        self.attempts = self.attempts * STATS_DECAY + 1
+        self.successes = self.successes * STATS_DECAY + (1 if success else 0)
+        # Media móvil que parte de la duración estimada (cuenta como un intento
+        # más); los fallos también cuentan, su espera es el coste a evitar
+        self.mean_seconds += (seconds - self.mean_seconds) / min(self.attempts + 1, 1 / (1 - STATS_DECAY))
+        self.total_attempts += 1
+        self.total_successes += 1 if success else 0
+
+    @property
+    def success_rate(self) -> float:
+        # Suavizado de Laplace: sin datos se supone un 50 %
+        return (self.successes + 1) / (self.attempts + 2)
+
+    @property
+    def score(self) -> float:
+        """Segundos esperados por cada éxito; menor es mejor."""
+        return self.mean_seconds / self.success_rate
+
+    def to_dict(self) -> dict:
+        return {
+            'attempts': round(self.attempts, 3),
+            'successes': round(self.successes, 3),
+            'mean_seconds': round(self.mean_seconds, 3),
+            'total_attempts': self.total_attempts,
+            'total_successes': self.total_successes,
+        }
+
+
+class StrategySelector:
+    """
+    Registro de estrategias y orden en que se prueban.
+
+    Args:
+        path: Fichero JSON donde persistir las estadísticas (None = no persistir)
+        explore_rate: Probabilidad de adelantar una estrategia al azar
+        save_interval: Segundos mínimos entre escrituras del fichero
+    """
+
+    def __init__(self, path: str = None, explore_rate: float = EXTRACTION_EXPLORE_RATE,
+                 save_interval: float = STATS_SAVE_INTERVAL):
+        self.path = path
+        self.explore_rate = explore_rate
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._strategies = []
+        self._stats = {}
+        self._saved = self._load()
+        self._unsaved = {}  # Nombre -> intentos (éxito, segundos) aún no escritos
+        self._last_save = time.monotonic()
+        self._explored = 0
+
+    def _load(self) -> dict:
+        if not self.path:
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @contextmanager
+    def _file_lock(self):
+        """Cerrojo entre procesos para leer, combinar y escribir el fichero."""
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def save(self):
+        """
+        Aplica los intentos no guardados sobre las estadísticas del fichero y
+        lo reescribe de forma atómica (un fichero a medio escribir no se lee
+        nunca). Las estadísticas en memoria pasan a ser las combinadas, así
+        que cada proceso aprende también de los intentos de los demás.
+        """
+        if not self.path:
+            return
+        with self._save_lock:
+            with self._lock:
+                unsaved, self._unsaved = self._unsaved, {}
+                self._last_save = time.monotonic()
+            if not unsaved:
+                return
+            try:
+                with self._file_lock():
+                    on_disk = self._load()
+                    with self._lock:
+                        for strategy in self._strategies:
+                            stored = on_disk.get(strategy.name)
+                            if stored is None:
+                                continue  # Nadie más la ha guardado: vale la de memoria
+                            try:
+                                stats = _StrategyStats(strategy.expected_seconds, **stored)
+                            except TypeError:
+                                continue  # Fichero de otra versión: se reemplaza
+                            for success, seconds in unsaved.get(strategy.name, ()):
+                                stats.record(success, seconds)
+                            self._stats[strategy.name] = stats
+                        data = dict(on_disk)
+                        data.update({name: stats.to_dict() for name, stats in self._stats.items()})
+
+                    tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                    with open(tmp_path, 'w', encoding='utf-8') as f:
+                        json.dump(data, f, indent=2)
+                    os.replace(tmp_path, self.path)
+                    self._saved = data
+            except OSError as e:
+                logger.warning(f"No se pudieron guardar las estadísticas de extracción: {e}")
+                with self._lock:
+                    # Reintentar en el siguiente guardado
+                    for name, attempts in unsaved.items():
+                        self._unsaved[name] = attempts + self._unsaved.get(name, [])
+
+    def register(self, strategy: ExtractionStrategy):
+        """Registra una estrategia; el orden de registro desempata."""
+        with self._lock:
+            self._strategies = [s for s in self._strategies if s.name != strategy.name]
+            self._strategies.append(strategy)
+            try:
+                stats = _StrategyStats(strategy.expected_seconds, **self._saved.get(strategy.name, {}))
+            except TypeError:
+                # Fichero de otra versión: empezar de cero para esta estrategia
+                stats = _StrategyStats(strategy.expected_seconds)
+            self._stats[strategy.name] = stats
+        return strategy
+
+    def order(self) -> list:
+        """Estrategias en el orden en que deben probarse."""
+        with self._lock:
+            ordered = sorted(self._strategies, key=lambda s: self._stats[s.name].score)
+            if len(ordered) > 1 and random.random() < self.explore_rate:
+                ordered.insert(0, ordered.pop(random.randrange(1, len(ordered))))
+                self._explored += 1
+        return ordered
+
+    def record(self, name: str, success: bool, seconds: float):
+        """Anota un intento de la estrategia `name`; se persiste como mucho cada save_interval."""
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                return
+            stats.record(success, seconds)
+            if self.path:
+                self._unsaved.setdefault(name, []).append((success, seconds))
+            due = time.monotonic() - self._last_save >= self.save_interval
+        if due:
+            self.save()
+
+    def stats(self) -> dict:
+        with self._lock:
+            ordered = sorted(self._strategies, key=lambda s: self._stats[s.name].score)
+            return {
+                'order': [strategy.name for strategy in ordered],
+                'explored': self._explored,
+                'strategies': {
+                    strategy.name: {
+                        **self._stats[strategy.name].to_dict(),
+                        'success_rate': round(self._stats[strategy.name].success_rate, 3),
+                        'score': round(self._stats[strategy.name].score, 3),
+                    }
+                    for strategy in ordered
+                },
+            }
+
+
+SELECTOR = StrategySelector(EXTRACTION_STATS_FILE or None)
+atexit.register(SELECTOR.save)
+
+
+def register_strategy(strategy: ExtractionStrategy) -> ExtractionStrategy:
+    """Registra una estrategia en el selector global."""
+    return SELECTOR.register(strategy)
@@ -0,0 +1,107 @@
+"""
+Compresión de respuestas y peticiones condicionales.
+
+Las respuestas JSON/HTML/texto a partir de COMPRESS_MIN_BYTES se comprimen
+con brotli o gzip según el Accept-Encoding del cliente (brotli solo si el
+paquete está instalado). Las traducciones llevan un ETag débil derivado del
+hash de la entrada (el mismo que la clave de caché), de modo que un cliente
+que repite una traducción con If-None-Match recibe 304 sin que se vuelva a
+traducir ni a enviar el resultado.
+"""
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:  # Opcional: sin él solo se ofrece gzip
+    brotli = None
+
+# Tamaño mínimo del cuerpo para comprimirlo (0 = desactivar la compresión)
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', 1024))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # Calidad media: casi la razón de la 11 con mucho menos CPU
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/html', 'text/plain')
+
+
+def supported_encodings() -> tuple:
+    """Codificaciones disponibles por orden de preferencia."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate(accept_encoding: str):
+    """
+    Elige la codificación para la respuesta.
+
+    Args:
+        accept_encoding: Cabecera Accept-Encoding de la petición
+
+    Returns:
+        'br', 'gzip' o None si el cliente no acepta ninguna disponible
+    """
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        weight = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name] = weight
+
+    best = None
+    for encoding in supported_encodings():
+        weight = weights.get(encoding, weights.get('*', 0.0))
+        if weight > 0 and (best is None or weight > best[1]):
+            best = (encoding, weight)
+    return best[0] if best else None
+
+
+def should_compress(content_type: str, size: int, content_encoding: str = None) -> bool:
+    """Si merece la pena comprimir un cuerpo de ese tipo y tamaño."""
+    if COMPRESS_MIN_BYTES <= 0 or size < COMPRESS_MIN_BYTES or content_encoding:
+        return False
+    return (content_type or '').split(';')[0].strip().lower() in COMPRESSIBLE_TYPES
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    raise ValueError(f"Codificación no soportada: {encoding}")
+
+
+def translation_etag(cache_key: str) -> str:
+    """
+    ETag de una traducción a partir de su clave de caché (hash de la entrada).
+
+    Es débil: la respuesta cambia en campos como timestamp o cached, pero el
+    código traducido es equivalente, como para la caché.
+    """
+    return f'W/"{cache_key}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Comparación débil de If-None-Match con un ETag (RFC 9110, 13.1.2).
+
+    "*" no coincide: sin traducir no se sabe si habrá representación.
+    """
+    if not if_none_match:
+        return False
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
@@ -0,0 +1,192 @@
+"""
+Cola de trabajos de traducción asíncronos.
+
+Desacopla la concurrencia HTTP de la de los navegadores: la petición que
+crea el trabajo responde de inmediato con un id, y un pool acotado de
+workers ejecuta las traducciones en segundo plano.
+"""
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from deadline import Deadline, DeadlineExceeded, TranslationCancelled
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    """Se alcanzó el máximo de trabajos pendientes."""
+
+
+class Job:
+    """
+    Estado de un trabajo de traducción.
+
+    Args:
+        payload: Parámetros de la traducción
+        timeout: Segundos máximos desde la creación, cola incluida (None = sin límite)
+    """
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+    def __init__(self, payload: dict, timeout: float = None):
+        self.id = uuid.uuid4().hex
+        self.payload = payload
+        self.deadline = Deadline(timeout)
+        self.status = Job.QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+        self._done = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout=None) -> bool:
+        """Bloquea hasta que el trabajo termine o venza el timeout."""
+        return self._done.wait(timeout)
+
+    def to_dict(self) -> dict:
+        data = {
+            'job_id': self.id,
+            'status': self.status,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+        if self.status == Job.DONE:
+            data['result'] = self.result
+        elif self.status in (Job.FAILED, Job.CANCELLED):
+            data['error'] = self.error
+        return data
+
+
+class JobManager:
+    """
+    Ejecuta trabajos en un pool acotado de hilos.
+
+    Args:
+        runner: Callable runner(payload, deadline) que devuelve un dict con el
+            resultado; si lanza una excepción el trabajo queda 'failed' (o
+            'cancelled' si fue TranslationCancelled)
+        max_workers: Traducciones ejecutándose a la vez
+        max_pending: Máximo de trabajos sin terminar (en cola + en ejecución)
+        retention: Segundos que se conserva un trabajo terminado
+    """
+
+    def __init__(self, runner, max_workers=2, max_pending=100, retention=3600):
+        self.runner = runner
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retention = retention
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='translation-job'
+        )
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._pending = 0
+
+    def _prune(self):
+        """Elimina trabajos terminados más antiguos que retention. Requiere _lock."""
+        cutoff = time.time() - self.retention
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at.timestamp() < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _run(self, job: Job):
+        job.status = Job.RUNNING
+        job.started_at = datetime.now()
+        try:
+            # Cancelado o caducado mientras esperaba en la cola
+            job.deadline.check()
+            job.result = self.runner(job.payload, job.deadline)
+            job.status = Job.DONE
+        except TranslationCancelled as e:
+            logger.info(f"Trabajo {job.id} interrumpido: {e}")
+            job.error = str(e)
+            job.status = Job.FAILED if isinstance(e, DeadlineExceeded) else Job.CANCELLED
+        except Exception as e:
+            logger.error(f"Trabajo {job.id} falló: {e}")
+            job.error = str(e)
+            job.status = Job.FAILED
+        finally:
+            job.finished_at = datetime.now()
+            with self._lock:
+                self._pending -= 1
+            job._done.set()
+
+    def submit(self, payload: dict, timeout: float = None) -> Job:
+        """
+        Encola un trabajo nuevo.
+
+        Args:
+            payload: Parámetros que recibirá el runner
+            timeout: Segundos máximos del trabajo desde ahora (None = sin límite)
+
+        Raises:
+            JobQueueFull: Si ya hay max_pending trabajos sin terminar
+        """
+        with self._lock:
+            self._prune()
+            if self._pending >= self.max_pending:
+                raise JobQueueFull(
+                    f"Hay {self._pending} trabajos pendientes, intenta más tarde"
+                )
+            job = Job(payload, timeout)
+            self._jobs[job.id] = job
+            self._pending += 1
+
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str):
+        """Devuelve el trabajo o None si no existe (o ya se descartó)."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str):
+        """
+        Cancela un trabajo en cola o en ejecución; la traducción en curso suelta
+        su sesión de Chrome en cuanto lo nota.
+
+        Returns:
+            El trabajo, o None si no existe
+        """
+        job = self.get(job_id)
+        if job is not None and not job.finished:
+            job.deadline.cancel('cancelada vía API')
+        return job
+
+    def shutdown(self):
+        with self._lock:
+            unfinished = [job for job in self._jobs.values() if not job.finished]
+        for job in unfinished:
+            job.deadline.cancel('servidor detenido')
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            by_status = {}
+            for job in self._jobs.values():
+                by_status[job.status] = by_status.get(job.status, 0) + 1
+            return {
+                'pending': self._pending,
+                'max_pending': self.max_pending,
+                'max_workers': self.max_workers,
+                'tracked': len(self._jobs),
+                'by_status': by_status,
+            }
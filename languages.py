@@ -0,0 +1,143 @@
+"""
+Registro de lenguajes y direcciones de traducción.
+
+Cada lenguaje tiene un código corto (el que usan las direcciones, p. ej.
+'java' en 'java_to_py'), el nombre exacto que espera el autocompletado del
+conversor y la extensión de sus archivos. Las direcciones se generan una
+sola vez al importar el módulo, para todos los pares de lenguajes, y se
+validan entonces: la API, la CLI y el modo batch solo hacen una búsqueda en
+un dict por petición.
+"""
+import os
+
+
+class Language:
+    """
+    Un lenguaje del conversor.
+
+    Attributes:
+        code: Código corto usado en las direcciones ('cpp', 'cs', 'java'...)
+        name: Nombre tal como lo ofrece el conversor ('C++', 'C#', 'Java'...)
+        extension: Extensión de archivo para los resultados del modo batch
+        chunkable: Si code_splitter sabe dividirlo (lenguajes con llaves y
+            cabeceras #include/using/import ...;)
+    """
+
+    __slots__ = ('code', 'name', 'extension', 'chunkable')
+
+    def __init__(self, code: str, name: str, extension: str, chunkable: bool = False):
+        self.code = code
+        self.name = name
+        self.extension = extension
+        self.chunkable = chunkable
+
+    def to_dict(self) -> dict:
+        return {'code': self.code, 'name': self.name, 'extension': self.extension,
+                'chunkable': self.chunkable}
+
+
+class Direction:
+    """
+    Un par origen → destino con sus opciones por defecto.
+
+    Attributes:
+        name: Identificador en la API y la CLI ('cpp_to_cs')
+        source, target: Lenguajes de origen y destino
+        chunkable: Si admite la traducción por fragmentos
+        default_mode: Modo cuando la petición no indica "mode"
+    """
+
+    __slots__ = ('name', 'source', 'target', 'chunkable', 'default_mode')
+
+    def __init__(self, source: Language, target: Language, default_mode: str = 'study'):
+        self.name = f"{source.code}_to_{target.code}"
+        self.source = source
+        self.target = target
+        self.chunkable = source.chunkable and target.chunkable
+        self.default_mode = default_mode
+
+    @property
+    def languages(self) -> tuple[str, str]:
+        """Tupla (lenguaje_origen, lenguaje_destino) con los nombres del conversor."""
+        return self.source.name, self.target.name
+
+    def to_dict(self) -> dict:
+        return {'direction': self.name, 'from_lang': self.source.name, 'to_lang': self.target.name,
+                'chunkable': self.chunkable, 'default_mode': self.default_mode}
+
+
+LANGUAGES = (
+    Language('cpp', 'C++', '.cpp', chunkable=True),
+    Language('cs', 'C#', '.cs', chunkable=True),
+    Language('java', 'Java', '.java', chunkable=True),
+    Language('py', 'Python', '.py'),
+    Language('go', 'Go', '.go'),
+    Language('rs', 'Rust', '.rs'),
+    Language('ts', 'TypeScript', '.ts'),
+    Language('js', 'JavaScript', '.js'),
+)
+
+MODES = ('game', 'study')
+
+# Direcciones habilitadas, separadas por comas (vacío = todos los pares)
+TRANSLATION_DIRECTIONS = os.environ.get('TRANSLATION_DIRECTIONS', '')
+
+
+def _build(languages, enabled: str) -> dict:
+    """
+    Genera y valida las direcciones.
+
+    Raises:
+        ValueError: Si hay códigos, nombres o extensiones inválidos o
+            repetidos, o TRANSLATION_DIRECTIONS nombra una dirección que no existe
+    """
+    codes, names = set(), set()
+    for language in languages:
+        if not language.code.isidentifier() or '_to_' in language.code:
+            raise ValueError(f"Código de lenguaje inválido: {language.code!r}")
+        if not language.name or not language.extension.startswith('.'):
+            raise ValueError(f"Lenguaje mal definido: {language.code!r}")
+        if language.code in codes or language.name in names:
+            raise ValueError(f"Lenguaje repetido: {language.code!r} ({language.name})")
+        codes.add(language.code)
+        names.add(language.name)
+
+    directions = {
+        direction.name: direction
+        for direction in (Direction(source, target) for source in languages for target in languages
+                          if source is not target)
+    }
+
+    if enabled.strip():
+        wanted = [name.strip() for name in enabled.split(',') if name.strip()]
+        unknown = [name for name in wanted if name not in directions]
+        if unknown:
+            raise ValueError(f"TRANSLATION_DIRECTIONS contiene direcciones desconocidas: {', '.join(unknown)}")
+        directions = {name: directions[name] for name in wanted}
+    return directions
+
+
+LANGUAGES_BY_NAME = {language.name: language for language in LANGUAGES}
+DIRECTIONS = _build(LANGUAGES, TRANSLATION_DIRECTIONS)
+
+
+def get_direction(name: str) -> Direction:
+    """
+    Busca una dirección habilitada.
+
+    Raises:
+        ValueError: Si la dirección no existe o no está habilitada
+    """
+    direction = DIRECTIONS.get(name)
+    if direction is None:
+        raise ValueError(f"Dirección inválida: {name}. {directions_hint()}")
+    return direction
+
+
+def directions_hint() -> str:
+    """Texto de ayuda con el formato de las direcciones válidas."""
+    if len(DIRECTIONS) <= 4:
+        return 'Usa ' + ' o '.join(f"'{name}'" for name in DIRECTIONS)
+    enabled = {direction.source.code for direction in DIRECTIONS.values()}
+    codes = ', '.join(language.code for language in LANGUAGES if language.code in enabled)
+    return f"Usa '<origen>_to_<destino>' con los lenguajes: {codes}"
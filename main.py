@@ -4,7 +4,6 @@ Punto de entrada principal para Replit
 """
 import os
 import sys
-import glob
 import subprocess
 
 # Configurar variables de entorno para Replit
@@ -31,68 +30,35 @@ except ImportError:
     ])
     print("✅ Dependencias instaladas")
 
-# Buscar Chromium y ChromeDriver automáticamente
+# Buscar Chromium y ChromeDriver una sola vez (o usar lo guardado por --prefetch)
 print("🔍 Buscando Chromium y ChromeDriver...")
+from browser_config import get_browser_config
 
-# Buscar chromium
-chromium_path = None
 try:
-    result = subprocess.run(['which', 'chromium'], capture_output=True, text=True)
-    if result.returncode == 0:
-        chromium_path = result.stdout.strip()
-except:
-    pass
-
-if not chromium_path:
-    chromium_paths = glob.glob('/home/runner/.nix-profile/bin/chromium')
-    if chromium_paths:
-        chromium_path = chromium_paths[0]
-
-if not chromium_path:
-    chromium_paths = glob.glob('/nix/store/*-chromium-*/bin/chromium')
-    if chromium_paths:
-        chromium_path = chromium_paths[0]
-
-if chromium_path:
-    os.environ['CHROME_BIN'] = chromium_path
-    print(f"✅ Chromium: {chromium_path}")
-else:
-    print("❌ Chromium NO encontrado")
-
-# Buscar chromedriver
-chromedriver_path = None
-try:
-    result = subprocess.run(['which', 'chromedriver'], capture_output=True, text=True)
-    if result.returncode == 0:
-        chromedriver_path = result.stdout.strip()
-except:
-    pass
-
-if not chromedriver_path:
-    chromedriver_paths = glob.glob('/home/runner/.nix-profile/bin/chromedriver')
-    if chromedriver_paths:
-        chromedriver_path = chromedriver_paths[0]
-
-if not chromedriver_path:
-    chromedriver_paths = glob.glob('/nix/store/*-chromedriver-*/bin/chromedriver')
-    if chromedriver_paths:
-        chromedriver_path = chromedriver_paths[0]
-
-if chromedriver_path:
-    os.environ['CHROMEDRIVER_PATH'] = chromedriver_path
+    browser_config = get_browser_config()
+except Exception as e:
+    browser_config = None
+    print(f"❌ ChromeDriver NO encontrado: {e}")
+
+if browser_config:
+    if browser_config.chrome_binary:
+        os.environ['CHROME_BIN'] = browser_config.chrome_binary
+        print(f"✅ Chromium: {browser_config.chrome_binary}")
+    else:
+        print("❌ Chromium NO encontrado")
+
+    os.environ['CHROMEDRIVER_PATH'] = browser_config.chromedriver_path
     # Añadir al PATH
-    chromedriver_dir = os.path.dirname(chromedriver_path)
+    chromedriver_dir = os.path.dirname(browser_config.chromedriver_path)
     current_path = os.environ.get('PATH', '')
     os.environ['PATH'] = f"{chromedriver_dir}:{current_path}"
-    print(f"✅ ChromeDriver: {chromedriver_path}")
+    print(f"✅ ChromeDriver: {browser_config.chromedriver_path} ({browser_config.source})")
     print(f"✅ PATH actualizado")
-else:
-    print("❌ ChromeDriver NO encontrado")
 
 print("=" * 60)
 
 # Importar y ejecutar el servidor
-from api_server import app
+from api_server import WAITRESS_REQUEST_LOOKAHEAD, app, start_browsers
 from waitress import serve
 
 PORT = int(os.environ.get('PORT', 8080))
@@ -103,4 +69,5 @@ print(f"🌐 URL: https://794d657b-57e9-4adb-95f6-84a12f944f65-00-2vf0i0bc6x0xp.
 print("=" * 60)
 
 # Iniciar servidor
-serve(app, host=HOST, port=PORT, threads=4)
\ No newline at end of file
+start_browsers()
+serve(app, host=HOST, port=PORT, threads=4, channel_request_lookahead=WAITRESS_REQUEST_LOOKAHEAD)
\ No newline at end of file
@@ -0,0 +1,303 @@
+"""
+Métricas de latencia con histogramas de buckets fijos y contadores.
+
+Los histogramas se agrupan por nombre y etiquetas (fase, dirección,
+estrategia...) y se pueden exportar como JSON para /api/stats o en el
+formato de texto de Prometheus para /metrics.
+
+Los contadores se reparten en shards (un cerrojo por shard, asignado a cada
+hilo por turnos) para que los hilos de Waitress no compitan por el
+mismo cerrojo, y guardan además cubos por intervalo de tiempo con los que
+se calculan ventanas deslizantes de 1, 5 y 15 minutos.
+"""
+import bisect
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+# Límites superiores (segundos) de los buckets; cubren desde respuestas de
+# caché hasta la espera completa de la estrategia 4
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5,
+    10, 15, 20, 30, 45, 60, 90, 120, 180, 300
+)
+
+
+class Histogram:
+    """Histograma thread-safe con buckets fijos y estimación de percentiles."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # El último es +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+            if value > self._max:
+                self._max = value
+
+    def _percentile(self, counts, count, maximum, q: float):
+        """Interpola linealmente dentro del bucket que contiene el percentil."""
+        if not count:
+            return None
+        rank = q * count
+        cumulative = 0
+        for index, bucket_count in enumerate(counts):
+            if not bucket_count:
+                continue
+            if cumulative + bucket_count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else maximum
+                upper = min(upper, maximum)
+                fraction = (rank - cumulative) / bucket_count
+                return lower + (upper - lower) * fraction
+            cumulative += bucket_count
+        return maximum
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            count, total, maximum = self._count, self._sum, self._max
+
+        def rounded(value):
+            return round(value, 4) if value is not None else None
+
+        return {
+            'count': count,
+            'sum': round(total, 4),
+            'max': round(maximum, 4),
+            'p50': rounded(self._percentile(counts, count, maximum, 0.50)),
+            'p95': rounded(self._percentile(counts, count, maximum, 0.95)),
+            'p99': rounded(self._percentile(counts, count, maximum, 0.99)),
+        }
+
+    def cumulative_buckets(self):
+        """Pares (límite, acumulado) en el orden que espera Prometheus."""
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative = 0
+        pairs = []
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += bucket_count
+            pairs.append((bound, cumulative))
+        return pairs, total, count
+
+
+# Ventanas deslizantes (segundos) de los contadores y tamaño de cada cubo
+WINDOWS = {'1m': 60, '5m': 300, '15m': 900}
+WINDOW_BUCKET_SECONDS = 5
+COUNTER_SHARDS = 16
+
+# Shard de cada hilo: se reparten por turnos al primer incremento. No vale
+# get_ident() % COUNTER_SHARDS, porque en Linux los identificadores son
+# direcciones alineadas a página y caerían todos en el shard 0
+_thread_shard = threading.local()
+_next_shard = itertools.count()
+
+
+def _shard_index() -> int:
+    index = getattr(_thread_shard, 'index', None)
+    if index is None:
+        index = _thread_shard.index = next(_next_shard)
+    return index
+
+
+class _CounterShard:
+    __slots__ = ('lock', 'total', 'stamps', 'counts')
+
+    def __init__(self, slots: int):
+        self.lock = threading.Lock()
+        self.total = 0
+        self.stamps = [-1] * slots  # Intervalo al que pertenece cada cubo
+        self.counts = [0] * slots
+
+
+class Counter:
+    """
+    Contador monotónico thread-safe con ventanas deslizantes.
+
+    Cada hilo incrementa siempre el mismo shard, asignado por turnos la
+    primera vez que incrementa un contador: hasta COUNTER_SHARDS hilos no
+    comparten cerrojo; leer suma todos los shards. Las ventanas tienen una resolución de
+    WINDOW_BUCKET_SECONDS: el cubo en curso cuenta entero.
+    """
+
+    def __init__(self, shards: int = COUNTER_SHARDS):
+        self._slots = max(WINDOWS.values()) // WINDOW_BUCKET_SECONDS + 1
+        self._shards = [_CounterShard(self._slots) for _ in range(shards)]
+
+    def inc(self, amount: int = 1):
+        if amount <= 0:
+            return
+        interval = int(time.monotonic() // WINDOW_BUCKET_SECONDS)
+        slot = interval % self._slots
+        shard = self._shards[_shard_index() % len(self._shards)]
+        with shard.lock:
+            shard.total += amount
+            if shard.stamps[slot] != interval:
+                shard.stamps[slot] = interval
+                shard.counts[slot] = 0
+            shard.counts[slot] += amount
+
+    @property
+    def value(self) -> int:
+        return sum(shard.total for shard in self._shards)
+
+    def windows(self) -> dict:
+        """Incrementos en cada ventana de WINDOWS."""
+        now = int(time.monotonic() // WINDOW_BUCKET_SECONDS)
+        oldest = {name: now - seconds // WINDOW_BUCKET_SECONDS + 1 for name, seconds in WINDOWS.items()}
+        totals = dict.fromkeys(WINDOWS, 0)
+        for shard in self._shards:
+            with shard.lock:
+                buckets = list(zip(shard.stamps, shard.counts))
+            for stamp, count in buckets:
+                if not count:
+                    continue
+                for name, first in oldest.items():
+                    if first <= stamp <= now:
+                        totals[name] += count
+        return totals
+
+
+def _format_labels(labels: tuple, extra: str = '') -> str:
+    parts = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_bound(bound: float) -> str:
+    return '+Inf' if bound == float('inf') else repr(float(bound))
+
+
+class MetricsRegistry:
+    """Colección de histogramas y contadores indexados por nombre y etiquetas."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}  # nombre -> {etiquetas: Histogram}
+        self._counters = {}  # nombre -> {etiquetas: Counter}
+        self._help = {}
+        self._forwarded = None  # Observaciones pendientes de enviar a otro proceso
+
+    def forward_observations(self):
+        """
+        Guarda además cada observación para enviarla a otro proceso (los
+        trabajadores de browser_workers la reenvían a la API con cada tarea).
+        """
+        with self._lock:
+            if self._forwarded is None:
+                self._forwarded = []
+
+    def take_observations(self) -> list:
+        """Observaciones (nombre, valor, etiquetas) guardadas desde la última llamada."""
+        with self._lock:
+            observations = self._forwarded or []
+            if self._forwarded is not None:
+                self._forwarded = []
+            return observations
+
+    def merge_observations(self, observations):
+        """Registra las observaciones de otro proceso (ver take_observations)."""
+        for name, value, labels in observations:
+            self.histogram(name, **dict(labels)).observe(value)
+
+    def describe(self, name: str, help_text: str):
+        """Registra el texto de ayuda de una métrica para Prometheus."""
+        self._help[name] = help_text
+
+    def histogram(self, name: str, **labels) -> Histogram:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            return histogram
+
+    def observe(self, name: str, value: float, **labels):
+        self.histogram(name, **labels).observe(value)
+        if self._forwarded is not None:
+            with self._lock:
+                self._forwarded.append((name, value, tuple(sorted(labels.items()))))
+
+    def counter(self, name: str, **labels) -> Counter:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            counter = series.get(key)
+            if counter is None:
+                counter = series[key] = Counter()
+            return counter
+
+    def inc(self, name: str, amount: int = 1, **labels):
+        self.counter(name, **labels).inc(amount)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Mide la duración del bloque y la registra en el histograma."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def _series(self):
+        with self._lock:
+            return {name: dict(series) for name, series in self._histograms.items()}
+
+    def _counter_series(self):
+        with self._lock:
+            return {name: dict(series) for name, series in self._counters.items()}
+
+    def snapshot(self) -> dict:
+        """Resumen JSON: por métrica, una entrada por combinación de etiquetas."""
+        result = {}
+        for name, series in sorted(self._series().items()):
+            result[name] = [
+                {'labels': dict(labels), **histogram.snapshot()}
+                for labels, histogram in sorted(series.items())
+            ]
+        return result
+
+    def render_prometheus(self) -> str:
+        """Exporta histogramas y contadores en el formato de texto de Prometheus."""
+        lines = []
+        for name, series in sorted(self._counter_series().items()):
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} counter")
+            for labels, counter in sorted(series.items()):
+                lines.append(f"{name}{_format_labels(labels)} {counter.value}")
+        for name, series in sorted(self._series().items()):
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, histogram in sorted(series.items()):
+                pairs, total, count = histogram.cumulative_buckets()
+                for bound, cumulative in pairs:
+                    label_text = _format_labels(labels, f'le="{_format_bound(bound)}"')
+                    lines.append(f"{name}_bucket{label_text} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return '\n'.join(lines) + '\n'
+
+
+# Registro global compartido por el traductor y la API
+REGISTRY = MetricsRegistry()
+REGISTRY.describe('translation_phase_seconds', 'Duración de cada fase de una traducción con Selenium')
+REGISTRY.describe('translation_seconds', 'Duración total de una traducción por dirección y estrategia de extracción')
+REGISTRY.describe('http_request_seconds', 'Duración de las peticiones HTTP por endpoint')
@@ -0,0 +1,185 @@
+"""
+Filtrado de recursos en las sesiones de Chrome.
+
+El conversor solo necesita su HTML, sus scripts y su API; imágenes,
+fuentes, vídeo, anuncios y trackers se bloquean con preferencias de Chrome
+y con `Network.setBlockedURLs` (CDP). Con RESOURCE_ALLOWED_HOSTS la lista
+pasa a ser estricta: los hosts que no estén en ella (ni el del conversor)
+ni siquiera se resuelven.
+
+Las peticiones bloqueadas y los bytes descargados de cada traducción se
+leen del log de rendimiento de Chrome. Como lo bloqueado no se descarga,
+los bytes ahorrados son una estimación por tipo de recurso. Con pestañas
+(BROWSER_TABS > 1) el log es de todo el navegador, pero cada pestaña solo
+recibe las entradas de su ventana (browser_tabs reparte el resto).
+"""
+import json
+import logging
+import os
+import threading
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+BLOCK_RESOURCES = os.environ.get('BLOCK_RESOURCES', 'true').lower() == 'true'
+
+# Hosts de terceros permitidos (vacío = no restringir por host, solo por patrón)
+RESOURCE_ALLOWED_HOSTS = [
+    host.strip() for host in os.environ.get('RESOURCE_ALLOWED_HOSTS', '').split(',') if host.strip()
+]
+
+DEFAULT_BLOCKED_PATTERNS = (
+    # Imágenes, fuentes y multimedia
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*.mp4', '*.webm', '*.mp3', '*.ogg',
+    # Anuncios, analítica y trackers
+    '*googletagmanager.com*', '*google-analytics.com*', '*googlesyndication.com*',
+    '*doubleclick.net*', '*adservice.google.*', '*googleadservices.com*',
+    '*amazon-adsystem.com*', '*facebook.net*', '*connect.facebook.*',
+    '*hotjar.com*', '*clarity.ms*', '*cloudflareinsights.com*', '*adsbygoogle*',
+    '*fundingchoicesmessages.google.com*', '*quantserve.com*', '*scorecardresearch.com*',
+)
+
+BLOCKED_URL_PATTERNS = list(DEFAULT_BLOCKED_PATTERNS) + [
+    pattern.strip() for pattern in os.environ.get('RESOURCE_BLOCKED_PATTERNS', '').split(',') if pattern.strip()
+]
+
+# Tamaño medio estimado (bytes) de un recurso bloqueado, por tipo CDP
+_ESTIMATED_SIZES = {
+    'Image': 40_000,
+    'Font': 45_000,
+    'Media': 250_000,
+    'Script': 60_000,
+    'Stylesheet': 20_000,
+    'XHR': 5_000,
+    'Fetch': 5_000,
+}
+_DEFAULT_ESTIMATED_SIZE = 10_000
+
+_totals_lock = threading.Lock()
+_totals = {
+    'page_loads': 0,
+    'blocked_requests': 0,
+    'transferred_bytes': 0,
+    'estimated_bytes_saved': 0,
+}
+
+
+def _allowed_hosts(converter_url: str) -> list:
+    hosts = {'localhost', '127.0.0.1'}
+    converter_host = urlsplit(converter_url).hostname
+    if converter_host:
+        hosts.update({converter_host, f"*.{converter_host}"})
+    for host in RESOURCE_ALLOWED_HOSTS:
+        hosts.add(host)
+    return sorted(hosts)
+
+
+def apply_chrome_options(options, converter_url: str):
+    """Añade a las opciones de Chrome las preferencias de bloqueo y el log de red."""
+    if not BLOCK_RESOURCES:
+        return
+
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_experimental_option('prefs', {
+        'profile.managed_default_content_settings.images': 2,
+        'profile.default_content_setting_values.notifications': 2,
+        'profile.default_content_setting_values.geolocation': 2,
+        'profile.default_content_setting_values.media_stream': 2,
+        'profile.default_content_setting_values.popups': 2,
+    })
+
+    if RESOURCE_ALLOWED_HOSTS:
+        # Todo lo que no esté permitido falla al resolver el nombre
+        excludes = ', '.join(f"EXCLUDE {host}" for host in _allowed_hosts(converter_url))
+        options.add_argument(f"--host-resolver-rules=MAP * ~NOTFOUND, {excludes}")
+
+    # Los eventos de red de CDP llegan por el log de rendimiento
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+def install(driver):
+    """Activa el bloqueo por patrones de URL en una sesión nueva."""
+    if not BLOCK_RESOURCES:
+        return
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+    except Exception as e:
+        logger.warning(f"No se pudo activar el bloqueo de recursos: {e}")
+
+
+def discard(driver):
+    """Vacía el log de red de la sesión sin sumarlo a los totales."""
+    collect(driver, record_totals=False)
+
+
+def collect(driver, record_totals: bool = True) -> dict:
+    """
+    Lee (y vacía) el log de red de la sesión desde la última llamada.
+
+    Args:
+        driver: Sesión de Chrome (o pestaña)
+        record_totals: Si se suma a los totales del proceso como una carga de página
+
+    Returns:
+        Diccionario con blocked_requests, blocked_by_type, transferred_bytes y
+        estimated_bytes_saved; vacío si el bloqueo está desactivado
+    """
+    if not BLOCK_RESOURCES:
+        return {}
+    try:
+        entries = driver.get_log('performance')
+    except Exception:
+        return {}
+
+    blocked_by_type = {}
+    transferred = 0
+    for entry in entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, ValueError, TypeError):
+            continue
+        method = message.get('method')
+        params = message.get('params', {})
+        if method == 'Network.loadingFailed' and params.get('blockedReason'):
+            resource_type = params.get('type', 'Other')
+            blocked_by_type[resource_type] = blocked_by_type.get(resource_type, 0) + 1
+        elif method == 'Network.loadingFinished':
+            transferred += int(params.get('encodedDataLength', 0))
+
+    blocked = sum(blocked_by_type.values())
+    saved = sum(
+        count * _ESTIMATED_SIZES.get(resource_type, _DEFAULT_ESTIMATED_SIZE)
+        for resource_type, count in blocked_by_type.items()
+    )
+    resources = {
+        'blocked_requests': blocked,
+        'blocked_by_type': blocked_by_type,
+        'transferred_bytes': transferred,
+        'estimated_bytes_saved': saved,
+    }
+    if record_totals:
+        record(resources)
+    return resources
+
+
+def record(resources: dict):
+    """Suma a los totales del proceso el resultado de un collect() (propio o de un worker)."""
+    with _totals_lock:
+        _totals['page_loads'] += 1
+        for key in ('blocked_requests', 'transferred_bytes', 'estimated_bytes_saved'):
+            _totals[key] += int(resources.get(key, 0))
+
+
+def stats() -> dict:
+    """Totales acumulados del proceso."""
+    with _totals_lock:
+        totals = dict(_totals)
+    return {
+        'enabled': BLOCK_RESOURCES,
+        'allowed_hosts': RESOURCE_ALLOWED_HOSTS,
+        'blocked_patterns': len(BLOCKED_URL_PATTERNS),
+        **totals,
+    }
@@ -0,0 +1,101 @@
+"""
+Deduplicación de traducciones idénticas en curso (single-flight).
+
+Cuando llegan varias peticiones con el mismo código y dirección mientras la
+primera aún se está traduciendo, solo la primera (líder) lanza el navegador;
+las demás esperan su resultado y lo comparten.
+"""
+import threading
+
+from deadline import TranslationCancelled
+
+
+class _Call:
+    """Una ejecución en curso y su resultado."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """Agrupa llamadas concurrentes con la misma clave en una sola ejecución."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._leaders = 0
+        self._coalesced = 0
+
+    def do(self, key: str, fn, deadline=None):
+        """
+        Ejecuta fn() una sola vez por clave entre las llamadas concurrentes.
+
+        Args:
+            key: Clave que identifica el trabajo (p. ej. la clave de caché)
+            fn: Callable sin argumentos que realiza el trabajo
+            deadline: Deadline opcional de esta llamada; acota la espera de
+                los seguidores. Si se cancela la llamada líder, los seguidores
+                que siguen vivos reintentan en lugar de heredar la cancelación
+
+        Returns:
+            Tupla (resultado, compartido); compartido es True si esta llamada
+            reutilizó el resultado de otra en curso
+
+        Raises:
+            La misma excepción que lanzó fn() en la llamada líder
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                if call is not None:
+                    call.followers += 1
+                    self._coalesced += 1
+                    leader = False
+                else:
+                    call = _Call()
+                    self._calls[key] = call
+                    self._leaders += 1
+                    leader = True
+
+            if leader:
+                break
+
+            try:
+                if deadline is None:
+                    call.done.wait()
+                else:
+                    while not call.done.wait(deadline.wait_slice()):
+                        pass
+            finally:
+                # Ya no espera (resultado, reintento o deadline vencido)
+                with self._lock:
+                    call.followers -= 1
+            if isinstance(call.error, TranslationCancelled) and (deadline is None or not deadline.cancelled):
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'waiting_followers': sum(call.followers for call in self._calls.values()),
+                'leaders': self._leaders,
+                'coalesced': self._coalesced,
+            }
@@ -11,9 +11,9 @@ def main():
     parser = argparse.ArgumentParser(description='Iniciar Code Translator API Server')
     parser.add_argument(
         '--mode',
-        choices=['dev', 'prod'],
+        choices=['dev', 'prod', 'async'],
         default='dev',
-        help='Modo de ejecución: dev (desarrollo) o prod (producción)'
+        help='Modo de ejecución: dev (desarrollo), prod (producción con Waitress) o async (ASGI con Uvicorn)'
     )
     parser.add_argument(
         '--port',
@@ -26,6 +26,11 @@ def main():
         default='0.0.0.0',
         help='Host del servidor (default: 0.0.0.0)'
     )
+    parser.add_argument(
+        '--prefetch',
+        action='store_true',
+        help='Resolver (y descargar si hace falta) Chrome y ChromeDriver, guardar las rutas y salir'
+    )
 
     args = parser.parse_args()
 
@@ -35,6 +40,15 @@ def main():
     # Suprimir warnings de Selenium
     os.environ['SUPPRESS_SELENIUM_WARNINGS'] = 'true'
 
+    if args.prefetch:
+        # Paso de build: los arranques siguientes reutilizan las rutas guardadas
+        from browser_config import BROWSER_CONFIG_FILE, prefetch
+        config = prefetch()
+        print(f"✅ Chromium: {config.chrome_binary or '(el predeterminado de Selenium)'}")
+        print(f"✅ ChromeDriver: {config.chromedriver_path} ({config.source})")
+        print(f"✅ Rutas guardadas en {BROWSER_CONFIG_FILE}")
+        return
+
     if args.mode == 'dev':
         # Modo desarrollo con Flask
         port = args.port or int(os.environ.get('PORT', 5000))
@@ -46,9 +60,31 @@ def main():
         print(f"Auto-reload: Activado")
         print("=" * 60 + "\n")
 
-        from api_server import app
+        from api_server import app, start_browsers
+        # El recargador ejecuta el servidor en un proceso hijo (WERKZEUG_RUN_MAIN);
+        # el padre solo vigila los archivos y no abre navegadores
+        if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+            start_browsers()
         app.run(host=args.host, port=port, debug=True)
 
+    elif args.mode == 'async':
+        # Modo producción ASGI: las esperas son corrutinas, no hilos
+        port = args.port or int(os.environ.get('PORT', 8080))
+        print("\n" + "=" * 60)
+        print("⚡ MODO ASYNC")
+        print("=" * 60)
+        print(f"Puerto: {port}")
+        print(f"Servidor: Uvicorn (ASGI)")
+        print("=" * 60 + "\n")
+
+        try:
+            import uvicorn
+        except ImportError:
+            print("❌ Error: uvicorn no está instalado")
+            print("Instala con: pip install uvicorn")
+            sys.exit(1)
+        uvicorn.run('asgi_server:app', host=args.host, port=port, log_level='info')
+
     else:
         # Modo producción con Waitress
         port = args.port or int(os.environ.get('PORT', 8080))
@@ -62,8 +98,10 @@ def main():
 
         try:
             from waitress import serve
-            from api_server import app
-            serve(app, host=args.host, port=port, threads=4)
+            from api_server import WAITRESS_REQUEST_LOOKAHEAD, app, start_browsers
+            start_browsers()
+            serve(app, host=args.host, port=port, threads=4,
+                  channel_request_lookahead=WAITRESS_REQUEST_LOOKAHEAD)
         except ImportError:
             print("❌ Error: waitress no está instalado")
             print("Instala con: pip install waitress")
@@ -161,6 +161,225 @@ def test_invalid_request():
     return response.status_code == 400
 
 
+def test_languages():
+    """Prueba el registro de lenguajes y direcciones"""
+    print("\n" + "=" * 60)
+    print("🌐 Probando Lenguajes Disponibles...")
+    print("=" * 60)
+
+    response = requests.get(f"{BASE_URL}/api/languages")
+    print(f"Status Code: {response.status_code}")
+    data = response.json()
+    directions = {direction['direction'] for direction in data['directions']}
+    print(f"Direcciones: {len(directions)}")
+
+    # Una dirección fuera del registro debe rechazarse
+    invalid = requests.post(f"{BASE_URL}/api/translate", json={"code": "x", "direction": "cpp_to_cobol"})
+    return response.status_code == 200 and 'cpp_to_cs' in directions and invalid.status_code == 400
+
+
+def test_java_chunking():
+    """Prueba local (sin servidor) de la división de Java: package y bloques de texto"""
+    from code_splitter import make_chunks, merge_translations
+
+    print("\n" + "=" * 60)
+    print("☕ Probando División de Código Java")
+    print("=" * 60)
+
+    code = (
+        'package com.example.app;\n\n'
+        'import java.util.List;\n\n'
+        'public class Banner {\n'
+        '    String text = """\n'
+        '        { sin cerrar\n'
+        '        """;\n'
+        '}\n\n'
+        'class Other {\n'
+        '    void run() {}\n'
+        '}\n'
+    )
+    chunks = make_chunks(code, max_chars=40)
+    merged = merge_translations(chunks)
+    print(f"Fragmentos: {len(chunks)}")
+
+    # Cada fragmento y el resultado empiezan por package; el { del bloque de texto no cuenta
+    return (len(chunks) == 2
+            and all(chunk.startswith('package com.example.app;') for chunk in chunks)
+            and merged.startswith('package com.example.app;\nimport java.util.List;')
+            and 'class Other' in chunks[1])
+
+
+def test_translate_batch():
+    """Prueba la traducción por lotes"""
+    print("\n" + "=" * 60)
+    print("📦 Probando Traducción por Lotes")
+    print("=" * 60)
+
+    payload = {
+        "direction": "cpp_to_cs",
+        "items": [
+            {"code": "int add(int a, int b) { return a + b; }"},
+            {"code": "class Greeter { public: void Hi() {} };"},
+            {"code": "class A { }", "direction": "cs_to_cpp"},
+            {"direction": "cpp_to_cs"}  # Item inválido: falta 'code'
+        ]
+    }
+
+    response = requests.post(
+        f"{BASE_URL}/api/translate/batch",
+        json=payload,
+        headers={"Content-Type": "application/json"}
+    )
+
+    print(f"Status Code: {response.status_code}")
+    if response.status_code != 200:
+        print(f"\n❌ Error HTTP: {response.text}")
+        return False
+
+    data = response.json()
+    for result in data['results']:
+        status = "✅" if result['success'] else "❌"
+        print(f"{status} Item {result['index']}: {result.get('error', 'OK')}")
+
+    # Los resultados deben venir en orden y el item inválido debe fallar solo
+    indexes = [result['index'] for result in data['results']]
+    return indexes == list(range(4)) and not data['results'][3]['success']
+
+
+def test_async_job():
+    """Prueba la traducción asíncrona con /api/jobs y long-poll"""
+    print("\n" + "=" * 60)
+    print("⏳ Probando Trabajo Asíncrono: C++ → C#")
+    print("=" * 60)
+
+    payload = {
+        "code": "int main() { return 0; }",
+        "direction": "cpp_to_cs"
+    }
+
+    response = requests.post(
+        f"{BASE_URL}/api/jobs",
+        json=payload,
+        headers={"Content-Type": "application/json"}
+    )
+
+    print(f"Status Code: {response.status_code}")
+    if response.status_code != 202:
+        print(f"\n❌ Error HTTP: {response.text}")
+        return False
+
+    job_id = response.json()['job_id']
+    print(f"Trabajo encolado: {job_id}")
+
+    # Long-poll hasta que el trabajo termine
+    for _ in range(10):
+        response = requests.get(f"{BASE_URL}/api/jobs/{job_id}", params={"wait": 30})
+        data = response.json()
+        print(f"Estado: {data['status']}")
+        if data['status'] in ('done', 'failed'):
+            break
+
+    if data['status'] == 'done':
+        print("\n✅ Trabajo completado!")
+        print(data['result']['translated_code'])
+        return True
+
+    print(f"\n❌ Error: {data.get('error')}")
+    return False
+
+
+def test_translate_stream():
+    """Prueba la traducción con progreso en Server-Sent Events"""
+    print("\n" + "=" * 60)
+    print("📡 Probando Traducción en Streaming: C++ → C#")
+    print("=" * 60)
+
+    payload = {
+        "code": "int main() { return 0; }",
+        "direction": "cpp_to_cs"
+    }
+
+    response = requests.post(
+        f"{BASE_URL}/api/translate/stream",
+        json=payload,
+        stream=True
+    )
+
+    print(f"Status Code: {response.status_code}")
+    if response.status_code != 200:
+        print(f"\n❌ Error HTTP: {response.text}")
+        return False
+
+    event = None
+    events = []
+    final = None
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+            events.append(event)
+        elif line.startswith("data: ") and event in ("result", "error"):
+            final = json.loads(line[len("data: "):])
+
+    print(f"Eventos: {', '.join(events)}")
+    if final and final.get('success'):
+        print("\n✅ Traducción completada!")
+        print(final['translated_code'])
+        return events[0] == "queued"
+
+    print(f"\n❌ Error: {final}")
+    return False
+
+
+def test_cancel_job():
+    """Prueba la cancelación de un trabajo asíncrono con DELETE /api/jobs/<id>"""
+    print("\n" + "=" * 60)
+    print("🛑 Probando Cancelación de Trabajo")
+    print("=" * 60)
+
+    payload = {
+        "code": "class Cancelable { public: int value() { return 42; } };",
+        "direction": "cpp_to_cs"
+    }
+
+    response = requests.post(f"{BASE_URL}/api/jobs", json=payload)
+    if response.status_code != 202:
+        print(f"\n❌ Error HTTP: {response.text}")
+        return False
+
+    job_id = response.json()['job_id']
+    response = requests.delete(f"{BASE_URL}/api/jobs/{job_id}")
+    print(f"Status Code: {response.status_code}")
+
+    data = requests.get(f"{BASE_URL}/api/jobs/{job_id}", params={"wait": 30}).json()
+    print(f"Estado: {data['status']}")
+
+    # Si la traducción terminó antes de la cancelación el trabajo queda en 'done'
+    return data['status'] in ('cancelled', 'done')
+
+
+def test_conditional_translate():
+    """Prueba el ETag de /api/translate y la respuesta 304 con If-None-Match"""
+    print("\n" + "=" * 60)
+    print("🏷️  Probando Traducción Condicional (ETag)")
+    print("=" * 60)
+
+    payload = {
+        "code": "int square(int x) { return x * x; }",
+        "direction": "cpp_to_cs"
+    }
+
+    response = requests.post(f"{BASE_URL}/api/translate", json=payload)
+    etag = response.headers.get('ETag')
+    print(f"Status Code: {response.status_code}, ETag: {etag}")
+    if response.status_code != 200 or not etag:
+        return False
+
+    # Misma entrada: 304 sin cuerpo y sin volver a traducir
+    response = requests.post(f"{BASE_URL}/api/translate", json=payload, headers={"If-None-Match": etag})
+    print(f"Con If-None-Match: {response.status_code}")
+    return response.status_code == 304 and not response.content
+
+
 def main():
     """Ejecuta todas las pruebas"""
     print("\n" + "=" * 60)
@@ -174,7 +393,14 @@ def main():
         "Estadísticas": test_stats(),
         "Traducción C++ → C#": test_translate_cpp_to_cs(),
         "Traducción C# → C++": test_translate_cs_to_cpp(),
-        "Petición Inválida": test_invalid_request()
+        "Petición Inválida": test_invalid_request(),
+        "Lenguajes Disponibles": test_languages(),
+        "División de Java": test_java_chunking(),
+        "Traducción por Lotes": test_translate_batch(),
+        "Trabajo Asíncrono": test_async_job(),
+        "Traducción en Streaming": test_translate_stream(),
+        "Cancelación de Trabajo": test_cancel_job(),
+        "Traducción Condicional": test_conditional_translate()
     }
 
     # Mostrar resumen
@@ -0,0 +1,173 @@
+"""
+Caché de traducciones direccionada por contenido.
+
+La clave es un hash del código normalizado más el par de lenguajes, de modo
+que el mismo snippet enviado otra vez no vuelve a pasar por Selenium. Tiene
+un nivel en memoria (LRU acotado por bytes) y un nivel opcional en SQLite
+que sobrevive a reinicios.
+"""
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_code(code: str) -> str:
+    """Normaliza finales de línea y espacios sobrantes para que no cambien la clave."""
+    lines = code.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    return '\n'.join(line.rstrip() for line in lines).strip('\n')
+
+
+def make_cache_key(code: str, from_lang: str, to_lang: str) -> str:
+    """
+    Calcula la clave de caché de una traducción.
+
+    Args:
+        code: Código fuente a traducir
+        from_lang: Lenguaje de origen (según parse_direction)
+        to_lang: Lenguaje de destino (según parse_direction)
+
+    Returns:
+        Hash SHA-256 en hexadecimal
+    """
+    digest = hashlib.sha256()
+    digest.update(from_lang.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(to_lang.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(normalize_code(code).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class TranslationCache:
+    """
+    Caché LRU de dos niveles para traducciones.
+
+    Args:
+        max_bytes: Tamaño máximo del nivel en memoria (bytes UTF-8 de los valores)
+        ttl: Segundos de validez de cada entrada (0 = sin expiración)
+        db_path: Ruta del fichero SQLite para persistir entradas (None = solo memoria)
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, ttl=0, db_path=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.db_path = db_path
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
+            logger.info(f"Caché persistente de traducciones en: {db_path}")
+
+    def _expires_at(self) -> float:
+        return time.time() + self.ttl if self.ttl else 0.0
+
+    @staticmethod
+    def _expired(expires_at: float) -> bool:
+        return bool(expires_at) and expires_at <= time.time()
+
+    def _store_in_memory(self, key, value, expires_at):
+        """Inserta en el nivel de memoria y expulsa las entradas menos usadas. Requiere _lock."""
+        size = len(value.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+
+        old = self._entries.pop(key, None)
+        if old:
+            self._bytes -= old[2]
+
+        self._entries[key] = (value, expires_at, size)
+        self._bytes += size
+
+        while self._bytes > self.max_bytes:
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self._evictions += 1
+
+    def get(self, key: str):
+        """Devuelve la traducción cacheada o None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                value, expires_at, size = entry
+                if not self._expired(expires_at):
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+                self._bytes -= size
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM translations WHERE key = ?", (key,)
+                ).fetchone()
+                if row:
+                    value, expires_at = row
+                    if not self._expired(expires_at):
+                        self._store_in_memory(key, value, expires_at)
+                        self._hits += 1
+                        self._disk_hits += 1
+                        return value
+                    self._db.execute("DELETE FROM translations WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self._misses += 1
+            return None
+
+    def set(self, key: str, value: str):
+        """Guarda una traducción en ambos niveles."""
+        expires_at = self._expires_at()
+        with self._lock:
+            self._store_in_memory(key, value, expires_at)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO translations (key, value, expires_at) VALUES (?, ?, ?)",
+                        (key, value, expires_at)
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"No se pudo persistir la traducción en caché: {e}")
+
+    def close(self):
+        """Cierra la conexión SQLite si existe."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> dict:
+        """Contadores de uso de la caché."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'disk_hits': self._disk_hits,
+                'misses': self._misses,
+                'hit_rate': f"{(self._hits / lookups * 100) if lookups else 0:.2f}%",
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self._evictions,
+                'persistent': self.db_path is not None,
+            }
@@ -32,6 +32,7 @@ DEBUG_MODE = os.environ.get('DEBUG', 'true').lower() == 'true'
 import os
 import sys
 import argparse
+import glob
 import logging
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -40,9 +41,18 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.core.os_manager import ChromeType
+from selenium.common.exceptions import TimeoutException, WebDriverException
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backends import BackendError, TranslationBackend, backend_chain, get_backend, register_backend
+from browser_config import get_browser_config
+from code_splitter import classify_lines, make_chunks, merge_translations
+from deadline import TranslationCancelled
+from extraction import SELECTOR, ExtractionStrategy, register_strategy
+from languages import DIRECTIONS, LANGUAGES, LANGUAGES_BY_NAME, MODES, get_direction
+from metrics import REGISTRY
+import resource_filter
 
 # Suprimir warnings de urllib3 para Selenium
 logging.getLogger('urllib3').setLevel(logging.ERROR)
@@ -51,8 +61,19 @@ logging.getLogger('selenium').setLevel(logging.ERROR)
 # Configuración para modo debug
 DEBUG_MODE = os.environ.get('DEBUG', 'true').lower() == 'true'
 
+# Página del conversor (configurable para apuntar a un stand-in local en benchmarks)
+CONVERTER_URL = os.environ.get('CONVERTER_URL', "https://zzzcode.ai/code-converter")
+
+# Espera del resultado: tiempo máximo y cuánto debe permanecer sin cambios
+RESULT_TIMEOUT = float(os.environ.get('RESULT_TIMEOUT', 90))
+RESULT_STABLE_SECONDS = float(os.environ.get('RESULT_STABLE_SECONDS', 1.5))
+RESULT_POLL_INTERVAL = 0.25
+
+# Tamaño máximo (caracteres) de cada fragmento en la traducción por fragmentos
+CHUNK_MAX_CHARS = int(os.environ.get('CHUNK_MAX_CHARS', 4000))
 
-def get_chrome_options():
+
+def get_chrome_options(config=None):
     """Configura las opciones de Chrome según el entorno"""
     options = Options()
     options.add_argument("--headless")
@@ -70,31 +91,76 @@ def get_chrome_options():
     options.add_argument("--mute-audio")
     options.add_argument("--no-first-run")
     options.add_argument("--no-default-browser-check")
+    # Las pestañas en segundo plano (BROWSER_TABS > 1) no deben ralentizarse
+    options.add_argument("--disable-background-timer-throttling")
+    options.add_argument("--disable-backgrounding-occluded-windows")
+    options.add_argument("--disable-renderer-backgrounding")
 
-    # Configuración específica para Replit/Linux
-    if os.environ.get('REPLIT') or sys.platform.startswith('linux'):
-        # Buscar chromium en Replit
-        chrome_bin = os.environ.get('CHROME_BIN')
-        if chrome_bin:
-            options.binary_location = chrome_bin
-        else:
-            # Intentar encontrar chromium automáticamente
-            possible_paths = [
-                '/nix/store/*-chromium-*/bin/chromium',
-                '/usr/bin/chromium',
-                '/usr/bin/chromium-browser',
-                '/usr/bin/google-chrome'
-            ]
-            import glob
-            for path_pattern in possible_paths:
-                matches = glob.glob(path_pattern)
-                if matches:
-                    options.binary_location = matches[0]
-                    print(f"Chrome encontrado en: {matches[0]}")
-                    break
+    # Ejecutable resuelto una sola vez por proceso (Replit/Linux)
+    if config is None:
+        config = get_browser_config()
+    if config.chrome_binary:
+        options.binary_location = config.chrome_binary
+
+    # Sin imágenes, fuentes, multimedia ni trackers (ver resource_filter.py)
+    resource_filter.apply_chrome_options(options, CONVERTER_URL)
 
     return options
 
+def _uncomment_line(line: str):
+    """Quita los marcadores de comentario de una línea; None si no queda nada útil."""
+    stripped = line.lstrip()
+    if stripped.startswith('//'):
+        return line.replace('// ' if stripped.startswith('// ') else '//', '', 1)
+
+    stripped = stripped.rstrip()
+    if stripped in ('/*', '*/', '/**', '**/'):
+        return None
+
+    if stripped.endswith('*/'):
+        line = line[:line.rfind('*/')].rstrip()
+        stripped = line.strip()
+
+    # Apertura de bloque o * al inicio de líneas de comentario de bloque
+    for marker in ('/** ', '/**', '/* ', '/*', '* ', '*'):
+        if stripped.startswith(marker):
+            return line.replace(marker, '', 1)
+    return line
+
+
+def iter_clean_lines(lines):
+    """
+    Limpia la salida del conversor en una sola pasada, como generador.
+
+    Los comentarios y líneas vacías iniciales se descartan y el resto se
+    emite tal cual, sin volver a analizarlo. Las líneas iniciales se
+    guardan ya descomentadas: si resulta que TODO el código venía
+    comentado (caso problemático), al final se emiten esas en lugar de nada.
+
+    Args:
+        lines: Iterable de líneas (sin salto de línea final)
+    """
+    lines = iter(lines)
+    leading = []
+
+    for line, kind in classify_lines(lines):
+        if kind == 'code':
+            # Primera línea de código real: el resto pasa sin tokenizar
+            yield line
+            yield from lines
+            return
+        if kind == 'comment':
+            uncommented = _uncomment_line(line)
+            if uncommented is not None:
+                leading.append(uncommented)
+        else:
+            leading.append(line)
+
+    if any(line.strip() for line in leading):
+        print("⚠️ Detectado: Todo el código está comentado. Descomentando...")
+        yield from leading
+
+
 def clean_translated_code(translated_code: str, original_code: str, target_lang: str) -> str:
     """
     Limpia el código traducido removiendo comentarios innecesarios y texto adicional.
@@ -107,72 +173,7 @@ def clean_translated_code(translated_code: str, original_code: str, target_lang:
     Returns:
         Código limpio y formateado
     """
-    lines = translated_code.split('\n')
-    cleaned_lines = []
-
-    # Detectar si TODO el código está comentado (caso problemático)
-    non_empty_lines = [l.strip() for l in lines if l.strip()]
-    all_commented = all(
-        line.startswith('//') or line.startswith('/*') or line.startswith('*')
-        for line in non_empty_lines
-    )
-
-    if all_commented:
-        print("⚠️ Detectado: Todo el código está comentado. Descomentando...")
-        # Descomentando líneas
-        for line in lines:
-            stripped = line.strip()
-
-            # Remover // al inicio
-            if stripped.startswith('// '):
-                cleaned_lines.append(line.replace('// ', '', 1))
-            elif stripped.startswith('//'):
-                cleaned_lines.append(line.replace('//', '', 1))
-            # Ignorar marcadores de comentarios de bloque
-            elif stripped in ['/*', '*/', '/**', '**/']:
-                continue
-            # Remover * al inicio de líneas de comentario de bloque
-            elif stripped.startswith('* '):
-                cleaned_lines.append(line.replace('* ', '', 1))
-            elif stripped.startswith('*') and len(stripped) > 1:
-                cleaned_lines.append(line.replace('*', '', 1))
-            else:
-                cleaned_lines.append(line)
-    else:
-        # Caso normal: remover solo comentarios iniciales
-        skip_initial_comments = True
-        in_block_comment = False
-
-        for line in lines:
-            stripped = line.strip()
-
-            # Detectar inicio/fin de comentario de bloque
-            if '/*' in stripped:
-                in_block_comment = True
-
-            if skip_initial_comments:
-                # Saltar comentarios solo al inicio del archivo
-                if stripped.startswith('//') or stripped.startswith('/*') or stripped.startswith('*'):
-                    if '*/' in stripped:
-                        in_block_comment = False
-                    continue
-                elif in_block_comment:
-                    if '*/' in stripped:
-                        in_block_comment = False
-                    continue
-                elif stripped == '':
-                    continue
-                else:
-                    # Primera línea de código real
-                    skip_initial_comments = False
-                    cleaned_lines.append(line)
-            else:
-                cleaned_lines.append(line)
-
-            if '*/' in stripped:
-                in_block_comment = False
-
-    result = '\n'.join(cleaned_lines).strip()
+    result = '\n'.join(iter_clean_lines(translated_code.split('\n'))).strip()
 
     # Validación adicional
     if len(result) < 10:
@@ -186,278 +187,825 @@ def clean_translated_code(translated_code: str, original_code: str, target_lang:
     return result
 
 
-def translate_code_zzzcode(code: str, from_lang: str, to_lang: str) -> str:
-    """Traduce código usando zzzcode.ai a través de Selenium."""
-    options = get_chrome_options()
+def create_driver():
+    """Crea una nueva sesión de Chrome configurada según el entorno."""
+    # Rutas de ChromeDriver y Chromium cacheadas (ver browser_config.py)
+    config = get_browser_config()
+    options = get_chrome_options(config)
+    service = Service(executable_path=config.chromedriver_path)
 
-    driver = None
+    driver = webdriver.Chrome(service=service, options=options)
+    resource_filter.install(driver)
+    print("✅ ChromeDriver iniciado correctamente")
+    return driver
+
+
+def reset_session(driver):
+    """Limpia el estado del navegador entre traducciones de una sesión reutilizada."""
+    driver.delete_all_cookies()
+    driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+
+
+class _DeadlineWait(WebDriverWait):
+    """WebDriverWait acotado al deadline de la petición e interrumpido si se cancela."""
+
+    def __init__(self, driver, timeout: float, deadline, poll_frequency: float = 0.5):
+        super().__init__(driver, deadline.remaining(timeout), poll_frequency=poll_frequency)
+        self._deadline = deadline
+
+    def until(self, method, message: str = ''):
+        def guarded(driver):
+            self._deadline.check()
+            return method(driver)
+
+        try:
+            return super().until(guarded, message)
+        except TimeoutException:
+            # Si la espera terminó por el deadline, informar de eso y no de un timeout
+            self._deadline.check()
+            raise
+
+
+def _waiter(driver, timeout: float, deadline=None, poll_frequency: float = 0.5):
+    """WebDriverWait de `timeout` segundos, acotado por el deadline si se indica."""
+    if deadline is None:
+        return WebDriverWait(driver, timeout, poll_frequency=poll_frequency)
+    return _DeadlineWait(driver, timeout, deadline, poll_frequency=poll_frequency)
+
+
+def _sleep(seconds: float, deadline=None):
+    """time.sleep que respeta el deadline de la petición."""
+    if deadline is None:
+        time.sleep(seconds)
+    else:
+        deadline.sleep(seconds)
+
+
+def _open_converter(driver, deadline=None):
+    """Carga la página del conversor y devuelve un WebDriverWait sobre ella."""
+    if deadline is not None:
+        deadline.check()
+    # Cargar la página limpia (en sesiones reutilizadas esto resetea el formulario)
+    driver.get(CONVERTER_URL)
+
+    # Esperar a que los elementos estén presentes y sean interactuables
+    return _waiter(driver, 30, deadline)
+
+
+def warm_session(driver):
+    """Deja una sesión nueva con el conversor cargado (DNS, TLS y caché ya calientes)."""
+    wait = _open_converter(driver)
+    wait.until(EC.presence_of_element_located((By.XPATH, "//label[text()='From language']")))
+
+
+# Asigna el valor con el setter nativo (así lo ven React/Vue) y dispara input/change
+_SET_VALUE_JS = """
+var element = arguments[0], value = arguments[1];
+var proto = element.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+Object.getOwnPropertyDescriptor(proto, 'value').set.call(element, value);
+element.dispatchEvent(new Event('input', {bubbles: true}));
+element.dispatchEvent(new Event('change', {bubbles: true}));
+return element.value;
+"""
+
+# Tiempo máximo esperando a que el autocompletado muestre la opción del lenguaje
+LANGUAGE_OPTION_TIMEOUT = 2
+
+
+def _inject_value(driver, element, value: str) -> bool:
+    """
+    Asigna el valor de un input/textarea vía JavaScript en lugar de teclearlo.
+
+    Returns:
+        True si el campo quedó con el valor indicado
+    """
     try:
-        print("🔧 Configurando ChromeDriver...")
-        print("Código original:" + code)
-
-        # En Replit, usar el ChromeDriver ya instalado en lugar de webdriver-manager
-        if os.environ.get('REPLIT'):
-            chromedriver_path = os.environ.get('CHROMEDRIVER_PATH')
-            if chromedriver_path and os.path.exists(chromedriver_path):
-                print(f"✅ Usando ChromeDriver de Replit: {chromedriver_path}")
-                service = Service(executable_path=chromedriver_path)
-            else:
-                # Fallback a webdriver-manager
-                print("⚠️ ChromeDriver de Replit no encontrado, usando webdriver-manager...")
-                service = Service(
-                    ChromeDriverManager(chrome_type=ChromeType.CHROMIUM).install()
-                )
-        else:
-            # En local, usar webdriver-manager
-            service = Service(ChromeDriverManager().install())
-            print("✅ Usando Chrome estándar")
-
-        driver = webdriver.Chrome(service=service, options=options)
-        print("✅ ChromeDriver iniciado correctamente")
-
-        driver.get("https://zzzcode.ai/code-converter")
-
-        # Esperar a que los elementos estén presentes y sean interactuables
-        wait = WebDriverWait(driver, 30)
-
-        # Rellenar el lenguaje de origen
-        print("Rellenando lenguaje de origen...")
-        from_lang_input = wait.until(EC.presence_of_element_located((By.XPATH, "//label[text()='From language']/following-sibling::input")))
-        from_lang_input.clear()
-        from_lang_input.send_keys(from_lang)
-        time.sleep(0.5)  # Esperar a que aparezcan las opciones
-        from_lang_input.send_keys(Keys.RETURN)
-        time.sleep(0.5)
-
-        # Rellenar el lenguaje de destino
-        print("Rellenando lenguaje de destino...")
-        to_lang_input = wait.until(EC.presence_of_element_located((By.XPATH, "//label[text()='To language']/following-sibling::input")))
-        to_lang_input.clear()
-        to_lang_input.send_keys(to_lang)
-        time.sleep(0.5)
-        to_lang_input.send_keys(Keys.RETURN)
-        time.sleep(0.5)
-
-        # Rellenar el código a convertir
-        print("Rellenando código a convertir...")
-        code_textarea = wait.until(EC.presence_of_element_located((By.XPATH, "//label[text()='Code to convert']/following-sibling::textarea")))
-        code_textarea.clear()
-        code_textarea.send_keys(code)
-        time.sleep(1)
-
-        # Intentar diferentes estrategias para encontrar y hacer clic en el botón
-        print("Buscando botón Execute...")
-        execute_button = None
-        
-        # Estrategia 2: Buscar por tipo submit
-        if not execute_button:
-            try:
-                execute_button = driver.find_element(By.XPATH, "//button[@type='submit']")
-                print("Botón encontrado con estrategia 2")
-            except:
-                pass
+        result = driver.execute_script(_SET_VALUE_JS, element, value)
+    except WebDriverException as e:
+        print(f"Inyección de valor falló: {e}")
+        return False
+    # El navegador normaliza los finales de línea de los textarea a \n
+    return result == value.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def _fill_language(driver, wait, label: str, lang: str, deadline=None):
+    """Rellena un campo de lenguaje con autocompletado y confirma la opción."""
+    lang_input = wait.until(EC.element_to_be_clickable((By.XPATH, f"//label[text()='{label}']/following-sibling::input")))
 
-        # Estrategia 1: Buscar por texto 'Execute'
+    if not _inject_value(driver, lang_input, lang):
+        print(f"El sitio rechazó la inyección en '{label}', tecleando...")
+        lang_input.clear()
+        lang_input.send_keys(lang)
+
+    # Esperar a que el autocompletado ofrezca la opción en lugar de dormir a ciegas
+    try:
+        _waiter(driver, LANGUAGE_OPTION_TIMEOUT, deadline, poll_frequency=0.1).until(
+            EC.presence_of_element_located(
+                (By.XPATH, f"//*[@role='option' or self::li][normalize-space()='{lang}']")
+            )
+        )
+    except TimeoutException:
+        pass
+    lang_input.send_keys(Keys.RETURN)
+
+
+def _set_languages(driver, wait, from_lang: str, to_lang: str, deadline=None):
+    """Selecciona los lenguajes de origen y destino en el formulario."""
+    # Rellenar el lenguaje de origen
+    print("Rellenando lenguaje de origen...")
+    _fill_language(driver, wait, 'From language', from_lang, deadline)
+
+    # Rellenar el lenguaje de destino
+    print("Rellenando lenguaje de destino...")
+    _fill_language(driver, wait, 'To language', to_lang, deadline)
+
+
+def _fill_code(driver, wait, code: str):
+    """Rellena el textarea con el código a convertir."""
+    # Rellenar el código a convertir
+    print("Rellenando código a convertir...")
+    code_textarea = wait.until(EC.element_to_be_clickable((By.XPATH, "//label[text()='Code to convert']/following-sibling::textarea")))
+
+    # send_keys teclea carácter a carácter: con archivos grandes tarda muchísimo
+    if _inject_value(driver, code_textarea, code):
+        return
+
+    print("El sitio rechazó la inyección del código, tecleando...")
+    code_textarea.clear()
+    code_textarea.send_keys(code)
+
+
+def _click_execute(driver, wait):
+    """Busca el botón Execute y hace clic en él."""
+    # Intentar diferentes estrategias para encontrar y hacer clic en el botón
+    print("Buscando botón Execute...")
+    execute_button = None
+
+    # Estrategia 2: Buscar por tipo submit
+    if not execute_button:
         try:
-            execute_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[contains(text(),'Execute')]")))
-            print("Botón encontrado con estrategia 1")
+            execute_button = driver.find_element(By.XPATH, "//button[@type='submit']")
+            print("Botón encontrado con estrategia 2")
         except:
             pass
 
-        # Estrategia 3: Buscar cualquier botón cerca del textarea
-        if not execute_button:
-            try:
-                execute_button = driver.find_element(By.XPATH, "//textarea/following::button[1]")
-                print("Botón encontrado con estrategia 3")
-            except:
-                pass
-        
-        if not execute_button:
-            raise Exception("No se pudo encontrar el botón Execute")
-        
-        # Scroll al botón para asegurarse de que es visible
-        driver.execute_script("arguments[0].scrollIntoView(true);", execute_button)
-        time.sleep(0.5)
-        
-        # Intentar hacer clic con JavaScript si el clic normal falla
-
-        print("Haciendo clic en el botón...")
+    # Estrategia 1: Buscar por texto 'Execute'
+    try:
+        execute_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[contains(text(),'Execute')]")))
+        print("Botón encontrado con estrategia 1")
+    except TranslationCancelled:
+        raise
+    except:
+        pass
+
+    # Estrategia 3: Buscar cualquier botón cerca del textarea
+    if not execute_button:
         try:
-            execute_button.click()
+            execute_button = driver.find_element(By.XPATH, "//textarea/following::button[1]")
+            print("Botón encontrado con estrategia 3")
         except:
-            print("Clic normal falló, intentando con JavaScript...")
-            driver.execute_script("arguments[0].click();", execute_button)
+            pass
+
+    if not execute_button:
+        raise Exception("No se pudo encontrar el botón Execute")
+
+    # Scroll al botón para asegurarse de que es visible
+    driver.execute_script("arguments[0].scrollIntoView(true);", execute_button)
+
+    # Observar el DOM desde antes del clic para detectar cuándo termina el resultado
+    _install_output_observer(driver)
+
+    # Intentar hacer clic con JavaScript si el clic normal falla
+
+    print("Haciendo clic en el botón...")
+    try:
+        execute_button.click()
+    except:
+        print("Clic normal falló, intentando con JavaScript...")
+        driver.execute_script("arguments[0].click();", execute_button)
+
+
+# Registra en window.__zzzLastMutation el instante del último cambio del DOM
+_OUTPUT_OBSERVER_JS = """
+if (!window.__zzzObserver) {
+    window.__zzzLastMutation = Date.now();
+    window.__zzzObserver = new MutationObserver(function () {
+        window.__zzzLastMutation = Date.now();
+    });
+    window.__zzzObserver.observe(document.body, {childList: true, subtree: true, characterData: true});
+}
+"""
+
+# Devuelve [texto del último <pre><code> que parece un resultado, ms desde el último cambio]
+_LATEST_OUTPUT_JS = """
+var code = arguments[0], stale = arguments[1];
+var nodes = document.querySelectorAll('pre code');
+var text = null;
+for (var i = nodes.length - 1; i >= 0; i--) {
+    var candidate = nodes[i].textContent.trim();
+    if (candidate.length > 10 && candidate !== code && candidate !== stale) {
+        text = nodes[i].textContent;
+        break;
+    }
+}
+var last = window.__zzzLastMutation;
+return [text, last ? Date.now() - last : null];
+"""
+
+
+def _install_output_observer(driver):
+    """Instala un MutationObserver para saber cuándo deja de cambiar la página."""
+    try:
+        driver.execute_script(_OUTPUT_OBSERVER_JS)
+    except WebDriverException as e:
+        # Sin observer la detección se basa solo en que el texto no cambie
+        print(f"No se pudo instalar el MutationObserver: {e}")
 
-        print("Esperando resultado de la traducción...")
-        # Esperar más tiempo para el resultado (el sitio puede tardar en procesar)
-        # Probar diferentes estrategias para encontrar el resultado
-        translated_code = None
 
-        # Estrategia 3: Buscar por pre/code directamente
-        print("Esperando resultado de la traducción...")
-        # Esperar más tiempo para el resultado (el sitio puede tardar en procesar)
-        # Probar diferentes estrategias para encontrar el resultado
+class _OutputStabilized:
+    """
+    Condición para WebDriverWait: hay un resultado nuevo en <pre><code> y ni
+    su texto ni el DOM han cambiado durante stable_for segundos.
+    """
+
+    def __init__(self, code: str, stale: str = None, stable_for: float = RESULT_STABLE_SECONDS,
+                 on_change=None):
+        self.code = code.strip()
+        self.stale = stale or ''
+        self.stable_for = stable_for
+        self.on_change = on_change
+        self.last_text = None
+        self.last_change = None
+
+    def __call__(self, driver):
+        text, quiet_ms = driver.execute_script(_LATEST_OUTPUT_JS, self.code, self.stale)
+        now = time.monotonic()
+
+        if not text:
+            return False
+
+        if text != self.last_text:
+            # El resultado sigue creciendo
+            self.last_text = text
+            self.last_change = now
+            if self.on_change:
+                self.on_change(text)
+            return False
+
+        if now - self.last_change < self.stable_for:
+            return False
+        if quiet_ms is not None and quiet_ms < self.stable_for * 1000:
+            return False
+        return text
+
+
+def _wait_for_result(driver, code: str, stale: str = None, timeout: float = RESULT_TIMEOUT,
+                     on_change=None, deadline=None):
+    """
+    Espera a que el resultado aparezca y se estabilice.
+
+    Args:
+        on_change: Callable opcional que recibe el texto parcial cada vez que cambia
+        deadline: Deadline opcional de la petición; acota el timeout
+
+    Returns:
+        El texto del resultado, o None si no apareció dentro del timeout
+    """
+    condition = _OutputStabilized(code, stale, on_change=on_change)
+    try:
+        return _waiter(driver, timeout, deadline, poll_frequency=RESULT_POLL_INTERVAL).until(condition)
+    except TimeoutException:
+        # Si el resultado apareció pero siguió cambiando, devolver lo último visto
+        if condition.last_text:
+            print("El resultado no se estabilizó a tiempo, usando el último texto visto")
+        return condition.last_text
+
+
+def _extract_result(driver, code: str, stale: str = None, progress=None, deadline=None) -> tuple[str, str]:
+    """
+    Espera el resultado de la traducción y lo devuelve en cuanto deja de cambiar.
+
+    Si el detector no encuentra ningún resultado (p. ej. porque el sitio cambió
+    su HTML) se recurre a las estrategias antiguas.
+
+    Args:
+        driver: Sesión con la traducción ya lanzada
+        code: Código original (para no confundirlo con el resultado)
+        stale: Resultado anterior que sigue en la página (modo batch) y debe ignorarse
+        progress: Callback opcional de progreso (ver translate_code_zzzcode)
+        deadline: Deadline opcional de la petición (ver translate_code_zzzcode)
+
+    Returns:
+        Tupla (resultado, nombre de la estrategia que lo encontró)
+    """
+    print("Esperando resultado de la traducción...")
+    try:
+        translated_code = _wait_for_result(
+            driver, code, stale,
+            on_change=lambda text: _notify(progress, 'partial', text=text),
+            deadline=deadline
+        )
+    except WebDriverException as e:
+        print(f"Detector de resultado falló: {e}")
         translated_code = None
 
-        # Estrategia 3: Buscar por pre/code directamente con reintentos
-        if not translated_code:
+    if translated_code and translated_code.strip():
+        print("Resultado encontrado con el detector de estabilidad")
+        return translated_code, 'stable_output'
+
+    print("Detector sin resultado, probando estrategias de respaldo...")
+    return _extract_result_fallback(driver, code, stale, deadline)
+
+
+def _extract_result_fallback(driver, code: str, stale: str = None, deadline=None) -> tuple[str, str]:
+    """
+    Prueba las estrategias de respaldo en el orden que indica el selector
+    adaptativo (ver extraction.py) y anota el resultado de cada intento.
+
+    Args:
+        driver: Sesión con la traducción ya lanzada
+        code: Código original (para no confundirlo con el resultado)
+        stale: Resultado anterior que sigue en la página (modo batch) y debe ignorarse
+        deadline: Deadline opcional; todas las pausas y esperas se acotan a él
+    """
+    stale = stale.strip() if stale else None
+
+    for strategy in SELECTOR.order():
+        print(f"Intentando {strategy.name} para encontrar resultado...")
+        started = time.perf_counter()
+        try:
+            translated_code = strategy.extract(driver, code, stale, deadline=deadline)
+        except TranslationCancelled:
+            # Una cancelación no dice nada de la estrategia: no se anota
+            raise
+        except Exception as e:
+            print(f"{strategy.name} falló: {e}")
+            translated_code = None
+
+        found = bool(translated_code and translated_code.strip())
+        SELECTOR.record(strategy.name, found, time.perf_counter() - started)
+        if found:
+            print(f"Resultado encontrado con {strategy.name}")
+            return translated_code, strategy.name
+
+    raise Exception("El código traducido está vacío o no se pudo encontrar después de múltiples intentos")
+
+
+class PreCodeStrategy(ExtractionStrategy):
+    """Busca por pre/code directamente con reintentos."""
+
+    name = 'strategy_3'
+    expected_seconds = 5.0
+
+    def extract(self, driver, code, stale=None, progress=None, deadline=None):
+        _sleep(5, deadline)
+        # Reintentar hasta 3 veces para manejar elementos "stale"
+        for attempt in range(3):
             try:
-                print("Intentando estrategia 3 para encontrar resultado...")
-                time.sleep(5)
-                # Reintentar hasta 3 veces para manejar elementos "stale"
-                for attempt in range(3):
+                for pre in driver.find_elements(By.TAG_NAME, "pre"):
                     try:
-                        pre_elements = driver.find_elements(By.TAG_NAME, "pre")
-                        for pre in pre_elements:
-                            try:
-                                code_in_pre = pre.find_elements(By.TAG_NAME, "code")
-                                if code_in_pre and code_in_pre[0].text.strip():
-                                    potential_result = code_in_pre[0].text.strip()
-                                    # Verificar que no es el código original
-                                    if potential_result != code.strip() and len(potential_result) > 10:
-                                        translated_code = potential_result
-                                        print("Resultado encontrado con estrategia 3")
-                                        break
-                            except:
-                                continue
-                        if translated_code:
-                            break
-                        time.sleep(2)
-                    except Exception as e:
-                        if attempt == 2:
-                            raise e
-                        time.sleep(2)
-            except Exception as e3:
-                print(f"Estrategia 3 falló: {e3}")
-
-        # Estrategia 5: Usar JavaScript para extraer el contenido
-        if not translated_code:
-            try:
-                print("Intentando estrategia 5 (JavaScript) para encontrar resultado...")
-                time.sleep(5)
-                # Usar JavaScript para obtener todos los elementos code
-                js_code = """
-                var codes = document.querySelectorAll('pre code');
-                var results = [];
-                for(var i = 0; i < codes.length; i++) {
-                    if(codes[i].textContent.trim().length > 10) {
-                        results.push(codes[i].textContent);
-                    }
-                }
-                return results;
-                """
-                code_contents = driver.execute_script(js_code)
-
-                if code_contents and len(code_contents) >= 2:
-                    # Tomar el último que sea diferente al código original
-                    for content in reversed(code_contents):
-                        if content.strip() != code.strip():
-                            translated_code = content
-                            print("Resultado encontrado con estrategia 5")
-                            break
-            except Exception as e5:
-                print(f"Estrategia 5 falló: {e5}")
-
-        # Estrategia 2: Buscar cualquier elemento <code> que aparezca después del clic
-        if not translated_code:
+                        code_in_pre = pre.find_elements(By.TAG_NAME, "code")
+                        if code_in_pre and code_in_pre[0].text.strip():
+                            potential_result = code_in_pre[0].text.strip()
+                            # Verificar que no es el código original
+                            if potential_result != code.strip() and potential_result != stale and len(potential_result) > 10:
+                                return potential_result
+                    except WebDriverException:
+                        continue
+                _sleep(2, deadline)
+            except WebDriverException:
+                if attempt == 2:
+                    raise
+                _sleep(2, deadline)
+        return None
+
+
+class JavaScriptStrategy(ExtractionStrategy):
+    """Usa JavaScript para extraer el contenido de todos los pre/code."""
+
+    name = 'strategy_5'
+    expected_seconds = 6.0
+
+    _JS = """
+    var codes = document.querySelectorAll('pre code');
+    var results = [];
+    for(var i = 0; i < codes.length; i++) {
+        if(codes[i].textContent.trim().length > 10) {
+            results.push(codes[i].textContent);
+        }
+    }
+    return results;
+    """
+
+    def extract(self, driver, code, stale=None, progress=None, deadline=None):
+        _sleep(5, deadline)
+        code_contents = driver.execute_script(self._JS)
+        if code_contents and len(code_contents) >= 2:
+            # Tomar el último que sea diferente al código original
+            for content in reversed(code_contents):
+                if content.strip() != code.strip() and content.strip() != stale:
+                    return content
+        return None
+
+
+class LastCodeStrategy(ExtractionStrategy):
+    """Toma el último elemento <code> que aparezca después del clic."""
+
+    name = 'strategy_2'
+    expected_seconds = 8.0
+
+    def extract(self, driver, code, stale=None, progress=None, deadline=None):
+        _sleep(8, deadline)  # Dar más tiempo para que cargue completamente
+        code_elements = driver.find_elements(By.TAG_NAME, "code")
+        if len(code_elements) > 1:  # El segundo code suele ser el resultado
+            if code_elements[-1].text.strip() != stale:
+                return code_elements[-1].text
+        return None
+
+
+class HeadingStrategy(ExtractionStrategy):
+    """Busca el pre/code que sigue al h2 "Code Converted"."""
+
+    name = 'strategy_1'
+    expected_seconds = 48.0
+
+    def extract(self, driver, code, stale=None, progress=None, deadline=None):
+        element = _waiter(driver, 45, deadline).until(
+            EC.presence_of_element_located(
+                (By.XPATH, "//h2[contains(text(),'Code Converted')]/following-sibling::pre/code"))
+        )
+        _sleep(3, deadline)
+        return element.text
+
+
+class PatientPollStrategy(ExtractionStrategy):
+    """Espera con más paciencia a que cambie el contenido de la página."""
+
+    name = 'strategy_4'
+    expected_seconds = 90.0
+
+    def extract(self, driver, code, stale=None, progress=None, deadline=None):
+        # Esperar hasta 90 segundos a que aparezca algún resultado (código largo tarda más)
+        for i in range(18):  # 18 intentos de 5 segundos = 90 segundos
+            _sleep(5, deadline)
+            print(f"Esperando... intento {i + 1}/18")
             try:
-                print("Intentando estrategia 2 para encontrar resultado...")
-                time.sleep(8)  # Dar más tiempo para que cargue completamente
-                code_elements = driver.find_elements(By.TAG_NAME, "code")
-                if len(code_elements) > 1:  # El segundo code suele ser el resultado
+                # Re-buscar elementos cada vez para evitar stale elements
+                code_elements = driver.find_elements(By.XPATH, "//pre/code")
+                print(f"  Encontrados {len(code_elements)} elementos <code>")
+
+                if len(code_elements) >= 2:
                     translated_code = code_elements[-1].text
-                    print("Resultado encontrado con estrategia 2")
-            except Exception as e2:
-                print(f"Estrategia 2 falló: {e2}")
+                    if translated_code and translated_code.strip() != code.strip() and translated_code.strip() != stale and len(
+                            translated_code.strip()) > 10:
+                        return translated_code
+            except WebDriverException as inner_e:
+                print(f"  Error en intento {i + 1}: {str(inner_e)[:100]}")
+        return None
+
+
+# Orden inicial (sin estadísticas): 3 → 5 → 2 → 1 → 4
+for _strategy in (PreCodeStrategy, JavaScriptStrategy, LastCodeStrategy, HeadingStrategy, PatientPollStrategy):
+    register_strategy(_strategy())
 
-        # Estrategia 1: Buscar por el h2 "Code Converted"
-        if not translated_code:
-            try:
-                print("Intentando estrategia 1 para encontrar resultado...")
-                translated_code_element = WebDriverWait(driver, 45).until(
-                    EC.presence_of_element_located(
-                        (By.XPATH, "//h2[contains(text(),'Code Converted')]/following-sibling::pre/code"))
-                )
-                time.sleep(3)  # Aumentar tiempo de espera
-                translated_code = translated_code_element.text
-                print("Resultado encontrado con estrategia 1")
-            except Exception as e1:
-                print(f"Estrategia 1 falló: {e1}")
-
-        # Estrategia 4: Esperar a que cambie el contenido de la página con más paciencia
-        if not translated_code:
-            try:
-                print("Intentando estrategia 4 para encontrar resultado...")
-                # Esperar hasta 90 segundos a que aparezca algún resultado (código largo tarda más)
-                for i in range(18):  # 18 intentos de 5 segundos = 90 segundos
-                    time.sleep(5)
-                    print(f"Esperando... intento {i + 1}/18")
-                    try:
-                        # Re-buscar elementos cada vez para evitar stale elements
-                        code_elements = driver.find_elements(By.XPATH, "//pre/code")
-                        print(f"  Encontrados {len(code_elements)} elementos <code>")
-
-                        if len(code_elements) >= 2:
-                            # Intentar obtener el último elemento
-                            last_element = code_elements[-1]
-                            translated_code = last_element.text
-
-                            if translated_code and translated_code.strip() != code.strip() and len(
-                                    translated_code.strip()) > 10:
-                                print("Resultado encontrado con estrategia 4")
-                                break
-                            else:
-                                translated_code = None
-                    except Exception as inner_e:
-                        print(f"  Error en intento {i + 1}: {str(inner_e)[:100]}")
-                        continue
-            except Exception as e4:
-                print(f"Estrategia 4 falló: {e4}")
 
-        if not translated_code or translated_code.strip() == "":
-            raise Exception("El código traducido está vacío o no se pudo encontrar después de múltiples intentos")
+def _save_error_artifacts(driver) -> bool:
+    """
+    Guarda el HTML y un screenshot de la página para depuración.
+
+    Returns:
+        False si la sesión ya no responde (no se pudo leer la página)
+    """
+    # Intentar capturar el HTML de la página en caso de error para depuración
+    try:
+        page_source = driver.page_source
+        with open("error_page.html", "w", encoding="utf-8") as f:
+            f.write(page_source)
+        print("Se ha guardado el HTML de la página en 'error_page.html' para depuración.")
+    except WebDriverException:
+        # Si ni siquiera podemos leer la página, la sesión está caída
+        return False
+
+    # Capturar screenshot si es posible
+    try:
+        driver.save_screenshot("error_screenshot.png")
+        print("Se ha guardado un screenshot en 'error_screenshot.png'")
+    except:
+        pass
+    return True
+
+
+def _abandon_page(driver) -> bool:
+    """
+    Detiene la conversión en curso de una traducción cancelada.
+
+    Returns:
+        False si la sesión ya no responde
+    """
+    try:
+        driver.get('about:blank')
+        return True
+    except WebDriverException:
+        return False
+
+
+def _notify(progress, event: str, **data):
+    """Invoca el callback de progreso sin dejar que sus errores rompan la traducción."""
+    if progress is None:
+        return
+    try:
+        progress(event, data)
+    except Exception as e:
+        print(f"Callback de progreso falló en '{event}': {e}")
+
+
+class SeleniumBackend(TranslationBackend):
+    """Backend que maneja el formulario de zzzcode.ai con Chrome."""
+
+    name = 'selenium'
+
+    def translate(self, code: str, from_lang: str, to_lang: str, pool=None, progress=None,
+                  deadline=None) -> tuple[str, str]:
+        driver = None
+        driver_broken = False
+        direction = f"{from_lang}->{to_lang}"
+        try:
+            if pool is not None:
+                with REGISTRY.timer('translation_phase_seconds', phase='driver_acquire', direction=direction):
+                    driver = pool.acquire(deadline=deadline)
+                print("✅ Sesión de Chrome obtenida del pool")
+            else:
+                print("🔧 Configurando ChromeDriver...")
+                with REGISTRY.timer('translation_phase_seconds', phase='driver_launch', direction=direction):
+                    driver = create_driver()
+            _notify(progress, 'browser_acquired')
+
+            # Descartar el tráfico de usos anteriores de la sesión
+            resource_filter.discard(driver)
+            with REGISTRY.timer('translation_phase_seconds', phase='page_load', direction=direction):
+                wait = _open_converter(driver, deadline)
+            with REGISTRY.timer('translation_phase_seconds', phase='form_fill', direction=direction):
+                _set_languages(driver, wait, from_lang, to_lang, deadline)
+                _fill_code(driver, wait, code)
+                _click_execute(driver, wait)
+            _notify(progress, 'submitted')
+            with REGISTRY.timer('translation_phase_seconds', phase='wait_output', direction=direction):
+                result = _extract_result(driver, code, progress=progress, deadline=deadline)
+
+            resources = resource_filter.collect(driver)
+            if resources:
+                print(f"🧹 Recursos bloqueados: {resources['blocked_requests']}, "
+                      f"descargados: {resources['transferred_bytes']} bytes, "
+                      f"ahorro estimado: {resources['estimated_bytes_saved']} bytes")
+                _notify(progress, 'resources', **resources)
+            return result
+
+        except TranslationCancelled:
+            if driver:
+                driver_broken = not _abandon_page(driver)
+            raise
+        except Exception as e:
+            if driver:
+                driver_broken = not _save_error_artifacts(driver)
+            raise BackendError(str(e)) from e
+        finally:
+            if driver:
+                if pool is not None:
+                    pool.release(driver, broken=driver_broken)
+                else:
+                    driver.quit()
+
+
+register_backend('selenium', SeleniumBackend)
+
+
+def translate_code_zzzcode(code: str, from_lang: str, to_lang: str, pool=None, progress=None,
+                           deadline=None) -> str:
+    """
+    Traduce código usando zzzcode.ai.
+
+    Prueba los backends configurados en orden (TRANSLATION_BACKEND y luego
+    TRANSLATION_BACKEND_FALLBACK, por defecto Selenium) hasta que uno
+    devuelve un resultado.
+
+    Args:
+        code: Código fuente a traducir
+        from_lang: Lenguaje de origen
+        to_lang: Lenguaje de destino
+        pool: DriverPool opcional; si se indica, la sesión de Chrome se toma
+            prestada del pool en lugar de lanzar (y cerrar) un navegador nuevo
+        progress: Callable opcional progress(evento, datos) que recibe
+            'browser_acquired', 'submitted' y 'partial' (con el texto que la
+            página lleva escrito) a medida que avanza la traducción
+        deadline: Deadline opcional (ver deadline.py); acota todas las esperas
+            y permite cancelar la traducción desde otro hilo
+
+    Returns:
+        Código traducido o un mensaje "Error en la traducción: ..."
+
+    Raises:
+        TranslationCancelled: Si el deadline se cancela o se agota (solo con deadline)
+    """
+    direction = f"{from_lang}->{to_lang}"
+    started = time.perf_counter()
+    print("Código original:" + code)
+
+    error = None
+    for name in backend_chain():
+        try:
+            if deadline is not None:
+                deadline.check()
+            translated_code, strategy = get_backend(name).translate(
+                code, from_lang, to_lang, pool=pool, progress=progress, deadline=deadline
+            )
+        except TranslationCancelled as e:
+            print(f"Traducción interrumpida ({name}): {e}")
+            REGISTRY.observe('translation_seconds', time.perf_counter() - started,
+                             direction=direction, strategy='cancelled')
+            raise
+        except (BackendError, ValueError) as e:
+            print(f"Ocurrió un error durante la traducción ({name}): {e}")
+            error = e
+            continue
 
         # Limpiar comentarios generados automáticamente
         print("Código traducido sin limpiar:" + translated_code)
-        lines = translated_code.split('\n')
-        cleaned_lines = []
-        skip_comments = True
-
-        for line in lines:
-            stripped = line.strip()
-            # Saltar comentarios iniciales
-            if skip_comments and (stripped.startswith('//') or stripped.startswith('/*') or
-                                  stripped.startswith('*') or stripped == '*/'):
-                continue
-            skip_comments = False
-            cleaned_lines.append(line)
-
-            # Limpiar y procesar el código traducido
-        result = clean_translated_code(translated_code, code, to_lang)
+        with REGISTRY.timer('translation_phase_seconds', phase='clean', direction=direction):
+            result = clean_translated_code(translated_code, code, to_lang)
+
+        REGISTRY.observe('translation_seconds', time.perf_counter() - started,
+                         direction=direction, strategy=strategy)
         print("Traducción completada exitosamente")
         return result
 
-    except Exception as e:
-        print(f"Ocurrió un error durante la traducción: {e}")
-        if driver:
-            # Intentar capturar el HTML de la página en caso de error para depuración
-            with open("error_page.html", "w", encoding="utf-8") as f:
-                f.write(driver.page_source)
-            print("Se ha guardado el HTML de la página en 'error_page.html' para depuración.")
-            
-            # Capturar screenshot si es posible
+    REGISTRY.observe('translation_seconds', time.perf_counter() - started,
+                     direction=direction, strategy='failed')
+    return f"Error en la traducción: {str(error)}"
+
+
+def translate_batch(items: list, pool=None, deadline=None) -> list:
+    """
+    Traduce varios snippets con una única sesión de Chrome.
+
+    La página del conversor se carga una sola vez y los lenguajes solo se
+    vuelven a seleccionar cuando cambia la dirección entre un snippet y el
+    siguiente.
+
+    Args:
+        items: Lista de tuplas (código, lenguaje_origen, lenguaje_destino)
+        pool: DriverPool opcional del que tomar la sesión
+        deadline: Deadline opcional para todo el lote
+
+    Returns:
+        Lista con un resultado por item, en el mismo orden: el código traducido
+        o un mensaje "Error en la traducción: ..."
+
+    Raises:
+        TranslationCancelled: Si el deadline se cancela o se agota (solo con deadline)
+    """
+    results = []
+    if not items:
+        return results
+
+    driver = None
+    driver_broken = False
+    try:
+        if pool is not None:
+            driver = pool.acquire(deadline=deadline)
+            print("✅ Sesión de Chrome obtenida del pool")
+        else:
+            print("🔧 Configurando ChromeDriver...")
+            driver = create_driver()
+
+        wait = None
+        current_langs = None
+        stale = None
+
+        for index, (code, from_lang, to_lang) in enumerate(items):
+            print(f"\n[{index + 1}/{len(items)}] Traduciendo de {from_lang} a {to_lang}...")
             try:
-                driver.save_screenshot("error_screenshot.png")
-                print("Se ha guardado un screenshot en 'error_screenshot.png'")
-            except:
-                pass
-        
-        return f"Error en la traducción: {str(e)}"
+                direction = f"{from_lang}->{to_lang}"
+                started = time.perf_counter()
+
+                if wait is None:
+                    with REGISTRY.timer('translation_phase_seconds', phase='page_load', direction=direction):
+                        wait = _open_converter(driver, deadline)
+                    current_langs = None
+                    stale = None
+
+                with REGISTRY.timer('translation_phase_seconds', phase='form_fill', direction=direction):
+                    if (from_lang, to_lang) != current_langs:
+                        _set_languages(driver, wait, from_lang, to_lang, deadline)
+                        current_langs = (from_lang, to_lang)
+
+                    _fill_code(driver, wait, code)
+                    _click_execute(driver, wait)
+                with REGISTRY.timer('translation_phase_seconds', phase='wait_output', direction=direction):
+                    translated_code, strategy = _extract_result(driver, code, stale=stale, deadline=deadline)
+                # El resultado queda en la página; el siguiente item debe ignorarlo
+                stale = translated_code
+
+                with REGISTRY.timer('translation_phase_seconds', phase='clean', direction=direction):
+                    results.append(clean_translated_code(translated_code, code, to_lang))
+                REGISTRY.observe('translation_seconds', time.perf_counter() - started,
+                                 direction=direction, strategy=strategy)
+            except TranslationCancelled:
+                REGISTRY.observe('translation_seconds', time.perf_counter() - started,
+                                 direction=direction, strategy='cancelled')
+                raise
+            except Exception as e:
+                print(f"Ocurrió un error traduciendo el item {index + 1}: {e}")
+                REGISTRY.observe('translation_seconds', time.perf_counter() - started,
+                                 direction=direction, strategy='failed')
+                results.append(f"Error en la traducción: {str(e)}")
+                if not _save_error_artifacts(driver):
+                    driver_broken = True
+                    break
+                # Recargar la página antes del siguiente item
+                wait = None
+
+    except TranslationCancelled as e:
+        print(f"Lote interrumpido: {e}")
+        if driver:
+            driver_broken = not _abandon_page(driver)
+        raise
+    except Exception as e:
+        print(f"Ocurrió un error durante la traducción por lotes: {e}")
+        error = f"Error en la traducción: {str(e)}"
+        results.extend(error for _ in range(len(items) - len(results)))
     finally:
         if driver:
-            driver.quit()
+            if pool is not None:
+                pool.release(driver, broken=driver_broken)
+            else:
+                driver.quit()
+
+    # Si la sesión murió a mitad del lote, los items restantes fallan
+    if len(results) < len(items):
+        error = "Error en la traducción: la sesión de Chrome dejó de responder"
+        results.extend(error for _ in range(len(items) - len(results)))
+
+    return results
+
+
+def translate_chunked(code: str, from_lang: str, to_lang: str, pool=None, progress=None,
+                      max_chars: int = CHUNK_MAX_CHARS, max_workers: int = None,
+                      translate_fn=None, deadline=None) -> str:
+    """
+    Traduce un archivo grande dividiéndolo en fragmentos traducidos en paralelo.
+
+    El archivo se divide en unidades de nivel superior (clases, funciones,
+    namespaces) con code_splitter; cada fragmento se traduce con su propia
+    sesión de Chrome y los resultados se unen en orden con las cabeceras
+    using/#include deduplicadas.
 
-            driver.quit()
+    Args:
+        pool: DriverPool opcional; limita además los fragmentos simultáneos
+        progress: Callable opcional progress(evento, datos) que recibe
+            'chunked' (total de fragmentos) y 'chunk_done' por fragmento
+        max_chars: Tamaño máximo aproximado de cada fragmento
+        max_workers: Fragmentos traducidos a la vez (por defecto el tamaño del pool)
+        translate_fn: Callable translate_fn(código, origen, destino, progress=None,
+            deadline=None) para cada fragmento; por defecto translate_code_zzzcode
+            con el pool
+        deadline: Deadline opcional compartido por todos los fragmentos; si se
+            cancela, los fragmentos en curso se interrumpen
+
+    Returns:
+        Código traducido o un mensaje "Error en la traducción: ..."
+
+    Raises:
+        TranslationCancelled: Si el deadline se cancela o se agota (solo con deadline)
+    """
+    if translate_fn is None:
+        def translate_fn(chunk, chunk_from, chunk_to, progress=None, deadline=None):
+            return translate_code_zzzcode(chunk, chunk_from, chunk_to, pool=pool, progress=progress,
+                                          deadline=deadline)
+
+    chunks = make_chunks(code, max_chars)
+    if len(chunks) == 1:
+        return translate_fn(code, from_lang, to_lang, progress=progress, deadline=deadline)
+
+    if max_workers is None:
+        max_workers = pool.max_size if pool is not None else 2
+    max_workers = max(1, min(max_workers, len(chunks)))
+    print(f"✂️ Traduciendo {len(chunks)} fragmentos con {max_workers} sesiones en paralelo...")
+    _notify(progress, 'chunked', total=len(chunks))
+
+    def translate_chunk(index):
+        result = translate_fn(chunks[index], from_lang, to_lang, deadline=deadline)
+        _notify(progress, 'chunk_done', index=index, total=len(chunks),
+                success=not result.startswith("Error en la traducción"))
+        return result
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='chunk') as executor:
+        results = list(executor.map(translate_chunk, range(len(chunks))))
+
+    for index, result in enumerate(results):
+        if result.startswith("Error en la traducción"):
+            return f"Error en la traducción: fragmento {index + 1}/{len(chunks)}: {result}"
+
+    return merge_translations(results)
 
 
 def parse_direction(direction: str) -> tuple[str, str]:
@@ -465,32 +1013,93 @@ def parse_direction(direction: str) -> tuple[str, str]:
     Convierte la dirección de traducción a lenguajes origen y destino.
 
     Args:
-        direction: 'cpp_to_cs' o 'cs_to_cpp'
+        direction: Dirección del registro de languages.py ('cpp_to_cs', 'java_to_py'...)
 
     Returns:
         Tupla (lenguaje_origen, lenguaje_destino)
+
+    Raises:
+        ValueError: Si la dirección no existe o no está habilitada
     """
-    direction_map = {
-        'cpp_to_cs': ('C++', 'C#'),
-        'cs_to_cpp': ('C#', 'C++'),
-    }
+    return get_direction(direction).languages
+
+
+def _direction_arg(value: str) -> str:
+    """Tipo de argparse para la dirección (la lista de todas las opciones sería ilegible)."""
+    try:
+        get_direction(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return value
+
+
+def run_batch(source: str, direction: str, output_dir: str = None):
+    """
+    Traduce en lote los archivos de un directorio o patrón glob.
 
-    if direction not in direction_map:
-        raise ValueError(f"Dirección inválida: {direction}. Usa 'cpp_to_cs' o 'cs_to_cpp'")
+    Args:
+        source: Directorio o patrón glob con los archivos a traducir
+        direction: Dirección de traducción
+        output_dir: Directorio donde escribir los resultados (None = solo imprimir)
+    """
+    if os.path.isdir(source):
+        paths = sorted(glob.glob(os.path.join(source, '*')))
+    else:
+        paths = sorted(glob.glob(source))
+    paths = [path for path in paths if os.path.isfile(path)]
+
+    if not paths:
+        print(f"No se encontraron archivos en: {source}")
+        sys.exit(1)
+
+    from_lang, to_lang = parse_direction(direction)
+    print(f"Traduciendo {len(paths)} archivos de {from_lang} a {to_lang} en una sola sesión...")
+
+    items = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            items.append((f.read(), from_lang, to_lang))
+
+    results = translate_batch(items)
+
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    failed = 0
+    for path, translated_code in zip(paths, results):
+        print("\n" + "=" * 60)
+        print(f"RESULTADO: {path}")
+        print("=" * 60)
+        if translated_code.startswith("Error en la traducción"):
+            failed += 1
+            print(translated_code)
+            continue
+
+        if output_dir:
+            name = os.path.splitext(os.path.basename(path))[0] + LANGUAGES_BY_NAME[to_lang].extension
+            output_path = os.path.join(output_dir, name)
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(translated_code + '\n')
+            print(f"Escrito en: {output_path}")
+        else:
+            print(translated_code)
 
-    return direction_map[direction]
+    print(f"\n{len(paths) - failed}/{len(paths)} archivos traducidos")
 
 
 def main():
     """Función principal que maneja argumentos de línea de comandos."""
     parser = argparse.ArgumentParser(
-        description='Traductor de código entre C++ y C# usando zzzcode.ai',
+        description='Traductor de código entre lenguajes (C++, C#, Java, Python, Go...) usando zzzcode.ai',
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Ejemplos de uso:
   python zzzcode_translator.py "código aquí" cpp_to_cs
   python zzzcode_translator.py "código aquí" cs_to_cpp game
   python zzzcode_translator.py archivo.cpp cpp_to_cs study
+  python zzzcode_translator.py --batch examples/ cs_to_cpp
+  python zzzcode_translator.py archivo_grande.cpp cpp_to_cs --chunked
+  python zzzcode_translator.py --batch "examples/*.cs" cs_to_cpp --output-dir traducidos
         """
     )
 
@@ -501,16 +1110,34 @@ Ejemplos de uso:
 
     parser.add_argument(
         'direction',
-        choices=['cpp_to_cs', 'cs_to_cpp'],
-        help='Dirección de traducción: cpp_to_cs (C++ a C#) o cs_to_cpp (C# a C++)'
+        type=_direction_arg,
+        help="Dirección de traducción '<origen>_to_<destino>': cpp_to_cs, cs_to_cpp, java_to_py... "
+             f"(lenguajes: {', '.join(language.code for language in LANGUAGES)})"
     )
 
     parser.add_argument(
         'mode',
         nargs='?',
-        choices=['game', 'study'],
-        default='study',
-        help='Modo de traducción: game o study (por defecto: study)'
+        choices=MODES,
+        default=None,
+        help='Modo de traducción: game o study (por defecto: el de la dirección, study)'
+    )
+
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='Traducir todos los archivos de un directorio o patrón glob con una sola sesión'
+    )
+
+    parser.add_argument(
+        '--chunked',
+        action='store_true',
+        help='Dividir el código en fragmentos (clases, funciones) y traducirlos en paralelo'
+    )
+
+    parser.add_argument(
+        '--output-dir',
+        help='Directorio donde escribir los archivos traducidos (solo con --batch)'
     )
 
     # Valores por defecto para modo debug
@@ -530,10 +1157,21 @@ int main() {
         args = argparse.Namespace(
             source=default_code,
             direction='cpp_to_cs',
-            mode='study'
+            mode='study',
+            batch=False,
+            chunked=False,
+            output_dir=None
         )
     else:
         args = parser.parse_args()
+        direction = DIRECTIONS[args.direction]
+        args.mode = args.mode or direction.default_mode
+        if args.chunked and not direction.chunkable:
+            parser.error(f"--chunked no está disponible para {direction.source.name} → {direction.target.name}")
+
+    if args.batch:
+        run_batch(args.source, args.direction, args.output_dir)
+        return
 
     # Determinar si el source es un archivo o código directo
     code_to_translate = args.source
@@ -563,7 +1201,10 @@ int main() {
 
     # Realizar la traducción
     print("Iniciando traducción...\n")
-    translated_code = translate_code_zzzcode(code_to_translate, from_lang, to_lang)
+    if args.chunked:
+        translated_code = translate_chunked(code_to_translate, from_lang, to_lang)
+    else:
+        translated_code = translate_code_zzzcode(code_to_translate, from_lang, to_lang)
 
     print("\n" + "=" * 60)
     print("RESULTADO DE LA TRADUCCIÓN:")